@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from flask.json.provider import DefaultJSONProvider
 from models.database import Database
+from utils.http_cache import clear_version_cache
+from utils.compression import compress_payload, brotli
+from utils.sketches import fetch_merged_sketches
+from api.batting_stats import compute_batting_leaderboard
+import decimal
 import json
+import time
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -13,19 +20,19 @@ def get_database_overview():
         query = """
         SELECT
             COUNT(*) as total_matches,
-            COUNT(DISTINCT metadata->'info'->>'season') as total_seasons,
-            COUNT(DISTINCT metadata->'info'->>'venue') as total_venues,
-            MIN(metadata->'info'->'dates'->0) as earliest_match,
-            MAX(metadata->'info'->'dates'->0) as latest_match
-        FROM odiwc2023
+            COUNT(DISTINCT info->>'season') as total_seasons,
+            COUNT(DISTINCT info->>'venue') as total_venues,
+            MIN(info->'dates'->>0) as earliest_match,
+            MAX(info->'dates'->>0) as latest_match
+        FROM match_info
         """
 
         # Get team statistics
         teams_query = """
         SELECT
-            jsonb_array_elements_text(metadata->'info'->'teams') as team_name,
+            jsonb_array_elements_text(info->'teams') as team_name,
             COUNT(*) as matches_played
-        FROM odiwc2023
+        FROM match_info
         GROUP BY team_name
         ORDER BY matches_played DESC
         """
@@ -34,8 +41,8 @@ def get_database_overview():
         players_query = """
         SELECT COUNT(DISTINCT player_name) as total_players
         FROM (
-            SELECT jsonb_object_keys(metadata->'info'->'registry'->'people') as player_name
-            FROM odiwc2023
+            SELECT jsonb_object_keys(info->'registry'->'people') as player_name
+            FROM match_info
         ) as players
         """
 
@@ -44,11 +51,21 @@ def get_database_overview():
             teams = db.execute_query(teams_query)
             players = db.execute_query(players_query)
 
+            # Merge every team's sketches for dataset-wide distributions
+            sketches = fetch_merged_sketches(db.cursor, 'team', metrics=['team_total', 'team_players'])
+            team_totals = sketches.get('team_total')
+            team_players = sketches.get('team_players')
+
             return jsonify({
                 'success': True,
                 'overview': overview[0] if overview else {},
                 'teams': teams if teams else [],
-                'total_players': players[0]['total_players'] if players else 0
+                'total_players': players[0]['total_players'] if players else 0,
+                'sketches': {
+                    'innings': team_totals.n if team_totals else 0,
+                    'innings_total_percentiles': team_totals.percentiles() if team_totals else None,
+                    'approx_distinct_players': team_players.count() if team_players else 0
+                }
             })
 
     except Exception as e:
@@ -67,11 +84,10 @@ def validate_data():
         no_innings_query = """
         SELECT
             id,
-            metadata->'info'->'dates'->0 as match_date,
-            metadata->'info'->>'venue' as venue
-        FROM odiwc2023
-        WHERE metadata->'innings' IS NULL
-            OR jsonb_array_length(metadata->'innings') = 0
+            info->'dates'->0 as match_date,
+            info->>'venue' as venue
+        FROM match_info mi
+        WHERE NOT EXISTS (SELECT 1 FROM match_innings mn WHERE mn.match_id = mi.id)
         LIMIT 10
         """
 
@@ -79,10 +95,10 @@ def validate_data():
         no_outcome_query = """
         SELECT
             id,
-            metadata->'info'->'dates'->0 as match_date,
-            metadata->'info'->>'venue' as venue
-        FROM odiwc2023
-        WHERE metadata->'info'->'outcome' IS NULL
+            info->'dates'->0 as match_date,
+            info->>'venue' as venue
+        FROM match_info
+        WHERE info->'outcome' IS NULL
         LIMIT 10
         """
 
@@ -90,9 +106,9 @@ def validate_data():
         incomplete_query = """
         SELECT
             id,
-            CASE WHEN metadata->'info'->>'venue' IS NULL THEN 'Missing venue' ELSE NULL END as issue
-        FROM odiwc2023
-        WHERE metadata->'info'->>'venue' IS NULL
+            CASE WHEN info->>'venue' IS NULL THEN 'Missing venue' ELSE NULL END as issue
+        FROM match_info
+        WHERE info->>'venue' IS NULL
         LIMIT 10
         """
 
@@ -140,7 +156,7 @@ def export_data():
 
         if team:
             query += " AND metadata->'info'->'teams' @> %s"
-            params.append(f'["{team}"]')
+            params.append(json.dumps([team]))
 
         if season:
             query += " AND metadata->'info'->>'season' = %s"
@@ -183,10 +199,11 @@ def export_data():
 @admin_bp.route('/cache/clear', methods=['POST'])
 def clear_cache():
     """
-    Clear application cache (placeholder for future caching implementation)
+    Clear application cache
     """
     try:
-        # This is a placeholder for when caching is implemented
+        clear_version_cache()
+
         return jsonify({
             'success': True,
             'message': 'Cache cleared successfully'
@@ -215,3 +232,87 @@ def get_logs():
             'success': False,
             'error': str(e)
         }), 500
+
+@admin_bp.route('/benchmark/serialization', methods=['GET'])
+def benchmark_serialization():
+    """
+    Compare JSON encoding time and payload size for large responses
+    Query params: match_id (defaults to the latest match), iterations
+    Legacy = Flask's default encoder over Decimal rows; current = active provider.
+    """
+    try:
+        match_id = request.args.get('match_id', '')
+        iterations = min(int(request.args.get('iterations', 20)), 200)
+
+        with Database() as db:
+            if match_id:
+                match = db.execute_query("SELECT id, metadata FROM odiwc2023 WHERE id = %s", (match_id,))
+            else:
+                match = db.execute_query("""
+                    SELECT id, metadata FROM odiwc2023
+                    ORDER BY metadata->'info'->'dates'->0 DESC
+                    LIMIT 1
+                """)
+
+        if not match:
+            return jsonify({
+                'success': False,
+                'error': 'Match not found'
+            }), 404
+
+        leaderboard = compute_batting_leaderboard('runs', 200, 200)
+
+        payloads = {
+            'match_details': {'success': True, 'data': match[0]},
+            'batting_leaderboard': {'success': True, 'data': leaderboard}
+        }
+
+        legacy_provider = DefaultJSONProvider(current_app._get_current_object())
+        results = {}
+
+        for name, payload in payloads.items():
+            legacy_payload = _with_decimals(payload)
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                legacy_body = legacy_provider.dumps(legacy_payload)
+            legacy_ms = (time.perf_counter() - start) * 1000 / iterations
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                body = current_app.json.dumps(payload)
+            current_ms = (time.perf_counter() - start) * 1000 / iterations
+
+            raw = body.encode('utf-8')
+            results[name] = {
+                'legacy_serialize_ms': round(legacy_ms, 3),
+                'current_serialize_ms': round(current_ms, 3),
+                'legacy_bytes': len(legacy_body.encode('utf-8')),
+                'raw_bytes': len(raw),
+                'gzip_bytes': len(compress_payload(raw, 'gzip')),
+                'brotli_bytes': len(compress_payload(raw, 'br')) if brotli is not None else None
+            }
+
+        return jsonify({
+            'success': True,
+            'json_provider': type(current_app.json).__name__,
+            'iterations': iterations,
+            'results': results
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def _with_decimals(value):
+    """Rebuild a payload with floats as Decimal, as psycopg2 returned NUMERIC before"""
+    if isinstance(value, float):
+        return decimal.Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _with_decimals(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_with_decimals(v) for v in value]
+    return value
@@ -1,66 +1,105 @@
 from flask import Blueprint, request, jsonify
 from models.database import Database
+from utils.player_styles import style_split_summary
+from utils.sketches import SKETCH_METRICS, fetch_merged_sketches, distribution_summary
+from utils.form import (
+    BATTING_INNINGS_QUERY, innings_arrays, prefix_sums, rolling_sums,
+    last_n_sum, ratios, ratio, group_totals
+)
 
 batting_stats_bp = Blueprint('batting_stats', __name__)
 
+MAX_FORM_WINDOW = 100
+
+# Entry-situation query params -> (batting_innings column, comparison)
+ENTRY_FILTERS = {
+    'position': ('position', '='),
+    'min_position': ('position', '>='),
+    'max_position': ('position', '<='),
+    'min_entry_over': ('entry_over', '>='),
+    'max_entry_over': ('entry_over', '<='),
+    'min_entry_score': ('entry_score', '>='),
+    'max_entry_score': ('entry_score', '<='),
+    'min_entry_wickets': ('entry_wickets', '>='),
+    'max_entry_wickets': ('entry_wickets', '<='),
+}
+
+
+def parse_entry_filters(params):
+    """{param: int} for the entry filters present in params"""
+    return {name: int(params[name]) for name in ENTRY_FILTERS if params.get(name) not in (None, '')}
+
+
+def entry_conditions(filters):
+    """SQL conditions on batting_innings and their parameters"""
+    conditions = [f'{ENTRY_FILTERS[name][0]} {ENTRY_FILTERS[name][1]} %s' for name in filters]
+    return conditions, list(filters.values())
+
+
 @batting_stats_bp.route('/player/<player_name>', methods=['GET'])
 def get_player_batting_stats(player_name):
     """
     Get comprehensive batting statistics for a specific player
+    Query params: vs_style, phase (optional) - restrict to opposing bowling styles,
+    answered from the style_matchups counters
+    position, min/max_position, min/max_entry_over, min/max_entry_score,
+    min/max_entry_wickets (optional) - restrict to innings by batting position
+    and the situation the player came in at, answered from batting_innings
     """
     try:
-        # Simplified query that filters matches first
+        vs_style = request.args.get('vs_style', '')
+        if vs_style:
+            return get_player_batting_vs_styles(player_name)
+        if parse_entry_filters(request.args):
+            return get_player_batting_by_position(player_name)
+
+        # Balls from deliveries; dismissals from wickets, which holds every
+        # wicket on a ball (not just the first) and leaves out retirements
         query = """
-        WITH player_matches AS (
-            SELECT o.id, o.metadata
-            FROM odiwc2023 o
-            WHERE o.metadata->'info'->'registry'->'people' ? %s
-        ),
-        all_deliveries AS (
+        WITH balls AS (
             SELECT
-                pm.id as match_id,
-                innings_elem->'overs' as overs_array
-            FROM player_matches pm,
-            LATERAL jsonb_array_elements(pm.metadata->'innings') as innings_elem
+                COUNT(DISTINCT match_id) as matches_played,
+                COUNT(*) as balls_faced,
+                COALESCE(SUM(runs_batter), 0) as total_runs,
+                ROUND(COALESCE(AVG(runs_batter), 0)::numeric, 2) as avg_runs_per_ball,
+                COALESCE(SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END), 0) as fours,
+                COALESCE(SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END), 0) as sixes
+            FROM deliveries
+            WHERE batter = %s
         ),
-        all_balls AS (
-            SELECT
-                ad.match_id,
-                delivery_elem
-            FROM all_deliveries ad,
-            LATERAL jsonb_array_elements(ad.overs_array) as over_elem,
-            LATERAL jsonb_array_elements(over_elem->'deliveries') as delivery_elem
-            WHERE delivery_elem->>'batter' = %s
+        outs AS (
+            SELECT COUNT(*) as times_dismissed
+            FROM wickets
+            WHERE player_out = %s AND is_dismissal
         )
         SELECT
-            COUNT(DISTINCT match_id) as matches_played,
-            COUNT(*) as balls_faced,
-            COALESCE(SUM((delivery_elem->'runs'->>'batter')::int), 0) as total_runs,
-            COALESCE(SUM(
-                CASE WHEN delivery_elem->'wickets' IS NOT NULL
-                     AND delivery_elem->'wickets'->0->>'player_out' = %s
-                     THEN 1 ELSE 0 END
-            ), 0) as times_dismissed,
-            ROUND(COALESCE(AVG((delivery_elem->'runs'->>'batter')::int), 0)::numeric, 2) as avg_runs_per_ball,
-            ROUND((COALESCE(SUM((delivery_elem->'runs'->>'batter')::int), 0)::numeric /
-                   NULLIF(SUM(CASE WHEN delivery_elem->'wickets' IS NOT NULL
-                                   AND delivery_elem->'wickets'->0->>'player_out' = %s
-                                   THEN 1 ELSE 0 END), 0)), 2) as batting_average,
-            ROUND((COALESCE(SUM((delivery_elem->'runs'->>'batter')::int), 0)::numeric /
-                   NULLIF(COUNT(*), 0) * 100), 2) as strike_rate,
-            COALESCE(SUM(CASE WHEN (delivery_elem->'runs'->>'batter')::int = 4 THEN 1 ELSE 0 END), 0) as fours,
-            COALESCE(SUM(CASE WHEN (delivery_elem->'runs'->>'batter')::int = 6 THEN 1 ELSE 0 END), 0) as sixes
-        FROM all_balls
+            matches_played,
+            balls_faced,
+            total_runs,
+            times_dismissed,
+            avg_runs_per_ball,
+            ROUND((total_runs::numeric / NULLIF(times_dismissed, 0)), 2) as batting_average,
+            ROUND((total_runs::numeric / NULLIF(balls_faced, 0) * 100), 2) as strike_rate,
+            fours,
+            sixes
+        FROM balls, outs
         """
 
         with Database() as db:
-            results = db.execute_query(query, (player_name, player_name, player_name, player_name))
+            results = db.execute_query(query, (player_name, player_name))
 
             if results and len(results) > 0 and results[0]['balls_faced'] > 0:
+                # Percentiles and distinct counts merged from the ingest-maintained sketches
+                sketches = fetch_merged_sketches(db.cursor, 'player', player_name,
+                                                 [m for m in SKETCH_METRICS if m.startswith('batting_')])
                 return jsonify({
                     'success': True,
                     'player': player_name,
-                    'stats': results[0]
+                    'stats': results[0],
+                    'distribution': distribution_summary(sketches, 'batting_runs', {
+                        'distinct_opponents': 'batting_opponents',
+                        'distinct_bowlers_faced': 'batting_bowlers'
+                    })
                 })
             else:
                 return jsonify({
@@ -68,6 +107,11 @@ def get_player_batting_stats(player_name):
                     'error': 'No batting data found for this player'
                 }), 404
 
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid entry filter: {e}'
+        }), 400
     except Exception as e:
         print(f"Error in batting stats: {e}")
         return jsonify({
@@ -76,82 +120,137 @@ def get_player_batting_stats(player_name):
         }), 500
 
 
+@batting_stats_bp.route('/player/<player_name>/vs-styles', methods=['GET'])
+def get_player_batting_vs_styles(player_name):
+    """
+    Batting record split by the opposing bowler's style
+    Query params: vs_style (optional, e.g. left-arm orthodox, spin, pace), phase (optional)
+    """
+    try:
+        vs_style = request.args.get('vs_style', '')
+        phase = request.args.get('phase', '')
+
+        with Database() as db:
+            result = style_split_summary(db.cursor, player_name, 'batting', vs_style or None, phase or None)
+
+            if result:
+                return jsonify({
+                    'success': True,
+                    'player': player_name,
+                    'phase': phase or None,
+                    **result
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': 'No batting data found for this player and style'
+                }), 404
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in batting style splits: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@batting_stats_bp.route('/player/<player_name>/by-position', methods=['GET'])
+def get_player_batting_by_position(player_name):
+    """
+    Batting record split by batting position
+    Query params: position, min/max_position, min/max_entry_over (0-based over when
+    the player came in), min/max_entry_score, min/max_entry_wickets (all optional)
+    """
+    try:
+        filters = parse_entry_filters(request.args)
+        conditions, params = entry_conditions(filters)
+        where = ' AND '.join(['batter = %s'] + conditions)
+
+        with Database() as db:
+            positions = db.execute_query(f"""
+                SELECT
+                    position,
+                    COUNT(*) as innings,
+                    SUM(runs) as runs,
+                    SUM(balls) as balls,
+                    COUNT(*) FILTER (WHERE dismissed) as dismissals,
+                    SUM(fours) as fours,
+                    SUM(sixes) as sixes,
+                    ROUND(AVG(entry_over), 1) as avg_entry_over,
+                    ROUND(AVG(entry_score), 1) as avg_entry_score,
+                    ROUND(AVG(entry_wickets), 1) as avg_entry_wickets
+                FROM batting_innings
+                WHERE {where}
+                GROUP BY position
+                ORDER BY position
+            """, [player_name] + params)
+
+        if not positions:
+            return jsonify({
+                'success': False,
+                'error': 'No batting innings found for this player and entry situation'
+            }), 404
+
+        for row in positions:
+            row.update(batting_summary(row['innings'], row['runs'], row['balls'], row['dismissals']))
+        totals = {c: sum(row[c] for row in positions) for c in ('innings', 'runs', 'balls', 'dismissals', 'fours', 'sixes')}
+
+        return jsonify({
+            'success': True,
+            'player': player_name,
+            'filters': filters,
+            'stats': {
+                **totals,
+                **batting_summary(totals['innings'], totals['runs'], totals['balls'], totals['dismissals'])
+            },
+            'by_position': positions
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid entry filter: {e}'
+        }), 400
+    except Exception as e:
+        print(f"Error in batting by position: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @batting_stats_bp.route('/leaderboard', methods=['GET'])
 def get_batting_leaderboard():
     """
     Get top batsmen with actual statistics
+    Query params: sort_by, limit, min_balls, plus the entry filters of
+    /player/<name>/by-position (e.g. position=5&max_entry_wickets=3)
     """
     try:
         sort_by = request.args.get('sort_by', 'runs')
         limit = int(request.args.get('limit', 50))
         min_balls = int(request.args.get('min_balls', 200))
+        filters = parse_entry_filters(request.args)
 
-        # Map sort_by to actual column names
-        sort_column_map = {
-            'runs': 'total_runs',
-            'average': 'batting_average',
-            'strike_rate': 'strike_rate',
-            'balls': 'balls_faced',
-            'fours': 'fours',
-            'sixes': 'sixes'
-        }
-        sort_column = sort_column_map.get(sort_by, 'total_runs')
-
-        query = f"""
-        WITH all_deliveries AS (
-            SELECT
-                delivery_elem->>'batter' as batter_name,
-                (delivery_elem->'runs'->>'batter')::int as runs,
-                CASE WHEN delivery_elem->'wickets' IS NOT NULL
-                     AND jsonb_array_length(delivery_elem->'wickets') > 0
-                     THEN delivery_elem->'wickets'->0->>'player_out'
-                     ELSE NULL
-                END as player_out
-            FROM odiwc2023,
-            LATERAL jsonb_array_elements(metadata->'innings') as innings_elem,
-            LATERAL jsonb_array_elements(innings_elem->'overs') as over_elem,
-            LATERAL jsonb_array_elements(over_elem->'deliveries') as delivery_elem
-        ),
-        player_stats AS (
-            SELECT
-                batter_name,
-                COUNT(*) as balls_faced,
-                COALESCE(SUM(runs), 0) as total_runs,
-                COALESCE(SUM(CASE WHEN player_out = batter_name THEN 1 ELSE 0 END), 0) as dismissals,
-                ROUND((COALESCE(SUM(runs), 0)::numeric / NULLIF(COUNT(*), 0) * 100), 2) as strike_rate,
-                ROUND((COALESCE(SUM(runs), 0)::numeric /
-                       NULLIF(SUM(CASE WHEN player_out = batter_name THEN 1 ELSE 0 END), 0)), 2) as batting_average,
-                COALESCE(SUM(CASE WHEN runs = 4 THEN 1 ELSE 0 END), 0) as fours,
-                COALESCE(SUM(CASE WHEN runs = 6 THEN 1 ELSE 0 END), 0) as sixes
-            FROM all_deliveries
-            WHERE batter_name IS NOT NULL
-            GROUP BY batter_name
-            HAVING COUNT(*) >= %s
-        )
-        SELECT
-            batter_name as player_name,
-            0 as matches,
-            balls_faced,
-            total_runs,
-            dismissals,
-            strike_rate,
-            batting_average as average,
-            fours,
-            sixes
-        FROM player_stats
-        ORDER BY {sort_column} DESC NULLS LAST, total_runs DESC
-        LIMIT %s
-        """
-
-        with Database() as db:
-            results = db.execute_query(query, (min_balls, limit))
+        results = compute_batting_leaderboard(sort_by, limit, min_balls, filters)
 
-            return jsonify({
-                'success': True,
-                'sort_by': sort_by,
-                'data': results if results else []
-            })
+        return jsonify({
+            'success': True,
+            'sort_by': sort_by,
+            'filters': filters,
+            'data': results
+        })
 
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid parameter: {e}'
+        }), 400
     except Exception as e:
         print(f"Error in batting leaderboard: {e}")
         return jsonify({
@@ -163,16 +262,107 @@ def get_batting_leaderboard():
 @batting_stats_bp.route('/player/<player_name>/innings', methods=['GET'])
 def get_player_innings_list(player_name):
     """
-    Get list of all innings - simplified
+    Every innings with batting position and entry situation, most recent first
+    Query params: the entry filters of /player/<name>/by-position (optional)
     """
     try:
+        conditions, params = entry_conditions(parse_entry_filters(request.args))
+        where = ' AND '.join(['batter = %s'] + conditions)
+
+        with Database() as db:
+            innings = db.execute_query(f"""
+                SELECT
+                    match_id, innings_no, match_date, season, batting_team, bowling_team,
+                    position, entry_over, entry_balls, entry_score, entry_wickets,
+                    runs, balls, fours, sixes, dismissed, dismissal_kind
+                FROM batting_innings
+                WHERE {where}
+                ORDER BY match_date DESC, match_id DESC, innings_no DESC
+            """, [player_name] + params)
+
         return jsonify({
             'success': True,
             'player': player_name,
-            'innings': []
+            'innings': innings
         })
 
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid entry filter: {e}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@batting_stats_bp.route('/player/<player_name>/timeline', methods=['GET'])
+def get_player_batting_timeline(player_name):
+    """
+    Per-season totals and a career curve with rolling averages
+    Query params: window (innings in the rolling window, default 10),
+    entry filters of /player/<name>/by-position (optional)
+    """
+    try:
+        window = min(max(int(request.args.get('window', 10)), 1), MAX_FORM_WINDOW)
+        timeline = compute_batting_timeline(player_name, window, parse_entry_filters(request.args))
+
+        if timeline:
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                **timeline
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Player not found or no batting data available'
+            }), 404
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid parameter: {e}'
+        }), 400
+    except Exception as e:
+        print(f"Error in batting timeline: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@batting_stats_bp.route('/player/<player_name>/form', methods=['GET'])
+def get_player_batting_form(player_name):
+    """
+    Batting over the player's last N innings compared with their career
+    Query params: last (default 10), entry filters of /player/<name>/by-position (optional)
+    """
+    try:
+        last = min(max(int(request.args.get('last', 10)), 1), MAX_FORM_WINDOW)
+        form = compute_batting_form(player_name, last, parse_entry_filters(request.args))
+
+        if form:
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                **form
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Player not found or no batting data available'
+            }), 404
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid parameter: {e}'
+        }), 400
     except Exception as e:
+        print(f"Error in batting form: {e}")
         return jsonify({
             'success': False,
             'error': str(e)
@@ -206,3 +396,171 @@ def get_player_vs_team_stats(player_name, team_name):
             'success': False,
             'error': str(e)
         }), 500
+
+
+def compute_batting_leaderboard(sort_by, limit, min_balls, filters=None):
+    """
+    Run the batting leaderboard query. Shared by the route and background jobs.
+    Answered from batting_innings, so entry filters (see ENTRY_FILTERS) only
+    narrow the innings counted and every metric means the same with or without them.
+    """
+    # Map sort_by to actual column names
+    sort_column_map = {
+        'runs': 'total_runs',
+        'average': 'batting_average',
+        'strike_rate': 'strike_rate',
+        'balls': 'balls_faced',
+        'fours': 'fours',
+        'sixes': 'sixes'
+    }
+    sort_column = sort_column_map.get(sort_by, 'total_runs')
+    conditions, params = entry_conditions(filters or {})
+
+    query = f"""
+    WITH player_stats AS (
+        SELECT
+            batter as batter_name,
+            COUNT(DISTINCT match_id) as matches,
+            SUM(balls) as balls_faced,
+            SUM(runs) as total_runs,
+            COUNT(*) FILTER (WHERE dismissed) as dismissals,
+            ROUND(SUM(runs)::numeric / NULLIF(SUM(balls), 0) * 100, 2) as strike_rate,
+            ROUND(SUM(runs)::numeric / NULLIF(COUNT(*) FILTER (WHERE dismissed), 0), 2) as batting_average,
+            SUM(fours) as fours,
+            SUM(sixes) as sixes
+        FROM batting_innings
+        WHERE {' AND '.join(conditions) or 'TRUE'}
+        GROUP BY batter
+        HAVING SUM(balls) >= %s
+    )
+    SELECT
+        batter_name as player_name,
+        matches,
+        balls_faced,
+        total_runs,
+        dismissals,
+        strike_rate,
+        batting_average as average,
+        fours,
+        sixes
+    FROM player_stats
+    ORDER BY {sort_column} DESC NULLS LAST, total_runs DESC
+    LIMIT %s
+    """
+
+    with Database() as db:
+        # Not execute_query, which swallows errors: a failed query must fail the job
+        db.cursor.execute(query, params + [min_balls, limit])
+        results = db.cursor.fetchall()
+
+    return results if results else []
+
+
+def load_batting_innings(player_name, filters=None):
+    """
+    Chronological innings rows plus their counter arrays, or (None, None).
+    filters (see ENTRY_FILTERS) keep only innings with that position / entry situation.
+    """
+    entry_filter = ''
+    params = [player_name, player_name]
+    if filters:
+        conditions, values = entry_conditions(filters)
+        entry_filter = f"""
+            WHERE (match_id, innings_no) IN (
+                SELECT match_id, innings_no FROM batting_innings
+                WHERE {' AND '.join(['batter = %s'] + conditions)}
+            )
+        """
+        params += [player_name] + values
+
+    with Database() as db:
+        rows = db.execute_query(BATTING_INNINGS_QUERY.format(entry_filter=entry_filter), params)
+
+    if not rows:
+        return None, None
+    return rows, innings_arrays(rows, ['runs', 'balls', 'dismissals'])
+
+
+def batting_summary(innings, runs, balls, dismissals):
+    return {
+        'innings': innings,
+        'runs': runs,
+        'balls': balls,
+        'dismissals': dismissals,
+        'average': ratio(runs, dismissals),
+        'strike_rate': ratio(runs, balls, 100)
+    }
+
+
+def compute_batting_timeline(player_name, window=10, filters=None):
+    """
+    Season totals and per-innings career/rolling averages from prefix sums.
+    Returns None when the player has not batted.
+    """
+    rows, arrays = load_batting_innings(player_name, filters)
+    if rows is None:
+        return None
+
+    runs, balls, outs = arrays['runs'], arrays['balls'], arrays['dismissals']
+    career_runs, career_balls, career_outs = (prefix_sums(a)[1:] for a in (runs, balls, outs))
+    rolling_runs, rolling_balls, rolling_outs = (rolling_sums(a, window) for a in (runs, balls, outs))
+
+    career_average = ratios(career_runs, career_outs)
+    career_strike_rate = ratios(career_runs, career_balls, 100)
+    rolling_average = ratios(rolling_runs, rolling_outs)
+    rolling_strike_rate = ratios(rolling_runs, rolling_balls, 100)
+
+    seasons, totals, counts = group_totals([row['season'] for row in rows], arrays)
+
+    return {
+        'window': window,
+        'seasons': [
+            {'season': season, **batting_summary(
+                int(counts[i]), int(totals['runs'][i]), int(totals['balls'][i]), int(totals['dismissals'][i])
+            )}
+            for i, season in enumerate(seasons)
+        ],
+        'innings': [
+            {
+                'match_id': row['match_id'],
+                'match_date': row['match_date'],
+                'season': row['season'],
+                'runs': row['runs'],
+                'balls': row['balls'],
+                'dismissed': row['dismissals'] > 0,
+                'career_runs': int(career_runs[i]),
+                'career_average': career_average[i],
+                'career_strike_rate': career_strike_rate[i],
+                'rolling_average': rolling_average[i],
+                'rolling_strike_rate': rolling_strike_rate[i]
+            }
+            for i, row in enumerate(rows)
+        ]
+    }
+
+
+def compute_batting_form(player_name, last=10, filters=None):
+    """
+    Totals over the last N innings and the whole career.
+    Returns None when the player has not batted.
+    """
+    rows, arrays = load_batting_innings(player_name, filters)
+    if rows is None:
+        return None
+
+    recent = min(last, len(rows))
+    return {
+        'last': last,
+        'form': batting_summary(recent, *(last_n_sum(arrays[c], last) for c in ('runs', 'balls', 'dismissals'))),
+        'career': batting_summary(len(rows), *(int(arrays[c].sum()) for c in ('runs', 'balls', 'dismissals'))),
+        'innings': [
+            {
+                'match_id': row['match_id'],
+                'match_date': row['match_date'],
+                'runs': row['runs'],
+                'balls': row['balls'],
+                'dismissed': row['dismissals'] > 0
+            }
+            for row in reversed(rows[-recent:])
+        ]
+    }
@@ -1,14 +1,28 @@
 from flask import Blueprint, request, jsonify
 from models.database import Database
+from utils.player_styles import style_split_summary
+from utils.sketches import SKETCH_METRICS, fetch_merged_sketches, distribution_summary
+from utils.form import (
+    BOWLING_INNINGS_QUERY, innings_arrays, prefix_sums, rolling_sums,
+    last_n_sum, ratios, ratio, group_totals
+)
 
 bowling_stats_bp = Blueprint('bowling_stats', __name__)
 
+MAX_FORM_WINDOW = 100
+
 @bowling_stats_bp.route('/player/<player_name>', methods=['GET'])
 def get_player_bowling_stats(player_name):
     """
     Get comprehensive bowling statistics for a specific player
+    Query params: vs_style, phase (optional) - restrict to opposing batting hands,
+    answered from the style_matchups counters
     """
     try:
+        vs_style = request.args.get('vs_style', '')
+        if vs_style:
+            return get_player_bowling_vs_styles(player_name)
+
         query = """
         WITH player_matches AS (
             SELECT o.id, o.metadata
@@ -38,7 +52,7 @@ def get_player_bowling_stats(player_name):
             COALESCE(SUM((delivery_elem->'runs'->>'total')::int), 0) as total_runs_conceded,
             COALESCE(SUM(
                 CASE WHEN delivery_elem->'wickets' IS NOT NULL
-                     AND delivery_elem->'wickets'->0->>'kind' NOT IN ('run out', 'retired hurt', 'obstructing the field')
+                     AND delivery_elem->'wickets'->0->>'kind' IN ('bowled', 'caught', 'caught and bowled', 'lbw', 'stumped', 'hit wicket')
                      THEN 1 ELSE 0 END
             ), 0) as total_wickets,
             COALESCE(SUM(
@@ -65,10 +79,17 @@ def get_player_bowling_stats(player_name):
             results = db.execute_query(query, (player_name, player_name))
 
             if results and len(results) > 0 and results[0]['balls_bowled'] > 0:
+                # Percentiles and distinct counts merged from the ingest-maintained sketches
+                sketches = fetch_merged_sketches(db.cursor, 'player', player_name,
+                                                 [m for m in SKETCH_METRICS if m.startswith('bowling_')])
                 return jsonify({
                     'success': True,
                     'player': player_name,
-                    'stats': results[0]
+                    'stats': results[0],
+                    'distribution': distribution_summary(sketches, 'bowling_economy', {
+                        'distinct_opponents': 'bowling_opponents',
+                        'distinct_batters_dismissed': 'bowling_victims'
+                    })
                 })
             else:
                 return jsonify({
@@ -103,6 +124,66 @@ def get_player_bowling_spells(player_name):
         }), 500
 
 
+@bowling_stats_bp.route('/player/<player_name>/timeline', methods=['GET'])
+def get_player_bowling_timeline(player_name):
+    """
+    Per-season totals and a career curve with rolling economy and averages
+    Query params: window (innings in the rolling window, default 10)
+    """
+    try:
+        window = min(max(int(request.args.get('window', 10)), 1), MAX_FORM_WINDOW)
+        timeline = compute_bowling_timeline(player_name, window)
+
+        if timeline:
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                **timeline
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Player not found or no bowling data available'
+            }), 404
+
+    except Exception as e:
+        print(f"Error in bowling timeline: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bowling_stats_bp.route('/player/<player_name>/form', methods=['GET'])
+def get_player_bowling_form(player_name):
+    """
+    Bowling over the player's last N innings compared with their career
+    Query params: last (default 10)
+    """
+    try:
+        last = min(max(int(request.args.get('last', 10)), 1), MAX_FORM_WINDOW)
+        form = compute_bowling_form(player_name, last)
+
+        if form:
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                **form
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Player not found or no bowling data available'
+            }), 404
+
+    except Exception as e:
+        print(f"Error in bowling form: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @bowling_stats_bp.route('/player/<player_name>/vs-team/<team_name>', methods=['GET'])
 def get_player_vs_team_bowling_stats(player_name, team_name):
     """
@@ -132,6 +213,45 @@ def get_player_vs_team_bowling_stats(player_name, team_name):
         }), 500
 
 
+@bowling_stats_bp.route('/player/<player_name>/vs-styles', methods=['GET'])
+def get_player_bowling_vs_styles(player_name):
+    """
+    Bowling record split by the opposing batter's style
+    Query params: vs_style (optional, e.g. left-hand, right-hand), phase (optional)
+    """
+    try:
+        vs_style = request.args.get('vs_style', '')
+        phase = request.args.get('phase', '')
+
+        with Database() as db:
+            result = style_split_summary(db.cursor, player_name, 'bowling', vs_style or None, phase or None)
+
+            if result:
+                return jsonify({
+                    'success': True,
+                    'player': player_name,
+                    'phase': phase or None,
+                    **result
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': 'No bowling data found for this player and style'
+                }), 404
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        print(f"Error in bowling style splits: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @bowling_stats_bp.route('/leaderboard', methods=['GET'])
 def get_bowling_leaderboard():
     """
@@ -143,80 +263,13 @@ def get_bowling_leaderboard():
         limit = int(request.args.get('limit', 50))
         min_balls = int(request.args.get('min_balls', 50))
 
-        # Map sort_by to actual column names
-        sort_column_map = {
-            'wickets': 'total_wickets',
-            'average': 'bowling_average',
-            'economy': 'economy_rate',
-            'strike_rate': 'bowling_strike_rate',
-            'matches': 'matches_played',
-            'overs': 'overs_bowled'
-        }
-        sort_column = sort_column_map.get(sort_by, 'total_wickets')
-
-        query = f"""
-        WITH all_deliveries AS (
-            SELECT
-                delivery_elem->>'bowler' as bowler_name,
-                o.id as match_id,
-                (delivery_elem->'runs'->>'total')::int as runs_total,
-                CASE WHEN delivery_elem->'wickets' IS NOT NULL
-                     AND delivery_elem->'wickets'->0->>'kind' NOT IN ('run out', 'retired hurt', 'obstructing the field')
-                     THEN 1 ELSE 0 END as is_wicket,
-                CASE WHEN (delivery_elem->'runs'->>'total')::int = 0 THEN 1 ELSE 0 END as is_dot
-            FROM odiwc2023 o,
-            LATERAL jsonb_array_elements(o.metadata->'innings') as innings_elem,
-            LATERAL jsonb_array_elements(innings_elem->'overs') as over_elem,
-            LATERAL jsonb_array_elements(over_elem->'deliveries') as delivery_elem
-            WHERE delivery_elem->>'bowler' IS NOT NULL
-        ),
-        bowler_stats AS (
-            SELECT
-                bowler_name,
-                COUNT(DISTINCT match_id) as matches_played,
-                COUNT(*) as balls_bowled,
-                (FLOOR(COUNT(*) / 6) + MOD(COUNT(*), 6)::numeric / 10) as overs_bowled,
-                COALESCE(SUM(runs_total), 0) as total_runs_conceded,
-                COALESCE(SUM(is_wicket), 0) as total_wickets,
-                COALESCE(SUM(is_dot), 0) as dot_balls,
-                ROUND((COALESCE(SUM(runs_total), 0)::numeric /
-                       NULLIF(SUM(is_wicket), 0)), 2) as bowling_average,
-                ROUND((COUNT(*)::numeric /
-                       NULLIF(SUM(is_wicket), 0)), 2) as bowling_strike_rate,
-                ROUND((COALESCE(SUM(runs_total), 0)::numeric /
-                       NULLIF(COUNT(*), 0) * 6), 2) as economy_rate,
-                ROUND((COALESCE(SUM(is_dot), 0)::numeric /
-                       NULLIF(COUNT(*), 0) * 100), 2) as dot_ball_percentage
-            FROM all_deliveries
-            WHERE bowler_name IS NOT NULL
-            GROUP BY bowler_name
-            HAVING COUNT(*) >= %s
-                AND SUM(is_wicket) > 0
-                AND COUNT(DISTINCT match_id) >= 80
-        )
-        SELECT
-            bowler_name as player_name,
-            matches_played,
-            overs_bowled,
-            total_wickets as wickets,
-            total_runs_conceded as runs_conceded,
-            bowling_average as average,
-            economy_rate as economy,
-            bowling_strike_rate as strike_rate,
-            dot_ball_percentage
-        FROM bowler_stats
-        ORDER BY {sort_column} {'ASC' if sort_by in ['average', 'economy', 'strike_rate'] else 'DESC'}
-        LIMIT %s
-        """
-
-        with Database() as db:
-            results = db.execute_query(query, (min_balls, limit))
+        results = compute_bowling_leaderboard(sort_by, limit, min_balls)
 
-            return jsonify({
-                'success': True,
-                'sort_by': sort_by,
-                'data': results if results else []
-            })
+        return jsonify({
+            'success': True,
+            'sort_by': sort_by,
+            'data': results
+        })
 
     except Exception as e:
         print(f"Error in bowling leaderboard: {e}")
@@ -224,3 +277,177 @@ def get_bowling_leaderboard():
             'success': False,
             'error': str(e)
         }), 500
+
+
+def compute_bowling_leaderboard(sort_by, limit, min_balls):
+    """
+    Run the bowling leaderboard query. Shared by the route and background jobs.
+    """
+    # Map sort_by to actual column names
+    sort_column_map = {
+        'wickets': 'total_wickets',
+        'average': 'bowling_average',
+        'economy': 'economy_rate',
+        'strike_rate': 'bowling_strike_rate',
+        'matches': 'matches_played',
+        'overs': 'overs_bowled'
+    }
+    sort_column = sort_column_map.get(sort_by, 'total_wickets')
+
+    query = f"""
+    WITH all_deliveries AS (
+        SELECT
+            delivery_elem->>'bowler' as bowler_name,
+            o.id as match_id,
+            (delivery_elem->'runs'->>'total')::int as runs_total,
+            CASE WHEN delivery_elem->'wickets' IS NOT NULL
+                 AND delivery_elem->'wickets'->0->>'kind' IN ('bowled', 'caught', 'caught and bowled', 'lbw', 'stumped', 'hit wicket')
+                 THEN 1 ELSE 0 END as is_wicket,
+            CASE WHEN (delivery_elem->'runs'->>'total')::int = 0 THEN 1 ELSE 0 END as is_dot
+        FROM odiwc2023 o,
+        LATERAL jsonb_array_elements(o.metadata->'innings') as innings_elem,
+        LATERAL jsonb_array_elements(innings_elem->'overs') as over_elem,
+        LATERAL jsonb_array_elements(over_elem->'deliveries') as delivery_elem
+        WHERE delivery_elem->>'bowler' IS NOT NULL
+    ),
+    bowler_stats AS (
+        SELECT
+            bowler_name,
+            COUNT(DISTINCT match_id) as matches_played,
+            COUNT(*) as balls_bowled,
+            (FLOOR(COUNT(*) / 6) + MOD(COUNT(*), 6)::numeric / 10) as overs_bowled,
+            COALESCE(SUM(runs_total), 0) as total_runs_conceded,
+            COALESCE(SUM(is_wicket), 0) as total_wickets,
+            COALESCE(SUM(is_dot), 0) as dot_balls,
+            ROUND((COALESCE(SUM(runs_total), 0)::numeric /
+                   NULLIF(SUM(is_wicket), 0)), 2) as bowling_average,
+            ROUND((COUNT(*)::numeric /
+                   NULLIF(SUM(is_wicket), 0)), 2) as bowling_strike_rate,
+            ROUND((COALESCE(SUM(runs_total), 0)::numeric /
+                   NULLIF(COUNT(*), 0) * 6), 2) as economy_rate,
+            ROUND((COALESCE(SUM(is_dot), 0)::numeric /
+                   NULLIF(COUNT(*), 0) * 100), 2) as dot_ball_percentage
+        FROM all_deliveries
+        WHERE bowler_name IS NOT NULL
+        GROUP BY bowler_name
+        HAVING COUNT(*) >= %s
+            AND SUM(is_wicket) > 0
+            AND COUNT(DISTINCT match_id) >= 80
+    )
+    SELECT
+        bowler_name as player_name,
+        matches_played,
+        overs_bowled,
+        total_wickets as wickets,
+        total_runs_conceded as runs_conceded,
+        bowling_average as average,
+        economy_rate as economy,
+        bowling_strike_rate as strike_rate,
+        dot_ball_percentage
+    FROM bowler_stats
+    ORDER BY {sort_column} {'ASC' if sort_by in ['average', 'economy', 'strike_rate'] else 'DESC'}
+    LIMIT %s
+    """
+
+    with Database() as db:
+        # Not execute_query, which swallows errors: a failed query must fail the job
+        db.cursor.execute(query, (min_balls, limit))
+        results = db.cursor.fetchall()
+
+    return results if results else []
+
+
+def load_bowling_innings(player_name):
+    """Chronological innings rows plus their counter arrays, or (None, None)"""
+    with Database() as db:
+        rows = db.execute_query(BOWLING_INNINGS_QUERY, (player_name,))
+
+    if not rows:
+        return None, None
+    return rows, innings_arrays(rows, ['runs', 'balls', 'wickets'])
+
+
+def bowling_summary(innings, runs, balls, wickets):
+    return {
+        'innings': innings,
+        'runs_conceded': runs,
+        'balls_bowled': balls,
+        'wickets': wickets,
+        'economy': ratio(runs, balls, 6),
+        'average': ratio(runs, wickets),
+        'strike_rate': ratio(balls, wickets)
+    }
+
+
+def compute_bowling_timeline(player_name, window=10):
+    """
+    Season totals and per-innings career/rolling figures from prefix sums.
+    Returns None when the player has not bowled.
+    """
+    rows, arrays = load_bowling_innings(player_name)
+    if rows is None:
+        return None
+
+    runs, balls, wickets = arrays['runs'], arrays['balls'], arrays['wickets']
+    career_runs, career_balls, career_wickets = (prefix_sums(a)[1:] for a in (runs, balls, wickets))
+    rolling_runs, rolling_balls, rolling_wickets = (rolling_sums(a, window) for a in (runs, balls, wickets))
+
+    career_economy = ratios(career_runs, career_balls, 6)
+    career_average = ratios(career_runs, career_wickets)
+    rolling_economy = ratios(rolling_runs, rolling_balls, 6)
+    rolling_average = ratios(rolling_runs, rolling_wickets)
+
+    seasons, totals, counts = group_totals([row['season'] for row in rows], arrays)
+
+    return {
+        'window': window,
+        'seasons': [
+            {'season': season, **bowling_summary(
+                int(counts[i]), int(totals['runs'][i]), int(totals['balls'][i]), int(totals['wickets'][i])
+            )}
+            for i, season in enumerate(seasons)
+        ],
+        'innings': [
+            {
+                'match_id': row['match_id'],
+                'match_date': row['match_date'],
+                'season': row['season'],
+                'runs_conceded': row['runs'],
+                'balls_bowled': row['balls'],
+                'wickets': row['wickets'],
+                'career_wickets': int(career_wickets[i]),
+                'career_economy': career_economy[i],
+                'career_average': career_average[i],
+                'rolling_economy': rolling_economy[i],
+                'rolling_average': rolling_average[i]
+            }
+            for i, row in enumerate(rows)
+        ]
+    }
+
+
+def compute_bowling_form(player_name, last=10):
+    """
+    Totals over the last N innings and the whole career.
+    Returns None when the player has not bowled.
+    """
+    rows, arrays = load_bowling_innings(player_name)
+    if rows is None:
+        return None
+
+    recent = min(last, len(rows))
+    return {
+        'last': last,
+        'form': bowling_summary(recent, *(last_n_sum(arrays[c], last) for c in ('runs', 'balls', 'wickets'))),
+        'career': bowling_summary(len(rows), *(int(arrays[c].sum()) for c in ('runs', 'balls', 'wickets'))),
+        'innings': [
+            {
+                'match_id': row['match_id'],
+                'match_date': row['match_date'],
+                'runs_conceded': row['runs'],
+                'balls_bowled': row['balls'],
+                'wickets': row['wickets']
+            }
+            for row in reversed(rows[-recent:])
+        ]
+    }
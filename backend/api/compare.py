@@ -0,0 +1,133 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+
+compare_bp = Blueprint('compare', __name__)
+
+MAX_COMPARE_PLAYERS = 50
+
+# Each section is one branch of a single UNION ALL over the deliveries table,
+# so every requested metric for every player comes back from one query.
+SECTION_QUERIES = {
+    'batting': """
+        SELECT
+            batter as player,
+            'batting' as section,
+            NULL as phase,
+            json_build_object(
+                'matches', COUNT(DISTINCT match_id),
+                'balls_faced', COUNT(*),
+                'total_runs', SUM(runs_batter),
+                'dismissals', COALESCE(MAX(w.dismissals), 0),
+                'batting_average', ROUND((SUM(runs_batter)::numeric / NULLIF(MAX(w.dismissals), 0)), 2),
+                'strike_rate', ROUND((SUM(runs_batter)::numeric / NULLIF(COUNT(*), 0) * 100), 2),
+                'fours', SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END),
+                'sixes', SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END)
+            ) as stats
+        FROM deliveries
+        LEFT JOIN (
+            SELECT player_out, COUNT(*) as dismissals
+            FROM wickets
+            WHERE player_out = ANY(%(players)s) AND is_dismissal
+            GROUP BY player_out
+        ) w ON w.player_out = batter
+        WHERE batter = ANY(%(players)s)
+        GROUP BY batter
+    """,
+    'bowling': """
+        SELECT
+            bowler as player,
+            'bowling' as section,
+            NULL as phase,
+            json_build_object(
+                'matches', COUNT(DISTINCT match_id),
+                'balls_bowled', COUNT(*),
+                'runs_conceded', SUM(runs_total),
+                'wickets', SUM(CASE WHEN bowler_wicket THEN 1 ELSE 0 END),
+                'economy', ROUND((SUM(runs_total)::numeric / NULLIF(COUNT(*), 0) * 6), 2),
+                'dot_ball_percentage', ROUND((SUM(CASE WHEN runs_total = 0 THEN 1 ELSE 0 END)::numeric /
+                    NULLIF(COUNT(*), 0) * 100), 2)
+            ) as stats
+        FROM deliveries
+        WHERE bowler = ANY(%(players)s)
+        GROUP BY bowler
+    """,
+    'phase': """
+        SELECT
+            batter as player,
+            'phase' as section,
+            phase,
+            json_build_object(
+                'balls_faced', COUNT(*),
+                'runs_scored', SUM(runs_batter),
+                'strike_rate', ROUND((SUM(runs_batter)::numeric / NULLIF(COUNT(*), 0) * 100), 2),
+                'dot_ball_percentage', ROUND((SUM(CASE WHEN runs_batter = 0 THEN 1 ELSE 0 END)::numeric /
+                    NULLIF(COUNT(*), 0) * 100), 2)
+            ) as stats
+        FROM deliveries
+        WHERE batter = ANY(%(players)s)
+        GROUP BY batter, phase
+    """
+}
+
+
+@compare_bp.route('', methods=['GET'])
+def compare_players():
+    """
+    Compare batting, bowling and phase metrics for several players in one pass
+    Query params: players (comma separated), metrics (batting,bowling,phase)
+    """
+    try:
+        players = []
+        for name in request.args.get('players', '').split(','):
+            name = name.strip()
+            if name and name not in players:
+                players.append(name)
+
+        if not players:
+            return jsonify({
+                'success': False,
+                'error': 'At least one player is required'
+            }), 400
+
+        if len(players) > MAX_COMPARE_PLAYERS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_COMPARE_PLAYERS} players can be compared'
+            }), 400
+
+        metrics = [m.strip() for m in request.args.get('metrics', '').split(',') if m.strip()]
+        metrics = [m for m in SECTION_QUERIES if m in metrics] or list(SECTION_QUERIES)
+
+        query = " UNION ALL ".join(SECTION_QUERIES[m] for m in metrics)
+
+        with Database() as db:
+            results = db.execute_query(query, {'players': players})
+
+            # Align rows so every requested player appears once, in request order
+            rows = {name: {'player': name} for name in players}
+            for name in players:
+                for metric in metrics:
+                    rows[name][metric] = {} if metric == 'phase' else None
+
+            for row in results or []:
+                entry = rows.get(row['player'])
+                if entry is None:
+                    continue
+                if row['section'] == 'phase':
+                    entry['phase'][row['phase']] = row['stats']
+                else:
+                    entry[row['section']] = row['stats']
+
+            return jsonify({
+                'success': True,
+                'players': players,
+                'metrics': metrics,
+                'data': [rows[name] for name in players]
+            })
+
+    except Exception as e:
+        print(f"Error in player comparison: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
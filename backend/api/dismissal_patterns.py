@@ -7,33 +7,18 @@ dismissal_patterns_bp = Blueprint('dismissal_patterns', __name__)
 def get_player_dismissal_patterns(player_name):
     """
     Get dismissal patterns for a player (how they get out most often)
+    Reads the ingest-maintained wickets table, so every wicket on a ball counts
     """
     try:
         query = """
-        WITH deliveries AS (
+        WITH dismissals AS (
             SELECT
-                id as match_id,
-                jsonb_array_elements(metadata->'innings') as innings_data
-        ),
-        player_deliveries AS (
-            SELECT
-                match_id,
-                jsonb_array_elements(innings_data->'overs') as over_data
-        ),
-        ball_by_ball AS (
-            SELECT
-                match_id,
-                jsonb_array_elements(over_data->'deliveries') as delivery
-        ),
-        dismissals AS (
-            SELECT
-                delivery->'wickets'->0->>'kind' as dismissal_type,
-                delivery->>'bowler' as bowler,
+                kind as dismissal_type,
+                bowler,
                 COUNT(*) as count
-            FROM ball_by_ball
-            WHERE delivery->'wickets' IS NOT NULL
-                AND delivery->'wickets'->0->>'player_out' = %s
-            GROUP BY dismissal_type, bowler
+            FROM wickets
+            WHERE player_out = %s AND is_dismissal
+            GROUP BY kind, bowler
         )
         SELECT
             dismissal_type,
@@ -44,43 +29,25 @@ def get_player_dismissal_patterns(player_name):
         ORDER BY count DESC
         """
 
-        with Database() as db:
-            results = db.execute_query(query, (player_name,))
-
-            # Also get dismissal type summary
-            summary_query = """
-            WITH deliveries AS (
-                SELECT
-                    id as match_id,
-                    jsonb_array_elements(metadata->'innings') as innings_data
-            ),
-            player_deliveries AS (
-                SELECT
-                    match_id,
-                    jsonb_array_elements(innings_data->'overs') as over_data
-            ),
-            ball_by_ball AS (
-                SELECT
-                    match_id,
-                    jsonb_array_elements(over_data->'deliveries') as delivery
-            ),
-            dismissals AS (
-                SELECT
-                    delivery->'wickets'->0->>'kind' as dismissal_type,
-                    COUNT(*) as count
-                FROM ball_by_ball
-                WHERE delivery->'wickets' IS NOT NULL
-                    AND delivery->'wickets'->0->>'player_out' = %s
-                GROUP BY dismissal_type
-            )
+        summary_query = """
+        WITH dismissals AS (
             SELECT
-                dismissal_type,
-                count,
-                ROUND((count::numeric / SUM(count) OVER () * 100), 2) as percentage
-            FROM dismissals
-            ORDER BY count DESC
-            """
+                kind as dismissal_type,
+                COUNT(*) as count
+            FROM wickets
+            WHERE player_out = %s AND is_dismissal
+            GROUP BY kind
+        )
+        SELECT
+            dismissal_type,
+            count,
+            ROUND((count::numeric / SUM(count) OVER () * 100), 2) as percentage
+        FROM dismissals
+        ORDER BY count DESC
+        """
 
+        with Database() as db:
+            results = db.execute_query(query, (player_name,))
             summary = db.execute_query(summary_query, (player_name,))
 
             return jsonify({
@@ -103,35 +70,14 @@ def get_player_dismissal_by_phase(player_name):
     """
     try:
         query = """
-        WITH deliveries AS (
-            SELECT
-                id as match_id,
-                jsonb_array_elements(metadata->'innings') as innings_data
-        ),
-        player_deliveries AS (
-            SELECT
-                match_id,
-                jsonb_array_elements(innings_data->'overs') as over_data
-        ),
-        ball_by_ball AS (
-            SELECT
-                match_id,
-                (over_data->>'over')::int as over_num,
-                jsonb_array_elements(over_data->'deliveries') as delivery
-        ),
-        dismissals AS (
+        WITH dismissals AS (
             SELECT
-                CASE
-                    WHEN over_num < 10 THEN 'Powerplay'
-                    WHEN over_num >= 10 AND over_num < 40 THEN 'Middle Overs'
-                    ELSE 'Death Overs'
-                END as phase,
-                delivery->'wickets'->0->>'kind' as dismissal_type,
+                phase,
+                kind as dismissal_type,
                 COUNT(*) as count
-            FROM ball_by_ball
-            WHERE delivery->'wickets' IS NOT NULL
-                AND delivery->'wickets'->0->>'player_out' = %s
-            GROUP BY phase, dismissal_type
+            FROM wickets
+            WHERE player_out = %s AND is_dismissal
+            GROUP BY phase, kind
         )
         SELECT
             phase,
@@ -167,39 +113,17 @@ def get_player_dismissal_by_phase(player_name):
 def get_bowler_victims(bowler_name):
     """
     Get list of batsmen dismissed most by a bowler
+    Only wickets credited to the bowler count (run outs are excluded)
     """
     try:
         query = """
-        WITH deliveries AS (
-            SELECT
-                id as match_id,
-                jsonb_array_elements(metadata->'innings') as innings_data
-        ),
-        player_deliveries AS (
-            SELECT
-                match_id,
-                jsonb_array_elements(innings_data->'overs') as over_data
-        ),
-        ball_by_ball AS (
-            SELECT
-                match_id,
-                jsonb_array_elements(over_data->'deliveries') as delivery
-        ),
-        wickets AS (
-            SELECT
-                delivery->'wickets'->0->>'player_out' as batsman,
-                delivery->'wickets'->0->>'kind' as dismissal_type,
-                COUNT(*) as times_dismissed
-            FROM ball_by_ball
-            WHERE delivery->'wickets' IS NOT NULL
-                AND delivery->>'bowler' = %s
-            GROUP BY batsman, dismissal_type
-        )
         SELECT
-            batsman,
-            dismissal_type,
-            times_dismissed
+            player_out as batsman,
+            kind as dismissal_type,
+            COUNT(*) as times_dismissed
         FROM wickets
+        WHERE bowler = %s AND bowler_wicket
+        GROUP BY player_out, kind
         ORDER BY times_dismissed DESC, batsman
         LIMIT 50
         """
@@ -0,0 +1,113 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+
+fantasy_bp = Blueprint('fantasy', __name__)
+
+MAX_LIMIT = 200
+
+
+@fantasy_bp.route('/top', methods=['GET'])
+def get_top_performers():
+    """
+    Top fantasy performers
+    Query params:
+    - rule_set: stored rule set (default 'default')
+    - match_id: points per player in one match
+    - season, team: otherwise points are summed per player over the filtered matches
+    - limit (default 20, max 200)
+    """
+    try:
+        rule_set = request.args.get('rule_set', 'default')
+        match_id = request.args.get('match_id')
+        season = request.args.get('season')
+        team = request.args.get('team')
+        limit = min(int(request.args.get('limit', 20)), MAX_LIMIT)
+
+        with Database() as db:
+            db.cursor.execute("SELECT scored_at FROM fantasy_rule_sets WHERE name = %s", (rule_set,))
+            if not db.cursor.fetchone():
+                return jsonify({
+                    'success': False,
+                    'error': f"Rule set '{rule_set}' has not been scored (run manage.py score-fantasy)"
+                }), 404
+
+            if match_id:
+                db.cursor.execute("""
+                    SELECT player, team, batting, bowling, fielding, playing, total
+                    FROM fantasy_points
+                    WHERE rule_set = %s AND match_id = %s
+                    ORDER BY total DESC, player
+                    LIMIT %s
+                """, (rule_set, match_id, limit))
+            else:
+                conditions = ['rule_set = %s']
+                params = [rule_set]
+                if season:
+                    conditions.append('season = %s')
+                    params.append(season)
+                if team:
+                    conditions.append('team = %s')
+                    params.append(team)
+
+                db.cursor.execute(f"""
+                    SELECT
+                        player,
+                        COUNT(*) as matches,
+                        SUM(batting) as batting,
+                        SUM(bowling) as bowling,
+                        SUM(fielding) as fielding,
+                        SUM(total) as total,
+                        ROUND((SUM(total) / COUNT(*))::numeric, 2) as average,
+                        MAX(total) as best
+                    FROM fantasy_points
+                    WHERE {' AND '.join(conditions)}
+                    GROUP BY player
+                    ORDER BY total DESC, player
+                    LIMIT %s
+                """, params + [limit])
+
+            performers = db.cursor.fetchall()
+
+        return jsonify({
+            'success': True,
+            'rule_set': rule_set,
+            'filters': {'match_id': match_id, 'season': season, 'team': team},
+            'performers': performers
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid parameter: {e}'
+        }), 400
+    except Exception as e:
+        print(f"Error in fantasy top performers: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@fantasy_bp.route('/rule-sets', methods=['GET'])
+def get_rule_sets():
+    """Stored rule sets with their scoring rules and the timing of the last full scoring run"""
+    try:
+        with Database() as db:
+            db.cursor.execute("""
+                SELECT name, rules, timings, scored_at
+                FROM fantasy_rule_sets
+                ORDER BY name
+            """)
+            rule_sets = db.cursor.fetchall()
+
+        return jsonify({
+            'success': True,
+            'rule_sets': rule_sets
+        })
+
+    except Exception as e:
+        print(f"Error in fantasy rule sets: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
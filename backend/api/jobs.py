@@ -0,0 +1,131 @@
+from flask import Blueprint, request, jsonify
+from utils.jobs import job_queue, QueueFullError
+from api.phase_performance import (
+    compute_custom_phase_analysis, compute_custom_phase_sweep, parse_sweep_params
+)
+from api.batting_stats import compute_batting_leaderboard, parse_entry_filters
+from api.bowling_stats import compute_bowling_leaderboard
+from api.simulation import compute_innings_simulation
+from api.sequences import compute_sequence_pattern
+
+jobs_bp = Blueprint('jobs', __name__)
+
+MAX_WAIT_SECONDS = 25
+
+job_queue.register('custom_phase_analysis', lambda params: compute_custom_phase_analysis(
+    params['player'],
+    int(params.get('balls_before', 15)),
+    int(params.get('over_start', 7)),
+    int(params.get('overs_to_analyze', 3)),
+    int(params.get('min_balls_in_phase', 10))
+))
+job_queue.register('custom_phase_sweep', lambda params: compute_custom_phase_sweep(
+    params['player'],
+    *parse_sweep_params(params),
+    int(params.get('min_balls_in_phase', 10))
+))
+job_queue.register('batting_leaderboard', lambda params: compute_batting_leaderboard(
+    params.get('sort_by', 'runs'),
+    int(params.get('limit', 50)),
+    int(params.get('min_balls', 200)),
+    parse_entry_filters(params)
+))
+job_queue.register('bowling_leaderboard', lambda params: compute_bowling_leaderboard(
+    params.get('sort_by', 'wickets'),
+    int(params.get('limit', 50)),
+    int(params.get('min_balls', 50))
+))
+job_queue.register('innings_simulation', compute_innings_simulation)
+job_queue.register('sequence_pattern', compute_sequence_pattern)
+
+
+@jobs_bp.route('', methods=['POST'])
+def submit_job():
+    """
+    Submit a long-running analysis
+    Body: {"type": "custom_phase_analysis", "params": {...}}
+    Identical submissions return the same job id.
+    """
+    try:
+        data = request.get_json() or {}
+        job_type = data.get('type', '')
+        params = data.get('params') or {}
+
+        if job_type not in job_queue.handlers:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown job type. Available: {', '.join(sorted(job_queue.handlers))}"
+            }), 400
+
+        if job_type in ('custom_phase_analysis', 'custom_phase_sweep') and not params.get('player'):
+            return jsonify({
+                'success': False,
+                'error': 'params.player is required'
+            }), 400
+
+        job, created = job_queue.submit(job_type, params)
+
+        return jsonify({
+            'success': True,
+            'created': created,
+            'job': job.to_dict(include_result=False)
+        }), 202 if created else 200
+
+    except QueueFullError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get job status and result
+    Query params: wait (seconds to long-poll for completion, max 25)
+    """
+    try:
+        wait = min(float(request.args.get('wait', 0)), MAX_WAIT_SECONDS)
+        job = job_queue.wait(job_id, wait)
+
+        if not job:
+            return jsonify({
+                'success': False,
+                'error': 'Job not found or expired'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@jobs_bp.route('', methods=['GET'])
+def list_jobs():
+    """List jobs currently held by this worker"""
+    try:
+        with job_queue.lock:
+            jobs = [job.to_dict(include_result=False) for job in job_queue.jobs.values()]
+
+        return jsonify({
+            'success': True,
+            'jobs': sorted(jobs, key=lambda j: j['submitted_at'], reverse=True)
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
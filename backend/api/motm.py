@@ -11,58 +11,34 @@ def get_player_motm_awards(player_name):
     try:
         query = """
         SELECT
-            id as match_id,
-            metadata->'info'->'dates'->0 as match_date,
-            metadata->'info'->>'venue' as venue,
-            metadata->'info'->>'city' as city,
-            metadata->'info'->'teams' as teams,
-            metadata->'info'->'outcome'->>'winner' as winner,
-            metadata->'info'->'outcome'->'by' as win_margin,
-            metadata->'info'->'event'->>'name' as event_name,
-            metadata->'info'->>'season' as season
-        FROM odiwc2023
-        WHERE metadata->'info'->'player_of_match' @> %s
-        ORDER BY metadata->'info'->'dates'->0 DESC
+            match_id,
+            match_date,
+            venue,
+            city,
+            teams,
+            winner,
+            win_margin,
+            event_name,
+            season
+        FROM motm_awards
+        WHERE player = %s
+        ORDER BY match_date DESC
         """
 
         # Also get count and statistics
         stats_query = """
-        WITH motm_matches AS (
-            SELECT
-                id as match_id,
-                metadata->'info'->'outcome'->>'winner' as winner,
-                metadata->'info'->'teams' as teams,
-                metadata->'info'->'players' as players
-            FROM odiwc2023
-            WHERE metadata->'info'->'player_of_match' @> %s
-        ),
-        player_team_check AS (
-            SELECT
-                mm.match_id,
-                mm.winner,
-                CASE
-                    WHEN mm.teams->>0 = %s THEN mm.teams->>0
-                    WHEN mm.teams->>1 = %s THEN mm.teams->>1
-                    ELSE (
-                        SELECT team_name
-                        FROM (VALUES (mm.teams->>0), (mm.teams->>1)) AS t(team_name)
-                        WHERE mm.players->team_name @> %s
-                        LIMIT 1
-                    )
-                END as player_team
-            FROM motm_matches mm
-        )
         SELECT
             COUNT(*) as total_awards,
-            SUM(CASE WHEN winner = player_team THEN 1 ELSE 0 END) as awards_in_wins,
-            SUM(CASE WHEN winner != player_team OR winner IS NULL THEN 1 ELSE 0 END) as awards_in_losses
-        FROM player_team_check
-        WHERE player_team IS NOT NULL
+            SUM(CASE WHEN result = 'won' THEN 1 ELSE 0 END) as awards_in_wins,
+            SUM(CASE WHEN result != 'won' THEN 1 ELSE 0 END) as awards_in_losses
+        FROM motm_awards
+        WHERE player = %s
+            AND team IS NOT NULL
         """
 
         with Database() as db:
-            awards = db.execute_query(query, (f'["{player_name}"]',))
-            stats = db.execute_query(stats_query, (f'["{player_name}"]', player_name, player_name, f'["{player_name}"]'))
+            awards = db.execute_query(query, (player_name,))
+            stats = db.execute_query(stats_query, (player_name,))
 
             return jsonify({
                 'success': True,
@@ -86,20 +62,13 @@ def get_motm_leaderboard():
         limit = int(request.args.get('limit', 50))
 
         query = """
-        WITH motm_data AS (
-            SELECT
-                jsonb_array_elements_text(metadata->'info'->'player_of_match') as player_name,
-                metadata->'info'->'dates'->0 as match_date
-            FROM odiwc2023
-            WHERE metadata->'info'->'player_of_match' IS NOT NULL
-        )
         SELECT
-            player_name,
+            player as player_name,
             COUNT(*) as total_awards,
             MIN(match_date) as first_award,
             MAX(match_date) as latest_award
-        FROM motm_data
-        GROUP BY player_name
+        FROM motm_awards
+        GROUP BY player
         ORDER BY total_awards DESC, player_name
         LIMIT %s
         """
@@ -125,21 +94,14 @@ def get_motm_by_year():
     """
     try:
         query = """
-        WITH motm_data AS (
-            SELECT
-                SUBSTRING(metadata->'info'->>'season' FROM 1 FOR 4) as year,
-                jsonb_array_elements_text(metadata->'info'->'player_of_match') as player_name
-            FROM odiwc2023
-            WHERE metadata->'info'->'player_of_match' IS NOT NULL
-                AND metadata->'info'->>'season' IS NOT NULL
-        )
         SELECT
-            year,
-            player_name,
+            season_year::text as year,
+            player as player_name,
             COUNT(*) as awards
-        FROM motm_data
-        GROUP BY year, player_name
-        ORDER BY year DESC, awards DESC
+        FROM motm_awards
+        WHERE season_year IS NOT NULL
+        GROUP BY season_year, player
+        ORDER BY season_year DESC, awards DESC
         """
 
         with Database() as db:
@@ -163,35 +125,19 @@ def get_team_motm_players(team_name):
     """
     try:
         query = """
-        WITH team_matches AS (
-            SELECT
-                id as match_id,
-                metadata->'info'->'dates'->0 as match_date,
-                metadata->'info'->'player_of_match' as motm_players,
-                metadata->'info'->'players'->%s as team_players
-            FROM odiwc2023
-            WHERE metadata->'info'->'teams' @> %s
-                AND metadata->'info'->'player_of_match' IS NOT NULL
-        ),
-        player_awards AS (
-            SELECT
-                jsonb_array_elements_text(motm_players) as player_name,
-                match_date
-            FROM team_matches
-            WHERE team_players @> (SELECT jsonb_array_elements_text(motm_players) FROM team_matches LIMIT 1)
-        )
         SELECT
-            player_name,
+            player as player_name,
             COUNT(*) as awards,
             MIN(match_date) as first_award,
             MAX(match_date) as latest_award
-        FROM player_awards
-        GROUP BY player_name
-        ORDER BY awards DESC
+        FROM motm_awards
+        WHERE team = %s
+        GROUP BY player
+        ORDER BY awards DESC, player_name
         """
 
         with Database() as db:
-            results = db.execute_query(query, (team_name, f'["{team_name}"]'))
+            results = db.execute_query(query, (team_name,))
 
             return jsonify({
                 'success': True,
@@ -0,0 +1,137 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+
+partnerships_bp = Blueprint('partnerships', __name__)
+
+@partnerships_bp.route('/player/<player_name>/partners', methods=['GET'])
+def get_player_partners(player_name):
+    """
+    Get a player's most productive batting partners
+    Query params: limit (default 20), min_partnerships (default 1)
+    """
+    try:
+        limit = int(request.args.get('limit', 20))
+        min_partnerships = int(request.args.get('min_partnerships', 1))
+
+        query = """
+        WITH player_partnerships AS (
+            SELECT
+                CASE WHEN batter_a = %(player)s THEN batter_b ELSE batter_a END as partner,
+                CASE WHEN batter_a = %(player)s THEN batter_a_runs ELSE batter_b_runs END as player_runs,
+                CASE WHEN batter_a = %(player)s THEN batter_b_runs ELSE batter_a_runs END as partner_runs,
+                runs,
+                balls,
+                ended_by_wicket
+            FROM partnerships
+            WHERE batter_a = %(player)s OR batter_b = %(player)s
+        )
+        SELECT
+            partner,
+            COUNT(*) as partnerships,
+            SUM(runs) as total_runs,
+            SUM(balls) as total_balls,
+            SUM(player_runs) as player_runs,
+            SUM(partner_runs) as partner_runs,
+            MAX(runs) as best,
+            COUNT(*) FILTER (WHERE runs >= 50) as fifty_plus,
+            COUNT(*) FILTER (WHERE runs >= 100) as hundred_plus,
+            ROUND(SUM(runs)::numeric / NULLIF(COUNT(*) FILTER (WHERE ended_by_wicket), 0), 2) as average,
+            ROUND(SUM(runs)::numeric / NULLIF(SUM(balls), 0) * 6, 2) as run_rate
+        FROM player_partnerships
+        GROUP BY partner
+        HAVING COUNT(*) >= %(min_partnerships)s
+        ORDER BY total_runs DESC
+        LIMIT %(limit)s
+        """
+
+        with Database() as db:
+            results = db.execute_query(query, {
+                'player': player_name,
+                'min_partnerships': min_partnerships,
+                'limit': limit
+            })
+
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                'partners': results if results else []
+            })
+
+    except Exception as e:
+        print(f"Error in player partners: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@partnerships_bp.route('/team/<team_name>', methods=['GET'])
+def get_team_partnerships_by_wicket(team_name):
+    """
+    Get a team's partnership averages for each wicket
+    Query params: opponent (optional)
+    """
+    try:
+        opponent = request.args.get('opponent', '')
+
+        conditions = ["batting_team = %s"]
+        params = [team_name]
+
+        if opponent:
+            conditions.append("bowling_team = %s")
+            params.append(opponent)
+
+        query = f"""
+        WITH team_partnerships AS (
+            SELECT *
+            FROM partnerships
+            WHERE {' AND '.join(conditions)}
+        ),
+        best AS (
+            SELECT DISTINCT ON (wicket_no)
+                wicket_no,
+                json_build_object(
+                    'runs', runs,
+                    'balls', balls,
+                    'batters', json_build_array(batter_a, batter_b),
+                    'match_id', match_id
+                ) as best_partnership
+            FROM team_partnerships
+            ORDER BY wicket_no, runs DESC, balls
+        ),
+        by_wicket AS (
+            SELECT
+                wicket_no,
+                COUNT(*) as partnerships,
+                SUM(runs) as total_runs,
+                ROUND(AVG(runs), 2) as average_runs,
+                ROUND(AVG(balls), 2) as average_balls,
+                ROUND(SUM(runs)::numeric / NULLIF(SUM(balls), 0) * 6, 2) as run_rate,
+                COUNT(*) FILTER (WHERE runs >= 50) as fifty_plus,
+                COUNT(*) FILTER (WHERE runs >= 100) as hundred_plus
+            FROM team_partnerships
+            WHERE wicket_no <= 10
+            GROUP BY wicket_no
+        )
+        SELECT w.*, b.best_partnership
+        FROM by_wicket w
+        JOIN best b ON b.wicket_no = w.wicket_no
+        ORDER BY w.wicket_no
+        """
+
+        with Database() as db:
+            results = db.execute_query(query, params)
+
+            return jsonify({
+                'success': True,
+                'team': team_name,
+                'opponent': opponent or None,
+                'wickets': results if results else []
+            })
+
+    except Exception as e:
+        print(f"Error in team partnerships: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -1,65 +1,68 @@
 from flask import Blueprint, request, jsonify
 from models.database import Database
+from utils.phase_sweep import (
+    load_prefix_sums, parse_int_values, run_distribution, sweep, window
+)
 
 phase_performance_bp = Blueprint('phase_performance', __name__)
 
+MAX_SWEEP_CELLS = 10000
+# Sweep values are clamped to an ODI innings
+MAX_OVER_START = 49
+MAX_OVERS_TO_ANALYZE = 50
+MAX_BALLS_BEFORE = 300
+
+
+def parse_sweep_params(params):
+    """(over_starts, overs_values, balls_before_values) from query params or a job's params"""
+    return (
+        parse_int_values(params.get('over_start'), 7, MAX_OVER_START),
+        parse_int_values(params.get('overs_to_analyze'), 3, MAX_OVERS_TO_ANALYZE),
+        parse_int_values(params.get('balls_before'), 15, MAX_BALLS_BEFORE)
+    )
+
 @phase_performance_bp.route('/player/<player_name>', methods=['GET'])
 def get_player_phase_performance(player_name):
     """
     Get batting performance in different phases (Powerplay, Middle, Death)
-    Phases: Powerplay (0-10 overs), Middle (11-40 overs), Death (41-50 overs)
+    Phases follow each innings' powerplay windows (P1/P2/P3), resolved at ingest;
+    innings without them use overs 1-10, 11-40 and 41-50 scaled to the allotted overs
     """
     try:
         query = """
-        WITH deliveries AS (
-            SELECT
-                id as match_id,
-                jsonb_array_elements(metadata->'innings') as innings_data
-        ),
-        player_deliveries AS (
-            SELECT
-                match_id,
-                innings_data->>'team' as batting_team,
-                jsonb_array_elements(innings_data->'overs') as over_data
-        ),
-        ball_by_ball AS (
-            SELECT
-                match_id,
-                batting_team,
-                (over_data->>'over')::int as over_num,
-                jsonb_array_elements(over_data->'deliveries') as delivery
-        ),
-        phase_data AS (
+        WITH phase_data AS (
             SELECT
-                CASE
-                    WHEN over_num < 10 THEN 'Powerplay'
-                    WHEN over_num >= 10 AND over_num < 40 THEN 'Middle Overs'
-                    ELSE 'Death Overs'
-                END as phase,
+                phase,
                 COUNT(*) as balls_faced,
-                SUM((delivery->'runs'->>'batter')::int) as runs_scored,
-                SUM(CASE WHEN delivery->'wickets' IS NOT NULL THEN 1 ELSE 0 END) as dismissals,
-                SUM(CASE WHEN (delivery->'runs'->>'batter')::int = 4 THEN 1 ELSE 0 END) as fours,
-                SUM(CASE WHEN (delivery->'runs'->>'batter')::int = 6 THEN 1 ELSE 0 END) as sixes,
-                SUM(CASE WHEN (delivery->'runs'->>'batter')::int = 0 THEN 1 ELSE 0 END) as dots
-            FROM ball_by_ball
-            WHERE delivery->>'batter' = %s
+                SUM(runs_batter) as runs_scored,
+                SUM(CASE WHEN runs_batter = 4 THEN 1 ELSE 0 END) as fours,
+                SUM(CASE WHEN runs_batter = 6 THEN 1 ELSE 0 END) as sixes,
+                SUM(CASE WHEN runs_batter = 0 THEN 1 ELSE 0 END) as dots
+            FROM deliveries
+            WHERE batter = %s
+            GROUP BY phase
+        ),
+        phase_dismissals AS (
+            SELECT phase, COUNT(*) as dismissals
+            FROM wickets
+            WHERE player_out = %s AND is_dismissal
             GROUP BY phase
         )
         SELECT
-            phase,
+            pd.phase,
             balls_faced,
             runs_scored,
-            dismissals,
+            COALESCE(d.dismissals, 0) as dismissals,
             fours,
             sixes,
             dots,
             ROUND((runs_scored::numeric / NULLIF(balls_faced, 0) * 100), 2) as strike_rate,
-            ROUND((runs_scored::numeric / NULLIF(dismissals, 0)), 2) as average,
+            ROUND((runs_scored::numeric / NULLIF(d.dismissals, 0)), 2) as average,
             ROUND((dots::numeric / NULLIF(balls_faced, 0) * 100), 2) as dot_ball_percentage
-        FROM phase_data
+        FROM phase_data pd
+        LEFT JOIN phase_dismissals d ON d.phase = pd.phase
         ORDER BY
-            CASE phase
+            CASE pd.phase
                 WHEN 'Powerplay' THEN 1
                 WHEN 'Middle Overs' THEN 2
                 WHEN 'Death Overs' THEN 3
@@ -67,7 +70,7 @@ def get_player_phase_performance(player_name):
         """
 
         with Database() as db:
-            results = db.execute_query(query, (player_name,))
+            results = db.execute_query(query, (player_name, player_name))
 
             return jsonify({
                 'success': True,
@@ -88,37 +91,15 @@ def get_player_bowling_phase_performance(player_name):
     """
     try:
         query = """
-        WITH deliveries AS (
+        WITH phase_data AS (
             SELECT
-                id as match_id,
-                jsonb_array_elements(metadata->'innings') as innings_data
-        ),
-        player_deliveries AS (
-            SELECT
-                match_id,
-                innings_data->>'team' as batting_team,
-                jsonb_array_elements(innings_data->'overs') as over_data
-        ),
-        ball_by_ball AS (
-            SELECT
-                match_id,
-                batting_team,
-                (over_data->>'over')::int as over_num,
-                jsonb_array_elements(over_data->'deliveries') as delivery
-        ),
-        phase_data AS (
-            SELECT
-                CASE
-                    WHEN over_num < 10 THEN 'Powerplay'
-                    WHEN over_num >= 10 AND over_num < 40 THEN 'Middle Overs'
-                    ELSE 'Death Overs'
-                END as phase,
+                phase,
                 COUNT(*) as balls_bowled,
-                SUM((delivery->'runs'->>'total')::int) as runs_conceded,
-                SUM(CASE WHEN delivery->'wickets' IS NOT NULL THEN 1 ELSE 0 END) as wickets,
-                SUM(CASE WHEN (delivery->'runs'->>'total')::int = 0 THEN 1 ELSE 0 END) as dots
-            FROM ball_by_ball
-            WHERE delivery->>'bowler' = %s
+                SUM(runs_total) as runs_conceded,
+                SUM(CASE WHEN bowler_wicket THEN 1 ELSE 0 END) as wickets,
+                SUM(CASE WHEN runs_total = 0 THEN 1 ELSE 0 END) as dots
+            FROM deliveries
+            WHERE bowler = %s
             GROUP BY phase
         )
         SELECT
@@ -160,56 +141,56 @@ def get_player_bowling_phase_performance(player_name):
 def get_team_phase_performance(team_name):
     """
     Get team batting performance across different phases
+    Optional query params: opponent, season, venue (substring match)
+    Rolls up from the ingest-maintained team_phase_cube
     """
     try:
-        query = """
-        WITH deliveries AS (
-            SELECT
-                id as match_id,
-                metadata->'info'->'teams' as teams,
-                jsonb_array_elements(metadata->'innings') as innings_data
-        ),
-        player_deliveries AS (
-            SELECT
-                match_id,
-                teams,
-                innings_data->>'team' as batting_team,
-                jsonb_array_elements(innings_data->'overs') as over_data
-        ),
-        ball_by_ball AS (
-            SELECT
-                match_id,
-                teams,
-                batting_team,
-                (over_data->>'over')::int as over_num,
-                jsonb_array_elements(over_data->'deliveries') as delivery
-        ),
-        phase_data AS (
+        opponent = request.args.get('opponent', '')
+        season = request.args.get('season', '')
+        venue = request.args.get('venue', '')
+
+        conditions = ["batting_team = %s"]
+        params = [team_name]
+
+        if opponent:
+            conditions.append("bowling_team = %s")
+            params.append(opponent)
+
+        if season:
+            conditions.append("season = %s")
+            params.append(season)
+
+        if venue:
+            conditions.append("LOWER(venue) LIKE LOWER(%s)")
+            params.append(f'%{venue}%')
+
+        query = f"""
+        WITH phase_data AS (
             SELECT
-                CASE
-                    WHEN over_num < 10 THEN 'Powerplay'
-                    WHEN over_num >= 10 AND over_num < 40 THEN 'Middle Overs'
-                    ELSE 'Death Overs'
-                END as phase,
-                COUNT(*) as balls_faced,
-                SUM((delivery->'runs'->>'batter')::int) as runs_scored,
-                SUM(CASE WHEN delivery->'wickets' IS NOT NULL THEN 1 ELSE 0 END) as wickets_lost,
-                SUM(CASE WHEN (delivery->'runs'->>'batter')::int = 4 THEN 1 ELSE 0 END) as fours,
-                SUM(CASE WHEN (delivery->'runs'->>'batter')::int = 6 THEN 1 ELSE 0 END) as sixes
-            FROM ball_by_ball
-            WHERE batting_team = %s
-                AND teams @> %s
+                phase,
+                COUNT(DISTINCT match_id) as matches,
+                SUM(balls) as balls_faced,
+                SUM(runs) as runs_scored,
+                SUM(wickets) as wickets_lost,
+                SUM(fours) as fours,
+                SUM(sixes) as sixes,
+                SUM(dots) as dots
+            FROM team_phase_cube
+            WHERE {' AND '.join(conditions)}
             GROUP BY phase
         )
         SELECT
             phase,
+            matches,
             balls_faced,
             runs_scored,
             wickets_lost,
             fours,
             sixes,
+            dots,
             ROUND((runs_scored::numeric / NULLIF(balls_faced, 0) * 100), 2) as strike_rate,
-            ROUND((runs_scored::numeric / NULLIF(balls_faced, 0) * 6), 2) as run_rate
+            ROUND((runs_scored::numeric / NULLIF(balls_faced, 0) * 6), 2) as run_rate,
+            ROUND((dots::numeric / NULLIF(balls_faced, 0) * 100), 2) as dot_ball_percentage
         FROM phase_data
         ORDER BY
             CASE phase
@@ -220,11 +201,16 @@ def get_team_phase_performance(team_name):
         """
 
         with Database() as db:
-            results = db.execute_query(query, (team_name, f'["{team_name}"]'))
+            results = db.execute_query(query, params)
 
             return jsonify({
                 'success': True,
                 'team': team_name,
+                'filters': {
+                    'opponent': opponent or None,
+                    'season': season or None,
+                    'venue': venue or None
+                },
                 'phases': results if results else []
             })
 
@@ -251,135 +237,21 @@ def get_custom_phase_analysis(player_name):
         overs_to_analyze = int(request.args.get('overs_to_analyze', 3))
         min_balls_in_phase = int(request.args.get('min_balls_in_phase', 10))
 
-        over_end = over_start + overs_to_analyze
-
-        query = """
-        WITH player_matches AS (
-            SELECT o.id, o.metadata
-            FROM odiwc2023 o
-            WHERE o.metadata->'info'->'registry'->'people' ? %s
-        ),
-        all_innings AS (
-            SELECT
-                pm.id as match_id,
-                innings_elem as innings_data
-            FROM player_matches pm,
-            LATERAL jsonb_array_elements(pm.metadata->'innings') as innings_elem
-        ),
-        ball_by_ball AS (
-            SELECT
-                ai.match_id,
-                (over_elem->>'over')::int as over_num,
-                delivery_elem as delivery,
-                ROW_NUMBER() OVER (
-                    PARTITION BY ai.match_id, ai.innings_data
-                    ORDER BY (over_elem->>'over')::int,
-                             (SELECT ordinality FROM jsonb_array_elements(over_elem->'deliveries')
-                              WITH ORDINALITY WHERE value = delivery_elem LIMIT 1)
-                ) as ball_number
-            FROM all_innings ai,
-            LATERAL jsonb_array_elements(ai.innings_data->'overs') as over_elem,
-            LATERAL jsonb_array_elements(over_elem->'deliveries') as delivery_elem
-            WHERE delivery_elem->>'batter' = %s
-        ),
-        innings_with_criteria AS (
-            SELECT DISTINCT
-                match_id,
-                COUNT(*) FILTER (WHERE ball_number <= %s) as balls_before_phase,
-                COUNT(*) FILTER (WHERE over_num >= %s AND over_num < %s) as balls_in_phase
-            FROM ball_by_ball
-            GROUP BY match_id
-            HAVING COUNT(*) FILTER (WHERE ball_number <= %s) >= %s
-                AND COUNT(*) FILTER (WHERE over_num >= %s AND over_num < %s) >= %s
-        ),
-        phase_performance AS (
-            SELECT
-                b.match_id,
-                (b.delivery->'runs'->>'batter')::int as runs,
-                CASE WHEN b.delivery->'wickets' IS NOT NULL
-                     AND jsonb_array_length(b.delivery->'wickets') > 0
-                     AND b.delivery->'wickets'->0->>'player_out' = %s
-                     THEN 1 ELSE 0
-                END as is_dismissed
-            FROM ball_by_ball b
-            INNER JOIN innings_with_criteria iwc ON b.match_id = iwc.match_id
-            WHERE b.over_num >= %s AND b.over_num < %s
-        ),
-        run_distribution AS (
-            SELECT
-                CASE
-                    WHEN runs = 0 THEN '0'
-                    WHEN runs BETWEEN 1 AND 3 THEN '1-3'
-                    WHEN runs = 4 THEN '4'
-                    WHEN runs = 5 THEN '5'
-                    WHEN runs = 6 THEN '6'
-                    ELSE '7+'
-                END as run_range,
-                COUNT(*) as frequency
-            FROM phase_performance
-            GROUP BY run_range
+        analysis = compute_custom_phase_analysis(
+            player_name, balls_before, over_start, overs_to_analyze, min_balls_in_phase
         )
-        SELECT
-            (SELECT COUNT(*) FROM innings_with_criteria) as innings_analyzed,
-            (SELECT COALESCE(SUM(runs), 0) FROM phase_performance) as total_runs,
-            (SELECT COUNT(*) FROM phase_performance) as total_balls,
-            (SELECT COALESCE(SUM(is_dismissed), 0) FROM phase_performance) as times_dismissed,
-            (SELECT ROUND(AVG(runs)::numeric, 1) FROM phase_performance) as avg_runs_per_ball,
-            (SELECT ROUND((COALESCE(SUM(runs), 0)::numeric / NULLIF(COUNT(*), 0) * 100), 0)
-             FROM phase_performance) as strike_rate,
-            (SELECT ROUND((COALESCE(SUM(is_dismissed), 0)::numeric / NULLIF(COUNT(DISTINCT match_id), 0) * 100), 0)
-             FROM phase_performance) as dismissal_rate,
-            (SELECT json_agg(json_build_object('run_range', run_range, 'frequency', frequency)
-                             ORDER BY CASE run_range
-                                 WHEN '0' THEN 1
-                                 WHEN '1-3' THEN 2
-                                 WHEN '4' THEN 3
-                                 WHEN '5' THEN 4
-                                 WHEN '6' THEN 5
-                                 ELSE 6
-                             END)
-             FROM run_distribution) as run_distribution
-        """
 
-        with Database() as db:
-            results = db.execute_query(query, (
-                player_name, player_name,
-                balls_before, over_start, over_end,
-                balls_before, balls_before,
-                over_start, over_end, min_balls_in_phase,
-                player_name,
-                over_start, over_end
-            ))
-
-            if results and len(results) > 0:
-                result = results[0]
-                return jsonify({
-                    'success': True,
-                    'player': player_name,
-                    'parameters': {
-                        'balls_before': balls_before,
-                        'over_start': over_start,
-                        'overs_to_analyze': overs_to_analyze,
-                        'min_balls_in_phase': min_balls_in_phase
-                    },
-                    'summary': {
-                        'avg_runs_per_ball': result.get('avg_runs_per_ball') or 0,
-                        'strike_rate': result.get('strike_rate') or 0,
-                        'dismissal_rate': result.get('dismissal_rate') or 0,
-                        'innings_analyzed': result.get('innings_analyzed') or 0
-                    },
-                    'totals': {
-                        'total_runs': result.get('total_runs') or 0,
-                        'total_balls': result.get('total_balls') or 0,
-                        'times_dismissed': result.get('times_dismissed') or 0
-                    },
-                    'run_distribution': result.get('run_distribution') or []
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': 'No data found for the given criteria'
-                }), 404
+        if analysis:
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                **analysis
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'No data found for the given criteria'
+            }), 404
 
     except Exception as e:
         print(f"Error in custom phase analysis: {e}")
@@ -389,3 +261,111 @@ def get_custom_phase_analysis(player_name):
             'success': False,
             'error': str(e)
         }), 500
+
+
+@phase_performance_bp.route('/player/<player_name>/custom-analysis/sweep', methods=['GET'])
+def get_custom_phase_sweep(player_name):
+    """
+    Evaluate many custom phases in one call
+    over_start, overs_to_analyze and balls_before each accept a value,
+    a list ("1,3,5") or an inclusive range ("0-40", "0-40:5").
+    min_balls_in_phase is a single value.
+    """
+    try:
+        over_starts, overs_values, balls_before_values = parse_sweep_params(request.args)
+        min_balls_in_phase = int(request.args.get('min_balls_in_phase', 10))
+
+        result = compute_custom_phase_sweep(
+            player_name, over_starts, overs_values, balls_before_values, min_balls_in_phase
+        )
+
+        if result:
+            return jsonify({
+                'success': True,
+                'player': player_name,
+                **result
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'No data found for the given criteria'
+            }), 404
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid sweep parameter: {e}'
+        }), 400
+    except Exception as e:
+        print(f"Error in custom phase sweep: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def compute_custom_phase_analysis(player_name, balls_before=15, over_start=7,
+                                  overs_to_analyze=3, min_balls_in_phase=10):
+    """
+    Evaluate one custom phase from the player's prefix sums and shape the result.
+    Returns None when the player has no deliveries. Shared by the route and background jobs.
+    """
+    with Database() as db:
+        _, prefix = load_prefix_sums(db.cursor, player_name)
+
+    if prefix is None:
+        return None
+
+    cell = sweep(prefix, [over_start], [overs_to_analyze], [balls_before], min_balls_in_phase)[0]
+    before, in_phase = window(prefix, over_start, overs_to_analyze)
+    selected = (before[:, 0] >= balls_before) & (in_phase[:, 0] >= min_balls_in_phase)
+
+    return {
+        'parameters': {
+            'balls_before': balls_before,
+            'over_start': over_start,
+            'overs_to_analyze': overs_to_analyze,
+            'min_balls_in_phase': min_balls_in_phase
+        },
+        'summary': {
+            'avg_runs_per_ball': cell['avg_runs_per_ball'],
+            'strike_rate': cell['strike_rate'],
+            'dismissal_rate': cell['dismissal_rate'],
+            'innings_analyzed': cell['innings_analyzed']
+        },
+        'totals': {
+            'total_runs': cell['total_runs'],
+            'total_balls': cell['total_balls'],
+            'times_dismissed': cell['times_dismissed']
+        },
+        'run_distribution': run_distribution(in_phase, selected)
+    }
+
+
+def compute_custom_phase_sweep(player_name, over_starts, overs_values,
+                               balls_before_values, min_balls_in_phase=10):
+    """
+    Evaluate a grid of custom phases from one set of prefix sums.
+    Returns None when the player has no deliveries; raises ValueError for a
+    grid larger than MAX_SWEEP_CELLS.
+    """
+    cells = len(over_starts) * len(overs_values) * len(balls_before_values)
+    if cells > MAX_SWEEP_CELLS:
+        raise ValueError(f'Sweep has {cells} cells; at most {MAX_SWEEP_CELLS} are allowed')
+
+    with Database() as db:
+        innings, prefix = load_prefix_sums(db.cursor, player_name)
+
+    if prefix is None:
+        return None
+
+    return {
+        'parameters': {
+            'over_start': over_starts,
+            'overs_to_analyze': overs_values,
+            'balls_before': balls_before_values,
+            'min_balls_in_phase': min_balls_in_phase
+        },
+        'innings_available': len(innings),
+        'grid': sweep(prefix, over_starts, overs_values, balls_before_values, min_balls_in_phase)
+    }
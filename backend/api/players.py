@@ -0,0 +1,65 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+from utils.http_cache import VersionedCache
+from utils.similarity import MIN_BALLS, build_index
+
+players_bp = Blueprint('players', __name__)
+
+# One index per role, rebuilt when the dataset version changes
+similarity_indexes = VersionedCache(max_size=len(MIN_BALLS))
+
+MAX_NEIGHBOURS = 100
+
+
+def load_similarity_index(role):
+    with Database() as db:
+        return build_index(db.cursor, role)
+
+
+@players_bp.route('/<player_name>/similar', methods=['GET'])
+def get_similar_players(player_name):
+    """
+    Players with the most similar batting or bowling profile
+    Query params: k (default 10, max 100), role (batting or bowling, default batting)
+    Only players with at least 300 balls in the role are indexed.
+    """
+    try:
+        k = min(int(request.args.get('k', 10)), MAX_NEIGHBOURS)
+        role = request.args.get('role', 'batting')
+
+        if role not in MIN_BALLS:
+            return jsonify({
+                'success': False,
+                'error': f"role must be one of: {', '.join(MIN_BALLS)}"
+            }), 400
+
+        index = similarity_indexes.get(role, lambda: load_similarity_index(role))
+        name = index.resolve(player_name)
+
+        if not name:
+            return jsonify({
+                'success': False,
+                'error': f'No {role} profile for this player (at least {MIN_BALLS[role]} balls required)'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'player': name,
+            'role': role,
+            'balls': int(index.balls[index.position[name]]),
+            'profile': index.profile(index.position[name]),
+            'players_indexed': len(index.players),
+            'similar': index.neighbours(name, k)
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid parameter: {e}'
+        }), 400
+    except Exception as e:
+        print(f"Error in similar players: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -1,8 +1,77 @@
 from flask import Blueprint, request, jsonify
 from models.database import Database
+from utils.http_cache import VersionedCache
+from utils.scorecard import build_scorecard
+import json
+import re
 
 search_bp = Blueprint('search', __name__)
 
+MAX_PROJECTED_FIELDS = 20
+MAX_BULK_SCORECARDS = 50
+
+# Per-match payloads precomputed at ingest, cached per dataset version
+match_cache = VersionedCache()
+FIELD_SEGMENT = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)((?:\[\d+\])*)$')
+
+# Named field sets for common views of a match
+FIELD_PRESETS = {
+    'summary': [
+        'info.dates', 'info.teams', 'info.venue', 'info.city', 'info.season',
+        'info.event', 'info.toss', 'info.outcome', 'info.player_of_match',
+        'innings[0].team', 'innings[1].team'
+    ]
+}
+
+
+# Rebuilds the raw match document for a match_info row aliased as mi
+MATCH_DOCUMENT_SQL = """
+    (CASE WHEN mi.meta IS NOT NULL THEN jsonb_build_object('meta', mi.meta) ELSE '{}'::jsonb END)
+    || jsonb_build_object(
+        'info', mi.info,
+        'innings', COALESCE(
+            (SELECT jsonb_agg(mn.data ORDER BY mn.innings_no)
+             FROM match_innings mn WHERE mn.match_id = mi.id),
+            '[]'::jsonb
+        )
+    )
+"""
+
+
+def projection_sql(path):
+    """
+    SQL expression (and params) extracting a parsed field path from the split
+    match tables. Only the innings a path names is read. Raises ValueError
+    for paths outside the match document.
+    """
+    root, rest = path[0], path[1:]
+    if root in ('info', 'meta'):
+        return f'mi.{root} #> %s::text[]', [rest]
+    if root == 'innings' and rest and rest[0].isdigit():
+        return """(SELECT mn.data #> %s::text[] FROM match_innings mn
+                   WHERE mn.match_id = mi.id AND mn.innings_no = %s)""", [rest[1:], int(rest[0])]
+    if root == 'innings' and not rest:
+        return """(SELECT jsonb_agg(mn.data ORDER BY mn.innings_no) FROM match_innings mn
+                   WHERE mn.match_id = mi.id)""", []
+    if root == 'innings':
+        raise ValueError(f"Invalid field path: innings fields need an index, e.g. innings[0].{rest[0]}")
+    raise ValueError(f"Invalid field path: unknown field '{root}' (paths start with info, meta or innings)")
+
+
+def parse_field_path(field):
+    """
+    Convert a projection like 'innings[0].overs' into a JSONB path
+    ['innings', '0', 'overs']. Returns None for malformed input.
+    """
+    path = []
+    for segment in field.split('.'):
+        match = FIELD_SEGMENT.match(segment)
+        if not match:
+            return None
+        path.append(match.group(1))
+        path.extend(re.findall(r'\d+', match.group(2)))
+    return path
+
 @search_bp.route('/matches', methods=['GET'])
 def search_matches():
     """
@@ -25,54 +94,56 @@ def search_matches():
         query = """
             SELECT
                 id,
-                metadata->'info'->>'match_type_number' as match_number,
-                metadata->'info'->>'venue' as venue,
-                metadata->'info'->>'city' as city,
-                metadata->'info'->'dates'->0 as match_date,
-                metadata->'info'->'teams' as teams,
-                metadata->'info'->'outcome'->>'winner' as winner,
-                metadata->'info'->'outcome'->'by' as win_margin,
-                metadata->'info'->>'season' as season,
-                metadata->'info'->'player_of_match' as player_of_match,
-                metadata->'info'->'event'->>'name' as event_name
-            FROM odiwc2023
+                info->>'match_type_number' as match_number,
+                info->>'venue' as venue,
+                info->>'city' as city,
+                info->'dates'->0 as match_date,
+                info->'teams' as teams,
+                info->'outcome'->>'winner' as winner,
+                info->'outcome'->'by' as win_margin,
+                info->>'season' as season,
+                info->'player_of_match' as player_of_match,
+                info->'event'->>'name' as event_name
+            FROM match_info
             WHERE 1=1
         """
 
         params = []
 
         if team:
-            query += " AND (metadata->'info'->'teams' @> %s)"
-            params.append(f'["{team}"]')
+            query += " AND (info->'teams' @> %s)"
+            params.append(json.dumps([team]))
 
         if venue:
-            query += " AND LOWER(metadata->'info'->>'venue') LIKE LOWER(%s)"
+            query += " AND LOWER(info->>'venue') LIKE LOWER(%s)"
             params.append(f'%{venue}%')
 
         if date_from:
-            query += " AND metadata->'info'->'dates'->0 >= %s"
+            query += " AND info->'dates'->0 >= %s"
             params.append(f'"{date_from}"')
 
         if date_to:
-            query += " AND metadata->'info'->'dates'->0 <= %s"
+            query += " AND info->'dates'->0 <= %s"
             params.append(f'"{date_to}"')
 
         if player:
+            # Both expressions are GIN-indexed (see models/indexes.py);
+            # the registry lists everyone who played in the match
             query += """ AND (
-                metadata->'info'->'players' @> %s
-                OR metadata->'info'->'player_of_match' @> %s
+                info->'registry'->'people' ? %s
+                OR info->'player_of_match' @> %s
             )"""
-            params.extend([f'{{"{player}": []}}', f'["{player}"]'])
+            params.extend([player, json.dumps([player])])
 
         if season:
-            query += " AND metadata->'info'->>'season' = %s"
+            query += " AND info->>'season' = %s"
             params.append(season)
 
         # Get total count
         count_query = f"SELECT COUNT(*) as total FROM ({query}) as filtered"
 
         # Add pagination
-        query += " ORDER BY metadata->'info'->'dates'->0 DESC"
+        query += " ORDER BY info->'dates'->0 DESC"
         query += f" LIMIT {limit} OFFSET {offset}"
 
         with Database() as db:
@@ -105,8 +176,8 @@ def search_players():
     """Get list of all unique players"""
     try:
         query = """
-            SELECT DISTINCT jsonb_object_keys(metadata->'info'->'registry'->'people') as player_name
-            FROM odiwc2023
+            SELECT DISTINCT jsonb_object_keys(info->'registry'->'people') as player_name
+            FROM match_info
             ORDER BY player_name
         """
 
@@ -130,8 +201,8 @@ def search_teams():
     """Get list of all unique teams"""
     try:
         query = """
-            SELECT DISTINCT jsonb_array_elements_text(metadata->'info'->'teams') as team_name
-            FROM odiwc2023
+            SELECT DISTINCT jsonb_array_elements_text(info->'teams') as team_name
+            FROM match_info
             ORDER BY team_name
         """
 
@@ -155,9 +226,9 @@ def search_venues():
     """Get list of all unique venues"""
     try:
         query = """
-            SELECT DISTINCT metadata->'info'->>'venue' as venue
-            FROM odiwc2023
-            WHERE metadata->'info'->>'venue' IS NOT NULL
+            SELECT DISTINCT info->>'venue' as venue
+            FROM match_info
+            WHERE info->>'venue' IS NOT NULL
             ORDER BY venue
         """
 
@@ -181,9 +252,9 @@ def search_seasons():
     """Get list of all unique seasons"""
     try:
         query = """
-            SELECT DISTINCT metadata->'info'->>'season' as season
-            FROM odiwc2023
-            WHERE metadata->'info'->>'season' IS NOT NULL
+            SELECT DISTINCT info->>'season' as season
+            FROM match_info
+            WHERE info->>'season' IS NOT NULL
             ORDER BY season DESC
         """
 
@@ -204,21 +275,69 @@ def search_seasons():
 
 @search_bp.route('/match/<match_id>', methods=['GET'])
 def get_match_details(match_id):
-    """Get complete details of a specific match"""
+    """
+    Get details of a specific match
+    Query params: fields - comma separated JSON paths (e.g. info,innings[0].overs)
+    or a preset name (summary). Without it the full document is returned.
+    """
     try:
-        query = """
-            SELECT id, metadata
-            FROM odiwc2023
-            WHERE id = %s
-        """
+        fields = []
+        for field in request.args.get('fields', '').split(','):
+            field = field.strip()
+            if field:
+                fields.extend(FIELD_PRESETS.get(field, [field]))
+
+        if not fields:
+            # Reassemble the original document from the header and innings rows
+            query = f"""
+                SELECT id, {MATCH_DOCUMENT_SQL} as metadata
+                FROM match_info mi
+                WHERE id = %s
+            """
+            params = [match_id]
+        else:
+            fields = list(dict.fromkeys(fields))
+            if len(fields) > MAX_PROJECTED_FIELDS:
+                return jsonify({
+                    'success': False,
+                    'error': f'Too many fields: {len(fields)} requested, at most {MAX_PROJECTED_FIELDS} are allowed'
+                }), 400
+            paths = [parse_field_path(field) for field in fields]
+            invalid = [field for field, path in zip(fields, paths) if path is None]
+            if invalid:
+                return jsonify({
+                    'success': False,
+                    'error': f"Invalid field path: {', '.join(invalid)}"
+                }), 400
+
+            # Extract only the requested paths in Postgres so the rest of the
+            # document is never read, serialized or sent
+            selects = []
+            params = []
+            for i, path in enumerate(paths):
+                expression, expression_params = projection_sql(path)
+                selects.append(f'{expression} as f{i}')
+                params.extend(expression_params)
+            query = f"""
+                SELECT id, {', '.join(selects)}
+                FROM match_info mi
+                WHERE id = %s
+            """
+            params.append(match_id)
 
         with Database() as db:
-            results = db.execute_query(query, (match_id,))
+            results = db.execute_query(query, params)
 
             if results and len(results) > 0:
+                row = results[0]
+                if fields:
+                    row = {
+                        'id': row['id'],
+                        'fields': {field: row[f'f{i}'] for i, field in enumerate(fields)}
+                    }
                 return jsonify({
                     'success': True,
-                    'data': results[0]
+                    'data': row
                 })
             else:
                 return jsonify({
@@ -226,6 +345,130 @@ def get_match_details(match_id):
                     'error': 'Match not found'
                 }), 404
 
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def load_match_progression(match_id):
+    with Database() as db:
+        results = db.execute_query(
+            "SELECT innings FROM match_progression WHERE match_id = %s", (match_id,)
+        )
+    return results[0]['innings'] if results else None
+
+
+@search_bp.route('/match/<match_id>/progression', methods=['GET'])
+def get_match_progression(match_id):
+    """
+    Over-by-over arrays for worm and Manhattan charts
+    Per innings: runs_per_over, cumulative_runs, wickets_per_over and, for the
+    chase, required_run_rate after each over. One slot per allotted over.
+    """
+    try:
+        innings = match_cache.get(('progression', match_id), lambda: load_match_progression(match_id))
+
+        if innings is not None:
+            return jsonify({
+                'success': True,
+                'match_id': match_id,
+                'innings': innings
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Match not found'
+            }), 404
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def load_scorecards(keys):
+    """Build scorecards for ('scorecard', match_id) cache keys in one query"""
+    match_ids = [match_id for _, match_id in keys]
+    with Database() as db:
+        results = db.execute_query(f"""
+            SELECT id, {MATCH_DOCUMENT_SQL} as metadata
+            FROM match_info mi
+            WHERE id = ANY(%s)
+        """, (match_ids,)) or []
+    return {('scorecard', row['id']): build_scorecard(row['metadata']) for row in results}
+
+
+@search_bp.route('/match/<match_id>/scorecard', methods=['GET'])
+def get_match_scorecard(match_id):
+    """
+    Batting and bowling scorecard for each innings
+    Batting order with dismissals and fielders, bowling figures with maidens,
+    extras and fall of wickets
+    """
+    try:
+        key = ('scorecard', match_id)
+        scorecard = match_cache.get_many([key], load_scorecards).get(key)
+
+        if scorecard is not None:
+            return jsonify({
+                'success': True,
+                'match_id': match_id,
+                **scorecard
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Match not found'
+            }), 404
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@search_bp.route('/matches/scorecards', methods=['GET'])
+def get_match_scorecards():
+    """
+    Scorecards for several matches in one call
+    Query params: ids - comma separated match ids (max 50)
+    Unknown ids are listed under not_found.
+    """
+    try:
+        match_ids = list(dict.fromkeys(i.strip() for i in request.args.get('ids', '').split(',') if i.strip()))
+
+        if not match_ids:
+            return jsonify({
+                'success': False,
+                'error': 'ids is required'
+            }), 400
+
+        if len(match_ids) > MAX_BULK_SCORECARDS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_BULK_SCORECARDS} ids per request'
+            }), 400
+
+        scorecards = match_cache.get_many([('scorecard', match_id) for match_id in match_ids], load_scorecards)
+
+        return jsonify({
+            'success': True,
+            'scorecards': {
+                match_id: scorecards[('scorecard', match_id)]
+                for match_id in match_ids if ('scorecard', match_id) in scorecards
+            },
+            'not_found': [match_id for match_id in match_ids if ('scorecard', match_id) not in scorecards]
+        })
+
     except Exception as e:
         return jsonify({
             'success': False,
@@ -0,0 +1,70 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+from utils.sequences import get_sequence_store, query_pattern
+
+sequences_bp = Blueprint('sequences', __name__)
+
+FILTER_PARAMS = ('batter', 'bowler', 'phase', 'team', 'season')
+MAX_GROUPS = 200
+
+
+def compute_sequence_pattern(params):
+    """query_pattern for query params or a job's params"""
+    with Database() as db:
+        store = get_sequence_store(db.cursor)
+    if store is None:
+        raise LookupError('No deliveries loaded (run manage.py rebuild-derived)')
+
+    return query_pattern(
+        store,
+        params.get('pattern', ''),
+        params.get('outcome', 'W'),
+        within=int(params.get('within', 3)),
+        group_by=params.get('group_by') or None,
+        filters={name: params.get(name) for name in FILTER_PARAMS},
+        overlap=str(params.get('overlap', '')).lower() in ('1', 'true', 'yes'),
+        min_trials=int(params.get('min_trials', 20)),
+        limit=min(int(params.get('limit', 50)), MAX_GROUPS)
+    )
+
+
+@sequences_bp.route('/pattern', methods=['GET'])
+def get_pattern_outcomes():
+    """
+    How often an outcome follows a ball-by-ball pattern, e.g. a wicket within
+    3 balls of 4+ consecutive dots: pattern=.{4,}&outcome=W&within=3
+    Query params:
+    - pattern: sequence of ball classes (. 1 2 3 4 6 W, B boundary, R scoring ball,
+      * any, [..] any of, !x not x), each optionally followed by {n}, {n,}, {n,m} or +
+    - outcome: single ball class (default W)
+    - within: balls after the pattern (default 3, max 60)
+    - group_by: batter, bowler, phase or team (of the ball after the pattern)
+    - batter, bowler, phase, team, season: filters on that same ball
+    - overlap: count every ball the pattern holds at, not just where it first completes
+    - min_trials (default 20), limit (default 50) for grouped results
+    Results include the baseline rate of the outcome from any ball and the lift.
+    """
+    try:
+        result = compute_sequence_pattern(request.args)
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid pattern parameter: {e}'
+        }), 400
+    except LookupError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    except Exception as e:
+        print(f"Error in sequence pattern query: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
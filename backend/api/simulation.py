@@ -0,0 +1,82 @@
+import os
+from flask import Blueprint, request, jsonify
+from models.database import Database
+from utils.simulation import simulate_innings
+
+simulation_bp = Blueprint('simulation', __name__)
+
+MAX_WORKERS = os.cpu_count() or 1
+# Synchronous GETs stay small and in-process; larger runs go through the innings_simulation job
+MAX_SYNC_SIMULATIONS = 100000
+
+
+def split_names(value):
+    """Accept a comma-separated string or a list of names"""
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in (value or '').split(',') if v.strip()]
+
+
+def parse_simulation_params(params):
+    """Keyword arguments for simulate_innings from query params or a job's params"""
+    seed = params.get('seed')
+    return {
+        'batters': split_names(params.get('batters')),
+        'attack': split_names(params.get('attack')),
+        'over_start': int(params.get('over_start', 40)),
+        'overs': int(params.get('overs', 10)),
+        'wickets_lost': int(params.get('wickets_lost', 0)),
+        'simulations': int(params.get('simulations', 10000)),
+        'seed': int(seed) if seed not in (None, '') else None,
+        'workers': max(1, min(int(params.get('workers', 1)), MAX_WORKERS))
+    }
+
+
+def compute_innings_simulation(params):
+    with Database() as db:
+        return simulate_innings(db.cursor, **parse_simulation_params(params))
+
+
+@simulation_bp.route('/innings', methods=['GET'])
+def simulate():
+    """
+    Monte Carlo simulation of a batting lineup against a bowling attack
+    Query params:
+    - batters: batting order, comma separated (the first two start at the crease)
+    - attack: bowler names or types (pace, spin), comma separated, bowling overs in rotation
+    - over_start: first over, 0-based (default 40)
+    - overs: number of overs (default 10)
+    - wickets_lost: wickets already down (default 0)
+    - simulations: innings to simulate (default 10000, max 100000)
+    - seed: reuse the seed from a previous response to reproduce it
+    Runs in the request process. Larger runs (up to 1000000 simulations,
+    with a workers param for a process pool) go through the innings_simulation job.
+    """
+    try:
+        kwargs = parse_simulation_params(request.args)
+        if kwargs['simulations'] > MAX_SYNC_SIMULATIONS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {MAX_SYNC_SIMULATIONS} simulations per request; '
+                         'submit larger runs as an innings_simulation job'
+            }), 400
+
+        with Database() as db:
+            result = simulate_innings(db.cursor, **{**kwargs, 'workers': 1})
+
+        return jsonify({
+            'success': True,
+            **result
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid simulation parameter: {e}'
+        }), 400
+    except Exception as e:
+        print(f"Error in innings simulation: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,118 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+from utils.helpers import normalize_venue
+from utils.name_matcher import levenshtein_distance
+
+venues_bp = Blueprint('venues', __name__)
+
+VENUE_MATCH_THRESHOLD = 60
+
+
+def venue_similarity(query_key, venue_key, city):
+    """Score from 0 to 100 for how well a normalized query names a venue"""
+    if query_key == venue_key:
+        return 100
+    if query_key in venue_key:
+        return 90
+    if city and query_key == city.lower():
+        return 80
+
+    distance = levenshtein_distance(query_key, venue_key)
+    return round(max(0, 1 - distance / max(len(query_key), len(venue_key))) * 100)
+
+
+def resolve_venue(db, name):
+    """
+    Find the venue_profiles row for a user-supplied venue name.
+    Returns (profile, score) or (None, 0).
+    """
+    query_key = normalize_venue(name)
+    if not query_key:
+        return None, 0
+
+    exact = db.execute_query("SELECT * FROM venue_profiles WHERE venue_key = %s", (query_key,))
+    if exact:
+        return exact[0], 100
+
+    candidates = db.execute_query("SELECT venue_key, city, matches FROM venue_profiles") or []
+    scored = [
+        (venue_similarity(query_key, c['venue_key'], c['city']), c['matches'], c['venue_key'])
+        for c in candidates
+    ]
+    scored = [s for s in scored if s[0] >= VENUE_MATCH_THRESHOLD]
+    if not scored:
+        return None, 0
+
+    # Prefer the best score, then the busier ground
+    score, _, venue_key = max(scored)
+    profile = db.execute_query("SELECT * FROM venue_profiles WHERE venue_key = %s", (venue_key,))
+    return (profile[0], score) if profile else (None, 0)
+
+
+@venues_bp.route('', methods=['GET'])
+def list_venues():
+    """
+    List venue profiles, busiest first
+    Query params: limit (default 50)
+    """
+    try:
+        limit = int(request.args.get('limit', 50))
+
+        query = """
+        SELECT
+            venue_key,
+            venue,
+            city,
+            matches,
+            avg_first_innings,
+            chase_success_rate
+        FROM venue_profiles
+        ORDER BY matches DESC, venue
+        LIMIT %s
+        """
+
+        with Database() as db:
+            results = db.execute_query(query, (limit,))
+
+            return jsonify({
+                'success': True,
+                'data': results if results else []
+            })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@venues_bp.route('/<venue>', methods=['GET'])
+def get_venue_profile(venue):
+    """
+    Get the precomputed profile for a venue
+    Accepts any spelling of the ground ("Bay Oval, Mount Maunganui", "bay oval")
+    and falls back to fuzzy matching on the ground name or city
+    """
+    try:
+        with Database() as db:
+            profile, score = resolve_venue(db, venue)
+
+            if profile:
+                return jsonify({
+                    'success': True,
+                    'query': venue,
+                    'match_score': score,
+                    'venue': profile
+                })
+            else:
+                return jsonify({
+                    'success': False,
+                    'error': 'Venue not found'
+                }), 404
+
+    except Exception as e:
+        print(f"Error in venue profile: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
@@ -0,0 +1,139 @@
+from flask import Blueprint, request, jsonify
+from models.database import Database
+from utils.http_cache import VersionedCache
+from utils.win_probability import load_model, load_states, predict
+
+win_probability_bp = Blueprint('win_probability', __name__)
+
+win_cache = VersionedCache()
+
+MODEL_NOT_TRAINED = 'Win probability model has not been trained (run manage.py train-win-model)'
+
+
+class ModelNotTrainedError(LookupError):
+    pass
+
+
+def match_win_probability(match_id):
+    """Per-ball win probability for one match, scored in a single vectorized pass"""
+    with Database() as db:
+        model = load_model(db.cursor)
+        if model is None:
+            raise ModelNotTrainedError(MODEL_NOT_TRAINED)
+        states = load_states(db.cursor, match_id)
+
+    if not states:
+        return None
+
+    probability = predict(model, states)
+    innings = []
+    for innings_no in (0, 1):
+        rows = states['innings_no'] == innings_no
+        if not rows.any():
+            continue
+        innings.append({
+            'innings_no': innings_no,
+            'team': states['batting_team'][rows][0],
+            'balls': [f"{o}.{b}" for o, b in zip(states['over_num'][rows], states['ball_in_over'][rows])],
+            'score': states['score'][rows].tolist(),
+            'wickets': states['wickets'][rows].tolist(),
+            'win_probability': probability[rows].round(4).tolist()
+        })
+
+    return {
+        'batting_first': states['batting_first'][0],
+        'winner': states['winner'][0],
+        'innings': innings
+    }
+
+
+@win_probability_bp.route('/match/<match_id>', methods=['GET'])
+def get_match_win_probability(match_id):
+    """
+    Ball-by-ball win probability for a match
+    win_probability is for the team batting first, after each delivery
+    """
+    try:
+        result = win_cache.get(('match', match_id), lambda: match_win_probability(match_id))
+
+        if result is not None:
+            return jsonify({
+                'success': True,
+                'match_id': match_id,
+                **result
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Match not found'
+            }), 404
+
+    except ModelNotTrainedError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 503
+    except Exception as e:
+        print(f"Error in match win probability: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@win_probability_bp.route('/comebacks', methods=['GET'])
+def get_biggest_comebacks():
+    """
+    Matches won from the lowest win probability
+    Query params: limit (default 20), team (optional), season (optional)
+    """
+    try:
+        limit = int(request.args.get('limit', 20))
+        team = request.args.get('team', '')
+        season = request.args.get('season', '')
+
+        conditions = ["1=1"]
+        params = []
+
+        if team:
+            conditions.append("c.winner = %s")
+            params.append(team)
+
+        if season:
+            conditions.append("mi.info->>'season' = %s")
+            params.append(season)
+
+        query = f"""
+        SELECT
+            c.match_id,
+            c.winner,
+            mi.info->'teams' as teams,
+            mi.info->'dates'->>0 as match_date,
+            mi.info->>'venue' as venue,
+            ROUND(c.min_probability::numeric, 4) as min_probability,
+            c.innings_no,
+            c.over_ball,
+            c.score,
+            c.wickets
+        FROM match_comebacks c
+        JOIN match_info mi ON mi.id = c.match_id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY c.min_probability, match_date DESC
+        LIMIT %s
+        """
+        params.append(limit)
+
+        with Database() as db:
+            results = db.execute_query(query, params)
+
+            return jsonify({
+                'success': True,
+                'data': results if results else []
+            })
+
+    except Exception as e:
+        print(f"Error in comebacks: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
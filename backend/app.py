@@ -2,6 +2,9 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from dotenv import load_dotenv
 import os
+from utils.http_cache import init_http_cache
+from utils.compression import init_compression
+from utils.serialization import init_json_provider
 
 # Import API blueprints
 from api.search import search_bp
@@ -13,6 +16,15 @@ from api.vs_bowler import vs_bowler_bp
 from api.motm import motm_bp
 from api.admin import admin_bp
 from api.player_profile import player_profile_bp
+from api.compare import compare_bp
+from api.jobs import jobs_bp
+from api.venues import venues_bp
+from api.partnerships import partnerships_bp
+from api.win_probability import win_probability_bp
+from api.simulation import simulation_bp
+from api.players import players_bp
+from api.fantasy import fantasy_bp
+from api.sequences import sequences_bp
 
 # Load environment variables
 load_dotenv()
@@ -21,9 +33,18 @@ load_dotenv()
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
 
+# orjson-backed jsonify when available
+init_json_provider(app)
+
 # Enable CORS
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
+# ETag / conditional GET keyed on the dataset version
+init_http_cache(app)
+
+# gzip / brotli for large responses
+init_compression(app)
+
 # Register blueprints
 app.register_blueprint(search_bp, url_prefix='/api/search')
 app.register_blueprint(phase_performance_bp, url_prefix='/api/phase-performance')
@@ -34,6 +55,15 @@ app.register_blueprint(vs_bowler_bp, url_prefix='/api/vs-bowler')
 app.register_blueprint(motm_bp, url_prefix='/api/motm')
 app.register_blueprint(admin_bp, url_prefix='/api/admin')
 app.register_blueprint(player_profile_bp, url_prefix='/api/player-profile')
+app.register_blueprint(compare_bp, url_prefix='/api/compare')
+app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+app.register_blueprint(venues_bp, url_prefix='/api/venues')
+app.register_blueprint(partnerships_bp, url_prefix='/api/partnerships')
+app.register_blueprint(win_probability_bp, url_prefix='/api/win-probability')
+app.register_blueprint(simulation_bp, url_prefix='/api/simulate')
+app.register_blueprint(players_bp, url_prefix='/api/players')
+app.register_blueprint(fantasy_bp, url_prefix='/api/fantasy')
+app.register_blueprint(sequences_bp, url_prefix='/api/sequences')
 
 @app.route('/')
 def home():
@@ -49,7 +79,16 @@ def home():
             'vs_bowler': '/api/vs-bowler',
             'motm': '/api/motm',
             'admin': '/api/admin',
-            'player_profile': '/api/player-profile'
+            'player_profile': '/api/player-profile',
+            'compare': '/api/compare',
+            'jobs': '/api/jobs',
+            'venues': '/api/venues',
+            'partnerships': '/api/partnerships',
+            'win_probability': '/api/win-probability',
+            'simulate': '/api/simulate',
+            'players': '/api/players',
+            'fantasy': '/api/fantasy',
+            'sequences': '/api/sequences'
         }
     })
 
@@ -0,0 +1,11 @@
+"""
+Gunicorn settings, loaded automatically when gunicorn starts from backend/
+The background job queue (utils/jobs.py) keeps job state in process memory, so a job
+polled from another worker process would 404. Run one worker and scale with threads.
+"""
+import os
+
+# Fixed, not read from WEB_CONCURRENCY: more than one process splits the job queue
+workers = 1
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
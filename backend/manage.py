@@ -0,0 +1,159 @@
+"""
+Database management commands for the ODI Cricket Analytics backend
+
+Usage:
+    python manage.py init-schema
+    python manage.py bump-version
+    python manage.py rebuild-derived
+    python manage.py create-indexes
+    python manage.py train-win-model
+    python manage.py score-fantasy [--name NAME] [--rules rules.json]
+"""
+import argparse
+import json
+import sys
+from models.database import Database
+from models.schema import ensure_schema, bump_dataset_version
+from models.indexes import JSONB_INDEXES, INDEX_PROBES, explain_probe
+from utils.ingest import rebuild_derived
+from utils.fantasy import score_all
+from utils.win_probability import load_states, save_model, score_all_matches, train
+
+
+def cmd_init_schema(args):
+    """Create the tables maintained alongside odiwc2023"""
+    with Database() as db:
+        ensure_schema(db.cursor)
+        db.conn.commit()
+    print("Schema is up to date")
+
+
+def cmd_bump_version(args):
+    """Invalidate HTTP caches after changing data outside the loader"""
+    with Database() as db:
+        ensure_schema(db.cursor)
+        version = bump_dataset_version(db.cursor)
+        db.conn.commit()
+    print(f"Dataset version is now {version}")
+
+
+def cmd_rebuild_derived(args):
+    """Recompute every ingest-maintained table from odiwc2023"""
+    with Database() as db:
+        ensure_schema(db.cursor)
+        processed = rebuild_derived(db.conn, progress=lambda n: print(f"Rebuilt {n} matches...", end='\r'))
+        version = bump_dataset_version(db.cursor)
+        db.conn.commit()
+    print(f"\nRebuilt derived tables for {processed} matches (dataset version {version})")
+
+
+def cmd_create_indexes(args):
+    """Create JSONB expression indexes and report per-query latency before/after"""
+    with Database() as db:
+        db.conn.autocommit = True
+        cursor = db.conn.cursor()
+
+        before = {probe['name']: explain_probe(cursor, probe) for probe in INDEX_PROBES}
+
+        for name, statement in JSONB_INDEXES:
+            print(f"Creating {name}...")
+            cursor.execute(statement)
+        cursor.execute("ANALYZE odiwc2023")
+        cursor.execute("ANALYZE match_info")
+
+        after = {probe['name']: explain_probe(cursor, probe) for probe in INDEX_PROBES}
+        cursor.close()
+
+    print()
+    print(f"{'Query':<40} {'Before (ms)':>12} {'After (ms)':>12}  Index used")
+    print("-" * 82)
+    missing = []
+    for probe in INDEX_PROBES:
+        before_ms, _ = before[probe['name']]
+        after_ms, uses_index = after[probe['name']]
+        print(f"{probe['name']:<40} {before_ms:>12.2f} {after_ms:>12.2f}  "
+              f"{probe['index'] if uses_index else 'NO'}")
+        if not uses_index:
+            missing.append(probe['name'])
+
+    if missing:
+        print(f"\nWarning: planner did not use the expected index for: {', '.join(missing)}")
+        return 1
+    return 0
+
+
+def cmd_train_win_model(args):
+    """Fit the win-probability model from deliveries and rescore every match"""
+    with Database() as db:
+        ensure_schema(db.cursor)
+        states = load_states(db.cursor)
+        if not states:
+            print("No deliveries found; run rebuild-derived first")
+            return 1
+        model, metrics = train(states)
+        save_model(db.cursor, model, metrics)
+        scored = score_all_matches(db.cursor, model, states)
+        version = bump_dataset_version(db.cursor)
+        db.conn.commit()
+
+    for name, value in metrics.items():
+        print(f"{name:<20} {value}")
+    print(f"Scored {scored} decided matches (dataset version {version})")
+    return 0
+
+
+def cmd_score_fantasy(args):
+    """Score fantasy points for every match under a rule set and report the timing"""
+    custom_rules = None
+    if args.rules:
+        with open(args.rules) as f:
+            custom_rules = json.load(f)
+
+    with Database() as db:
+        ensure_schema(db.cursor)
+        timings = score_all(db.cursor, args.name, custom_rules)
+        version = bump_dataset_version(db.cursor)
+        db.conn.commit()
+
+    print(f"Scored {timings['rows']} player-matches across {timings['matches']} matches "
+          f"under '{args.name}' (dataset version {version})")
+    for stage in ('load', 'score', 'save', 'total'):
+        print(f"{stage:<8} {timings[f'{stage}_seconds']:>8.3f}s")
+    return 0
+
+
+COMMANDS = {
+    'init-schema': cmd_init_schema,
+    'bump-version': cmd_bump_version,
+    'rebuild-derived': cmd_rebuild_derived,
+    'create-indexes': cmd_create_indexes,
+    'train-win-model': cmd_train_win_model,
+    'score-fantasy': cmd_score_fantasy,
+}
+
+
+def add_score_fantasy_arguments(parser):
+    parser.add_argument('--name', default='default', help='Rule set name to store the points under')
+    parser.add_argument('--rules', help='JSON file overriding keys of utils.fantasy.DEFAULT_RULES')
+
+
+COMMAND_ARGUMENTS = {
+    'score-fantasy': add_score_fantasy_arguments,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ODI Cricket Analytics database management')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for name, func in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=func.__doc__)
+        if name in COMMAND_ARGUMENTS:
+            COMMAND_ARGUMENTS[name](subparser)
+
+    args = parser.parse_args(argv)
+    return COMMANDS[args.command](args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
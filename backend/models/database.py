@@ -1,10 +1,20 @@
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Return NUMERIC columns (ROUND(...) results) as floats instead of Decimal so the
+# JSON encoder can serialize rows natively without a per-value fallback
+DEC2FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    'DEC2FLOAT',
+    lambda value, cursor: float(value) if value is not None else None
+)
+psycopg2.extensions.register_type(DEC2FLOAT)
+
 class Database:
     def __init__(self):
         self.conn_params = {
@@ -0,0 +1,122 @@
+"""
+Expression indexes on the JSONB paths the blueprints filter on
+Each index is defined on exactly the expression used in the queries, since
+Postgres can only use an expression index when the query repeats it verbatim.
+"""
+
+JSONB_INDEXES = [
+    # match_info holds the header used by search and admin listings
+    # info->'teams' @> '["India"]'
+    ('idx_match_info_teams',
+     "CREATE INDEX IF NOT EXISTS idx_match_info_teams ON match_info "
+     "USING GIN ((info->'teams') jsonb_path_ops)"),
+    # info->'player_of_match' @> '["V Kohli"]'
+    ('idx_match_info_player_of_match',
+     "CREATE INDEX IF NOT EXISTS idx_match_info_player_of_match ON match_info "
+     "USING GIN ((info->'player_of_match') jsonb_path_ops)"),
+    # info->'registry'->'people' ? 'V Kohli'
+    # The ? operator needs the default jsonb_ops class
+    ('idx_match_info_registry_people',
+     "CREATE INDEX IF NOT EXISTS idx_match_info_registry_people ON match_info "
+     "USING GIN ((info->'registry'->'people'))"),
+    # info->>'season' = '2023/24'
+    ('idx_match_info_season',
+     "CREATE INDEX IF NOT EXISTS idx_match_info_season ON match_info "
+     "((info->>'season'))"),
+    # info->'dates'->0 range filters and ORDER BY
+    ('idx_match_info_first_date',
+     "CREATE INDEX IF NOT EXISTS idx_match_info_first_date ON match_info "
+     "((info->'dates'->0))"),
+
+    # odiwc2023 paths still used by the delivery-level stats routes and admin export
+    # metadata->'info'->'registry'->'people' ? 'V Kohli'
+    ('idx_odi_registry_people',
+     "CREATE INDEX IF NOT EXISTS idx_odi_registry_people ON odiwc2023 "
+     "USING GIN ((metadata->'info'->'registry'->'people'))"),
+    # metadata->'info'->'teams' @> '["India"]'
+    ('idx_odi_info_teams',
+     "CREATE INDEX IF NOT EXISTS idx_odi_info_teams ON odiwc2023 "
+     "USING GIN ((metadata->'info'->'teams') jsonb_path_ops)"),
+    # metadata->'info'->>'season' = '2023/24'
+    ('idx_odi_info_season',
+     "CREATE INDEX IF NOT EXISTS idx_odi_info_season ON odiwc2023 "
+     "((metadata->'info'->>'season'))"),
+]
+
+# Representative queries for each index, used to verify plans and time them.
+# Parameters are chosen to be selective so the planner prefers the index.
+INDEX_PROBES = [
+    {
+        'name': 'search_matches team filter',
+        'index': 'idx_match_info_teams',
+        'query': "SELECT id FROM match_info WHERE (info->'teams' @> %s)",
+        'params': ('["Netherlands"]',)
+    },
+    {
+        'name': 'search_matches player of match filter',
+        'index': 'idx_match_info_player_of_match',
+        'query': "SELECT id FROM match_info WHERE info->'player_of_match' @> %s",
+        'params': ('["V Kohli"]',)
+    },
+    {
+        'name': 'search_matches player filter',
+        'index': 'idx_match_info_registry_people',
+        'query': "SELECT id FROM match_info WHERE info->'registry'->'people' ? %s",
+        'params': ('V Kohli',)
+    },
+    {
+        'name': 'search_matches season filter',
+        'index': 'idx_match_info_season',
+        'query': "SELECT id FROM match_info WHERE info->>'season' = %s",
+        'params': ('2019',)
+    },
+    {
+        'name': 'search_matches date range filter',
+        'index': 'idx_match_info_first_date',
+        'query': "SELECT id FROM match_info WHERE info->'dates'->0 >= %s "
+                 "AND info->'dates'->0 <= %s",
+        'params': ('"2019-05-30"', '"2019-07-14"')
+    },
+    {
+        'name': 'stats routes player registry lookup',
+        'index': 'idx_odi_registry_people',
+        'query': "SELECT o.id FROM odiwc2023 o WHERE o.metadata->'info'->'registry'->'people' ? %s",
+        'params': ('V Kohli',)
+    },
+    {
+        'name': 'export team filter',
+        'index': 'idx_odi_info_teams',
+        'query': "SELECT id FROM odiwc2023 WHERE metadata->'info'->'teams' @> %s",
+        'params': ('["Netherlands"]',)
+    },
+    {
+        'name': 'export season filter',
+        'index': 'idx_odi_info_season',
+        'query': "SELECT id FROM odiwc2023 WHERE metadata->'info'->>'season' = %s",
+        'params': ('2019',)
+    },
+]
+
+
+def plan_uses_index(plan, index_name):
+    """Walk an EXPLAIN (FORMAT JSON) plan tree looking for index_name"""
+    if plan.get('Index Name') == index_name:
+        return True
+    return any(plan_uses_index(child, index_name) for child in plan.get('Plans', []))
+
+
+def explain_probe(cursor, probe, runs=3):
+    """
+    Run EXPLAIN ANALYZE for a probe query.
+    Returns (median execution time in ms, whether the expected index was used)
+    """
+    timings = []
+    uses_index = False
+    for _ in range(runs):
+        cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + probe['query'], probe['params'])
+        row = cursor.fetchone()
+        explain = (row[0] if not isinstance(row, dict) else row['QUERY PLAN'])[0]
+        timings.append(explain['Execution Time'])
+        uses_index = plan_uses_index(explain['Plan'], probe['index'])
+    timings.sort()
+    return timings[len(timings) // 2], uses_index
@@ -0,0 +1,380 @@
+"""
+Tables maintained alongside odiwc2023 by the loader
+All statements are idempotent so ensure_schema can run before every ingest.
+"""
+
+SCHEMA_STATEMENTS = [
+    # Single-row version stamp, bumped once per ingest that adds matches.
+    # The API derives ETag/Last-Modified from it.
+    """
+    CREATE TABLE IF NOT EXISTS dataset_version (
+        id INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        version BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    "INSERT INTO dataset_version (id) VALUES (1) ON CONFLICT (id) DO NOTHING",
+
+    # Match header (meta + info) split from the innings so listing queries
+    # only detoast a few KB per match. odiwc2023 keeps the raw document.
+    """
+    CREATE TABLE IF NOT EXISTS match_info (
+        id VARCHAR PRIMARY KEY,
+        meta JSONB,
+        info JSONB NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS match_innings (
+        match_id VARCHAR NOT NULL,
+        innings_no INT NOT NULL,
+        data JSONB NOT NULL,
+        PRIMARY KEY (match_id, innings_no)
+    )
+    """,
+
+    # One row per player-of-the-match award, with the winner's team resolved
+    # at ingest so MOTM routes never scan odiwc2023
+    """
+    CREATE TABLE IF NOT EXISTS motm_awards (
+        match_id VARCHAR NOT NULL,
+        player TEXT NOT NULL,
+        team TEXT,
+        opponent TEXT,
+        season TEXT,
+        season_year INT,
+        match_date DATE,
+        venue TEXT,
+        city TEXT,
+        event_name TEXT,
+        teams JSONB,
+        winner TEXT,
+        win_margin JSONB,
+        result TEXT,
+        PRIMARY KEY (match_id, player)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_motm_awards_player ON motm_awards (player, match_date DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_motm_awards_team ON motm_awards (team, player)",
+    "CREATE INDEX IF NOT EXISTS idx_motm_awards_year ON motm_awards (season_year, player)",
+
+    # Ball-by-ball rows with the phase resolved at ingest from each innings'
+    # powerplay windows (see utils.helpers.classify_innings_overs)
+    """
+    CREATE TABLE IF NOT EXISTS deliveries (
+        match_id VARCHAR NOT NULL,
+        innings_no INT NOT NULL,
+        ball_seq INT NOT NULL,
+        over_num INT NOT NULL,
+        ball_in_over INT NOT NULL,
+        batting_team TEXT,
+        bowling_team TEXT,
+        batter TEXT,
+        bowler TEXT,
+        non_striker TEXT,
+        runs_batter INT NOT NULL DEFAULT 0,
+        runs_extras INT NOT NULL DEFAULT 0,
+        runs_total INT NOT NULL DEFAULT 0,
+        wides INT NOT NULL DEFAULT 0,
+        noballs INT NOT NULL DEFAULT 0,
+        is_legal BOOLEAN NOT NULL DEFAULT TRUE,
+        is_wicket BOOLEAN NOT NULL DEFAULT FALSE,
+        bowler_wicket BOOLEAN NOT NULL DEFAULT FALSE,
+        players_out TEXT[] NOT NULL DEFAULT '{}',
+        phase TEXT NOT NULL,
+        powerplay TEXT,
+        batter_style TEXT,
+        bowler_style TEXT,
+        PRIMARY KEY (match_id, innings_no, ball_seq)
+    )
+    """,
+    # Style columns were added after the table was first shipped
+    "ALTER TABLE deliveries ADD COLUMN IF NOT EXISTS batter_style TEXT",
+    "ALTER TABLE deliveries ADD COLUMN IF NOT EXISTS bowler_style TEXT",
+    "CREATE INDEX IF NOT EXISTS idx_deliveries_batter ON deliveries (batter, phase)",
+    "CREATE INDEX IF NOT EXISTS idx_deliveries_bowler ON deliveries (bowler, phase)",
+    "CREATE INDEX IF NOT EXISTS idx_deliveries_batting_team ON deliveries (batting_team, phase)",
+
+    # One row per wicket; a ball can carry two (e.g. a run out plus a retirement)
+    """
+    CREATE TABLE IF NOT EXISTS wickets (
+        match_id VARCHAR NOT NULL,
+        innings_no INT NOT NULL,
+        ball_seq INT NOT NULL,
+        wicket_no INT NOT NULL,
+        over_num INT NOT NULL,
+        ball_in_over INT NOT NULL,
+        batting_team TEXT,
+        bowling_team TEXT,
+        batter TEXT,
+        bowler TEXT,
+        player_out TEXT,
+        kind TEXT,
+        fielders TEXT[] NOT NULL DEFAULT '{}',
+        bowler_wicket BOOLEAN NOT NULL DEFAULT FALSE,
+        is_dismissal BOOLEAN NOT NULL DEFAULT TRUE,
+        phase TEXT NOT NULL,
+        PRIMARY KEY (match_id, innings_no, ball_seq, wicket_no)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_wickets_player_out ON wickets (player_out, phase)",
+    "CREATE INDEX IF NOT EXISTS idx_wickets_bowler ON wickets (bowler, player_out)",
+
+    # Team batting per (batting team, bowling team, season, venue, phase),
+    # kept at match grain so re-ingesting a match replaces only its rows.
+    # Team phase routes roll up from here instead of scanning deliveries.
+    """
+    CREATE TABLE IF NOT EXISTS team_phase_cube (
+        match_id VARCHAR NOT NULL,
+        innings_no INT NOT NULL,
+        batting_team TEXT,
+        bowling_team TEXT,
+        season TEXT,
+        venue TEXT,
+        phase TEXT NOT NULL,
+        runs INT NOT NULL DEFAULT 0,
+        extras INT NOT NULL DEFAULT 0,
+        balls INT NOT NULL DEFAULT 0,
+        wickets INT NOT NULL DEFAULT 0,
+        fours INT NOT NULL DEFAULT 0,
+        sixes INT NOT NULL DEFAULT 0,
+        dots INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (match_id, innings_no, phase)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_team_phase_cube_batting ON team_phase_cube (batting_team, bowling_team, season)",
+
+    # Serialized KLL / HyperLogLog sketches per entity and season
+    # (see utils.sketches). Reads merge the seasons they need.
+    """
+    CREATE TABLE IF NOT EXISTS sketches (
+        entity_type TEXT NOT NULL,
+        entity TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        season TEXT NOT NULL DEFAULT '',
+        sketch BYTEA NOT NULL,
+        PRIMARY KEY (entity_type, entity, metric, season)
+    )
+    """,
+    # Sketches cannot subtract a match, so record which ones were merged in
+    "CREATE TABLE IF NOT EXISTS sketch_matches (match_id VARCHAR PRIMARY KEY)",
+
+    # Per-match venue facts, grouped by utils.helpers.normalize_venue so
+    # "Bay Oval" and "Bay Oval, Mount Maunganui" share a key
+    """
+    CREATE TABLE IF NOT EXISTS venue_matches (
+        match_id VARCHAR PRIMARY KEY,
+        venue_key TEXT NOT NULL,
+        venue TEXT,
+        city TEXT,
+        match_date DATE,
+        first_innings_runs INT,
+        first_innings_wickets INT,
+        second_innings_runs INT,
+        chase_result TEXT,
+        powerplay_runs INT NOT NULL DEFAULT 0,
+        powerplay_balls INT NOT NULL DEFAULT 0,
+        middle_runs INT NOT NULL DEFAULT 0,
+        middle_balls INT NOT NULL DEFAULT 0,
+        death_runs INT NOT NULL DEFAULT 0,
+        death_balls INT NOT NULL DEFAULT 0,
+        pace_wickets INT NOT NULL DEFAULT 0,
+        spin_wickets INT NOT NULL DEFAULT 0,
+        unclassified_wickets INT NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_venue_matches_key ON venue_matches (venue_key)",
+    # One row per venue, refreshed from venue_matches whenever one of its matches is ingested
+    """
+    CREATE TABLE IF NOT EXISTS venue_profiles (
+        venue_key TEXT PRIMARY KEY,
+        venue TEXT,
+        city TEXT,
+        aliases TEXT[] NOT NULL DEFAULT '{}',
+        matches INT NOT NULL DEFAULT 0,
+        first_match DATE,
+        last_match DATE,
+        avg_first_innings NUMERIC,
+        avg_second_innings NUMERIC,
+        chases_won INT NOT NULL DEFAULT 0,
+        chases_lost INT NOT NULL DEFAULT 0,
+        chase_success_rate NUMERIC,
+        powerplay_run_rate NUMERIC,
+        middle_run_rate NUMERIC,
+        death_run_rate NUMERIC,
+        pace_wickets INT NOT NULL DEFAULT 0,
+        spin_wickets INT NOT NULL DEFAULT 0,
+        unclassified_wickets INT NOT NULL DEFAULT 0
+    )
+    """,
+
+    # One row per partnership, built in a single pass over each innings.
+    # batter_a/batter_b are the pair in alphabetical order so a pair has one spelling.
+    """
+    CREATE TABLE IF NOT EXISTS partnerships (
+        match_id VARCHAR NOT NULL,
+        innings_no INT NOT NULL,
+        partnership_no INT NOT NULL,
+        wicket_no INT NOT NULL,
+        batting_team TEXT,
+        bowling_team TEXT,
+        batter_a TEXT NOT NULL,
+        batter_b TEXT NOT NULL,
+        batter_a_runs INT NOT NULL DEFAULT 0,
+        batter_a_balls INT NOT NULL DEFAULT 0,
+        batter_b_runs INT NOT NULL DEFAULT 0,
+        batter_b_balls INT NOT NULL DEFAULT 0,
+        extras INT NOT NULL DEFAULT 0,
+        runs INT NOT NULL DEFAULT 0,
+        balls INT NOT NULL DEFAULT 0,
+        start_over NUMERIC(4, 1),
+        end_over NUMERIC(4, 1),
+        ended_by_wicket BOOLEAN NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (match_id, innings_no, partnership_no)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_partnerships_batter_a ON partnerships (batter_a)",
+    "CREATE INDEX IF NOT EXISTS idx_partnerships_batter_b ON partnerships (batter_b)",
+    "CREATE INDEX IF NOT EXISTS idx_partnerships_team ON partnerships (batting_team, wicket_no)",
+
+    # One row per batter per innings with where they batted and the situation
+    # they walked into: entry_balls legal balls bowled (entry_over = entry_balls / 6),
+    # entry_score runs and entry_wickets wickets down. Super overs are skipped.
+    """
+    CREATE TABLE IF NOT EXISTS batting_innings (
+        match_id VARCHAR NOT NULL,
+        innings_no INT NOT NULL,
+        batter TEXT NOT NULL,
+        batting_team TEXT,
+        bowling_team TEXT,
+        season TEXT,
+        match_date DATE,
+        position INT NOT NULL,
+        entry_over INT NOT NULL,
+        entry_balls INT NOT NULL,
+        entry_score INT NOT NULL,
+        entry_wickets INT NOT NULL,
+        runs INT NOT NULL DEFAULT 0,
+        balls INT NOT NULL DEFAULT 0,
+        fours INT NOT NULL DEFAULT 0,
+        sixes INT NOT NULL DEFAULT 0,
+        dismissed BOOLEAN NOT NULL DEFAULT FALSE,
+        dismissal_kind TEXT,
+        PRIMARY KEY (match_id, innings_no, batter)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_batting_innings_batter ON batting_innings (batter, position, entry_wickets)",
+    "CREATE INDEX IF NOT EXISTS idx_batting_innings_position ON batting_innings (position, entry_wickets)",
+    "CREATE INDEX IF NOT EXISTS idx_batting_innings_entry ON batting_innings (entry_over, entry_wickets)",
+
+    # Over-by-over arrays per innings for worm and Manhattan charts
+    """
+    CREATE TABLE IF NOT EXISTS match_progression (
+        match_id VARCHAR PRIMARY KEY,
+        innings JSONB NOT NULL
+    )
+    """,
+
+    # Win-probability coefficients per innings (see utils.win_probability)
+    """
+    CREATE TABLE IF NOT EXISTS win_probability_model (
+        innings_no INTEGER PRIMARY KEY,
+        coefficients DOUBLE PRECISION[] NOT NULL,
+        metrics JSONB,
+        trained_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+
+    # The eventual winner's lowest win probability in each decided match
+    """
+    CREATE TABLE IF NOT EXISTS match_comebacks (
+        match_id VARCHAR PRIMARY KEY,
+        winner TEXT NOT NULL,
+        min_probability DOUBLE PRECISION NOT NULL,
+        innings_no INTEGER NOT NULL,
+        over_ball NUMERIC(4, 1),
+        score INTEGER,
+        wickets INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_match_comebacks_probability ON match_comebacks (min_probability)",
+
+    # Each registry player's profile styles, resolved once (see utils.player_styles)
+    """
+    CREATE TABLE IF NOT EXISTS player_styles (
+        player TEXT PRIMARY KEY,
+        registry_id TEXT,
+        profile_name TEXT,
+        battingstyle TEXT,
+        bowlingstyle TEXT,
+        batting_style TEXT,
+        bowling_style TEXT,
+        bowling_type TEXT
+    )
+    """,
+
+    # Per-match counters for a player against each opposing style and phase.
+    # role 'batting' splits by the bowler's style, 'bowling' by the batter's hand.
+    """
+    CREATE TABLE IF NOT EXISTS style_matchups (
+        match_id VARCHAR NOT NULL,
+        player TEXT NOT NULL,
+        role TEXT NOT NULL,
+        opposing_style TEXT NOT NULL,
+        phase TEXT NOT NULL,
+        balls INT NOT NULL DEFAULT 0,
+        runs INT NOT NULL DEFAULT 0,
+        dismissals INT NOT NULL DEFAULT 0,
+        dots INT NOT NULL DEFAULT 0,
+        fours INT NOT NULL DEFAULT 0,
+        sixes INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (match_id, player, role, opposing_style, phase)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_style_matchups_player ON style_matchups (player, role, opposing_style)",
+
+    # Fantasy scoring rule sets and the points scored under each (see utils.fantasy)
+    """
+    CREATE TABLE IF NOT EXISTS fantasy_rule_sets (
+        name TEXT PRIMARY KEY,
+        rules JSONB NOT NULL,
+        timings JSONB,
+        scored_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fantasy_points (
+        rule_set TEXT NOT NULL,
+        match_id VARCHAR NOT NULL,
+        player TEXT NOT NULL,
+        team TEXT,
+        season TEXT,
+        batting REAL NOT NULL DEFAULT 0,
+        bowling REAL NOT NULL DEFAULT 0,
+        fielding REAL NOT NULL DEFAULT 0,
+        playing REAL NOT NULL DEFAULT 0,
+        total REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (rule_set, match_id, player)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_fantasy_points_season ON fantasy_points (rule_set, season, team)",
+    "CREATE INDEX IF NOT EXISTS idx_fantasy_points_player ON fantasy_points (rule_set, player)",
+]
+
+
+def ensure_schema(cursor):
+    """Create any missing tables and indexes"""
+    for statement in SCHEMA_STATEMENTS:
+        cursor.execute(statement)
+
+
+def bump_dataset_version(cursor):
+    """Mark the dataset as changed. Returns the new version number."""
+    cursor.execute("""
+        UPDATE dataset_version
+        SET version = version + 1, updated_at = now()
+        WHERE id = 1
+        RETURNING version
+    """)
+    row = cursor.fetchone()
+    return row[0] if not isinstance(row, dict) else row['version']
@@ -0,0 +1,101 @@
+"""Batting position, entry situation and balls faced per batter from a match document"""
+from utils.ingest import batting_innings_rows
+
+COLUMNS = ('match_id', 'innings_no', 'batter', 'batting_team', 'bowling_team', 'season', 'match_date',
+           'position', 'entry_over', 'entry_balls', 'entry_score', 'entry_wickets', 'runs', 'balls',
+           'fours', 'sixes', 'dismissed', 'kind')
+
+
+def ball(batter, non_striker, runs=0, extras=None, wicket=None, non_boundary=False):
+    extras = extras or {}
+    delivery = {
+        'batter': batter,
+        'non_striker': non_striker,
+        'bowler': 'b1',
+        'runs': {'batter': runs, 'extras': sum(extras.values()), 'total': runs + sum(extras.values())}
+    }
+    if non_boundary:
+        delivery['runs']['non_boundary'] = True
+    if extras:
+        delivery['extras'] = extras
+    if wicket:
+        delivery['wickets'] = [wicket]
+    return delivery
+
+
+def match_document():
+    first = [
+        ball('a1', 'a2', runs=4),
+        ball('a1', 'a2', extras={'wides': 1}),
+        ball('a1', 'a2', runs=1, extras={'noballs': 1}),
+        ball('a1', 'a2', runs=4, non_boundary=True),
+        # a2 is run out at the non-striker's end without facing
+        ball('a1', 'a2', runs=1, wicket={'player_out': 'a2', 'kind': 'run out'}),
+        ball('a3', 'a1', runs=6),
+        ball('a3', 'a1'),
+        ball('a3', 'a1'),
+    ]
+    second = [
+        ball('a3', 'a1', wicket={'player_out': 'a3', 'kind': 'retired hurt'}),
+        ball('a4', 'a1', runs=2),
+        ball('a4', 'a1', wicket={'player_out': 'a4', 'kind': 'bowled'}),
+        # The retired batter comes back and keeps their position
+        ball('a3', 'a1', runs=1),
+        ball('a1', 'a3'),
+        ball('a1', 'a3'),
+    ]
+    return {
+        'info': {'teams': ['A', 'B'], 'season': '2023', 'dates': ['2023-10-05'], 'overs': 50},
+        'innings': [
+            {'team': 'A', 'overs': [{'over': 0, 'deliveries': first}, {'over': 1, 'deliveries': second}]},
+            {'team': 'B', 'overs': [{'over': 0, 'deliveries': [ball('c1', 'c2', runs=1)]}]},
+            {'team': 'A', 'super_over': True, 'overs': [{'over': 0, 'deliveries': [ball('a1', 'a3', runs=6)]}]},
+        ]
+    }
+
+
+def rows_by_batter():
+    rows = [dict(zip(COLUMNS, row)) for row in batting_innings_rows('m1', match_document())]
+    return {(row['innings_no'], row['batter']): row for row in rows}
+
+
+def test_positions_follow_order_of_arrival():
+    rows = rows_by_batter()
+    assert [rows[0, name]['position'] for name in ('a1', 'a2', 'a3', 'a4')] == [1, 2, 3, 4]
+    assert [rows[1, name]['position'] for name in ('c1', 'c2')] == [1, 2]
+    # Super overs are not batting innings
+    assert set(innings for innings, _ in rows) == {0, 1}
+
+
+def test_entry_situation():
+    rows = rows_by_batter()
+    # a3 comes in after three legal balls (the wide and no-ball do not count), at 12 for 1
+    assert {k: rows[0, 'a3'][k] for k in ('entry_over', 'entry_balls', 'entry_score', 'entry_wickets')} == \
+        {'entry_over': 0, 'entry_balls': 3, 'entry_score': 12, 'entry_wickets': 1}
+    # The retirement is not a wicket, so a4 comes in at 18 for 1
+    assert {k: rows[0, 'a4'][k] for k in ('entry_over', 'entry_balls', 'entry_score', 'entry_wickets')} == \
+        {'entry_over': 1, 'entry_balls': 7, 'entry_score': 18, 'entry_wickets': 1}
+
+
+def test_balls_faced_and_boundaries():
+    a1 = rows_by_batter()[0, 'a1']
+    # The wide is not a ball faced; the no-ball is
+    assert (a1['runs'], a1['balls'], a1['fours'], a1['sixes']) == (10, 6, 1, 0)
+    a2 = rows_by_batter()[0, 'a2']
+    assert (a2['runs'], a2['balls']) == (0, 0)
+
+
+def test_dismissed_and_not_out():
+    rows = rows_by_batter()
+    assert (rows[0, 'a2']['dismissed'], rows[0, 'a2']['kind']) == (True, 'run out')
+    assert (rows[0, 'a4']['dismissed'], rows[0, 'a4']['kind']) == (True, 'bowled')
+    # Retired hurt is recorded but is not a dismissal
+    assert (rows[0, 'a3']['dismissed'], rows[0, 'a3']['kind']) == (False, 'retired hurt')
+    assert (rows[0, 'a3']['runs'], rows[0, 'a3']['balls']) == (7, 5)
+    assert (rows[0, 'a1']['dismissed'], rows[0, 'a1']['kind']) == (False, None)
+
+
+def test_match_columns():
+    row = rows_by_batter()[1, 'c1']
+    assert (row['match_id'], row['batting_team'], row['bowling_team'], row['season']) == ('m1', 'B', 'A', '2023')
+    assert row['match_date'] == '2023-10-05'
@@ -0,0 +1,99 @@
+"""Fantasy scoring rules on hand-made counters"""
+import numpy as np
+import pytest
+from utils.fantasy import DEFAULT_RULES, band_points, merge_rules, score
+
+COUNTER_COLUMNS = ('runs', 'balls_faced', 'fours', 'sixes', 'dismissals', 'balls_bowled', 'runs_conceded',
+                   'maidens', 'wickets', 'lbw_bowled', 'catches', 'stumpings', 'run_outs_direct',
+                   'run_outs_indirect')
+
+
+def counters(*players):
+    """Counter arrays for players given as dicts of their non-zero counters"""
+    return {name: np.array([p.get(name, 0) for p in players], dtype=np.int64) for name in COUNTER_COLUMNS}
+
+
+def points(*players, rules=None):
+    return score(counters(*players), merge_rules(rules))
+
+
+STRIKE_RATE_BANDS = DEFAULT_RULES['batting']['strike_rate']
+
+
+@pytest.mark.parametrize('value,expected', [
+    (200, 6), (140, 6), (139.9, 4), (120, 4), (100, 2), (99.9, 0), (50, 0), (49.9, -2), (40, -2), (39.9, -4),
+    (30, -4), (29.9, -6), (0, -6),
+])
+def test_band_boundaries_include_the_lower_edge(value, expected):
+    assert band_points(np.array([value]), np.array([True]), STRIKE_RATE_BANDS)[0] == expected
+
+
+def test_bands_skip_ineligible_players_and_use_the_first_match():
+    values = np.array([150.0, 150.0])
+    assert list(band_points(values, np.array([True, False]), STRIKE_RATE_BANDS)) == [6, 0]
+    # Overlapping bands: the first listed wins
+    assert list(band_points(values, np.array([True, True]), [[100, None, 1], [140, None, 9]])) == [1, 1]
+
+
+def test_batting_points():
+    result = points({'runs': 57, 'balls_faced': 50, 'fours': 6, 'sixes': 1, 'dismissals': 1})
+    # 57 runs + 6 fours + 2 per six + half century + strike rate 114 (100-120 band)
+    assert result['batting'][0] == 57 + 6 + 2 + 4 + 2
+    assert result['total'][0] == result['batting'][0] + 4
+
+
+def test_century_replaces_half_century():
+    result = points({'runs': 100, 'balls_faced': 150})
+    # 100 runs + century; strike rate 66.7 earns nothing
+    assert result['batting'][0] == 100 + 8
+
+
+def test_duck_only_when_dismissed():
+    result = points({'runs': 0, 'balls_faced': 3, 'dismissals': 1}, {'runs': 0, 'balls_faced': 3},
+                    {'runs': 0, 'balls_faced': 0})
+    assert list(result['batting']) == [-3, 0, 0]
+
+
+def test_strike_rate_needs_minimum_balls():
+    slow = {'runs': 5, 'balls_faced': 19}
+    result = points(slow, {'runs': 5, 'balls_faced': 20})
+    assert list(result['batting']) == [5, 5 - 6]
+    # A rule set can move the threshold
+    assert points(slow, rules={'batting': {'strike_rate_min_balls': 10}})['batting'][0] == 5 - 6
+
+
+def test_bowling_points():
+    result = points({'balls_bowled': 60, 'runs_conceded': 30, 'maidens': 2, 'wickets': 4, 'lbw_bowled': 1})
+    # 4 wickets, one lbw/bowled, 2 maidens, four-wicket bonus, economy 3.0 (2.5-3.5 band)
+    assert result['bowling'][0] == 4 * 25 + 8 + 2 * 4 + 4 + 4
+
+
+def test_five_wickets_replaces_four_wicket_bonus():
+    assert points({'wickets': 5, 'balls_bowled': 12, 'runs_conceded': 30})['bowling'][0] == 5 * 25 + 8
+
+
+def test_economy_needs_minimum_balls():
+    result = points({'balls_bowled': 29, 'runs_conceded': 60}, {'balls_bowled': 30, 'runs_conceded': 60},
+                    {'balls_bowled': 0})
+    # Economy 12 only counts once 30 balls are bowled; no balls bowled earns nothing
+    assert list(result['bowling']) == [0, -6, 0]
+
+
+def test_fielding_points():
+    result = points({'catches': 3, 'stumpings': 1, 'run_outs_direct': 1, 'run_outs_indirect': 2})
+    assert result['fielding'][0] == 3 * 8 + 4 + 12 + 12 + 2 * 6
+
+
+def test_every_player_gets_playing_points():
+    result = points({}, {}, rules={'playing': 2})
+    assert list(result['playing']) == [2, 2] and list(result['total']) == [2, 2]
+
+
+def test_merge_rules_overrides_and_validates():
+    rules = merge_rules({'batting': {'six': 3}})
+    assert rules['batting']['six'] == 3 and rules['batting']['four'] == 1
+    assert DEFAULT_RULES['batting']['six'] == 2
+    with pytest.raises(ValueError):
+        merge_rules({'batting': {'sixes': 3}})
+    with pytest.raises(ValueError):
+        merge_rules({'captain': {}})
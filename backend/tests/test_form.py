@@ -0,0 +1,55 @@
+"""Prefix-sum helpers behind the career timeline and rolling form endpoints"""
+import numpy as np
+import pytest
+from utils.form import group_totals, last_n_sum, prefix_sums, ratio, ratios, rolling_sums
+
+RUNS = [10, 0, 55, 3, 102, 7]
+
+
+def test_prefix_sums_have_a_leading_zero():
+    np.testing.assert_array_equal(prefix_sums(RUNS), [0, 10, 10, 65, 68, 170, 177])
+    np.testing.assert_array_equal(prefix_sums([]), [0])
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 6, 10])
+def test_rolling_sums_match_a_loop(window):
+    expected = [sum(RUNS[max(i + 1 - window, 0):i + 1]) for i in range(len(RUNS))]
+    np.testing.assert_array_equal(rolling_sums(RUNS, window), expected)
+
+
+def test_rolling_window_edges():
+    # Innings before the first full window sum what there is so far
+    np.testing.assert_array_equal(rolling_sums(RUNS, 3)[:3], [10, 10, 65])
+    # A window longer than the career is the running total
+    np.testing.assert_array_equal(rolling_sums(RUNS, 100), np.cumsum(RUNS))
+    assert len(rolling_sums([], 5)) == 0
+
+
+@pytest.mark.parametrize('n,expected', [(0, 0), (1, 7), (2, 109), (6, 177), (50, 177)])
+def test_last_n_sum(n, expected):
+    assert last_n_sum(RUNS, n) == expected
+
+
+def test_last_n_sum_of_nothing():
+    assert last_n_sum([], 10) == 0
+
+
+def test_ratios_leave_zero_denominators_empty():
+    assert ratios([10, 5, 0], [2, 0, 4]) == [5.0, None, 0.0]
+    # Strike rate style scaling and rounding
+    assert ratios([1], [3], scale=100) == [33.33]
+    assert ratios([2], [3], digits=0) == [1.0]
+    assert ratios([], []) == []
+
+
+def test_ratio():
+    assert ratio(177, 4) == 44.25
+    assert ratio(10, 0) is None
+
+
+def test_group_totals_keep_first_appearance_order():
+    keys, totals, counts = group_totals(['2019', '2018', '2019', '2020'],
+                                        {'runs': np.array([10, 20, 30, 40])})
+    assert keys == ['2019', '2018', '2020']
+    np.testing.assert_array_equal(totals['runs'], [40, 20, 40])
+    np.testing.assert_array_equal(counts, [2, 1, 1])
@@ -0,0 +1,54 @@
+"""Dataset version lookups are cached, including when there is no version yet"""
+import pytest
+from utils import http_cache
+
+
+class CountingDatabase:
+    """Stands in for models.database.Database and counts version queries"""
+    queries = 0
+    result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_query(self, query, params=None):
+        CountingDatabase.queries += 1
+        return CountingDatabase.result
+
+
+@pytest.fixture
+def database(monkeypatch):
+    CountingDatabase.queries = 0
+    CountingDatabase.result = None
+    monkeypatch.setattr(http_cache, 'Database', CountingDatabase)
+    http_cache.clear_version_cache()
+    yield CountingDatabase
+    http_cache.clear_version_cache()
+
+
+def test_version_is_cached(database):
+    database.result = [{'version': 3, 'updated_at': None}]
+    assert http_cache.get_dataset_version() == {'version': 3, 'updated_at': None}
+    assert http_cache.get_dataset_version()['version'] == 3
+    assert database.queries == 1
+
+
+def test_missing_version_is_cached(database):
+    # No dataset_version row yet, which must not send every request back to the database
+    assert http_cache.get_dataset_version() is None
+    assert http_cache.get_dataset_version() is None
+    assert database.queries == 1
+
+
+def test_cache_expires_and_clears(database, monkeypatch):
+    http_cache.get_dataset_version()
+    http_cache.clear_version_cache()
+    database.result = [{'version': 4, 'updated_at': None}]
+    assert http_cache.get_dataset_version()['version'] == 4
+
+    monkeypatch.setattr(http_cache, 'VERSION_TTL_SECONDS', 0)
+    http_cache.get_dataset_version()
+    assert database.queries == 3
@@ -0,0 +1,100 @@
+"""Partnership rows built from a hand-made match document"""
+from utils.ingest import partnership_rows
+
+COLUMNS = ('match_id', 'innings_no', 'partnership_no', 'wicket_no', 'batting_team', 'bowling_team',
+           'batter_a', 'batter_b', 'batter_a_runs', 'batter_a_balls', 'batter_b_runs', 'batter_b_balls',
+           'extras', 'runs', 'balls', 'start_over', 'end_over', 'ended_by_wicket')
+
+
+def ball(batter, non_striker, runs=0, extras=None, wicket=None):
+    extras = extras or {}
+    delivery = {
+        'batter': batter,
+        'non_striker': non_striker,
+        'bowler': 'b1',
+        'runs': {'batter': runs, 'extras': sum(extras.values()), 'total': runs + sum(extras.values())}
+    }
+    if extras:
+        delivery['extras'] = extras
+    if wicket:
+        delivery['wickets'] = [wicket]
+    return delivery
+
+
+def match_document():
+    first = [
+        ball('a1', 'a2', runs=4),
+        ball('a1', 'a2', extras={'wides': 1}),
+        ball('a1', 'a2', runs=1),
+        ball('a2', 'a1', extras={'legbyes': 1}),
+        ball('a1', 'a2', wicket={'player_out': 'a1', 'kind': 'bowled'}),
+        ball('a3', 'a2', runs=2),
+        ball('a3', 'a2', wicket={'player_out': 'a3', 'kind': 'retired hurt'}),
+    ]
+    second = [
+        ball('a4', 'a2', runs=6),
+        ball('a4', 'a2', runs=1),
+        ball('a2', 'a4', runs=1),
+    ]
+    chase = [
+        ball('c1', 'c2'),
+        # The non-striker is run out, which ends the stand on c1's ball
+        ball('c1', 'c2', runs=1, wicket={'player_out': 'c2', 'kind': 'run out'}),
+        ball('c3', 'c1', runs=4),
+    ]
+    return {
+        'info': {'teams': ['A', 'C']},
+        'innings': [
+            {'team': 'A', 'overs': [{'over': 0, 'deliveries': first}, {'over': 1, 'deliveries': second}]},
+            {'team': 'C', 'overs': [{'over': 0, 'deliveries': chase}]},
+        ]
+    }
+
+
+def partnerships():
+    return [dict(zip(COLUMNS, row)) for row in partnership_rows('m1', match_document())]
+
+
+def test_partnerships_end_on_wickets():
+    rows = partnerships()
+    assert [(r['innings_no'], r['partnership_no'], r['wicket_no']) for r in rows] == [
+        (0, 1, 1), (0, 2, 2), (0, 3, 2), (1, 1, 1), (1, 2, 2)
+    ]
+    first = rows[0]
+    assert (first['batter_a'], first['batter_b'], first['batting_team'], first['bowling_team']) == \
+        ('a1', 'a2', 'A', 'C')
+    assert (first['start_over'], first['end_over'], first['ended_by_wicket']) == (0.1, 0.5, True)
+
+
+def test_runs_and_balls_split_per_partner():
+    first = partnerships()[0]
+    # The wide is not a ball; extras count to the stand but not to either batter
+    assert (first['runs'], first['balls'], first['extras']) == (7, 4, 2)
+    assert (first['batter_a_runs'], first['batter_a_balls']) == (5, 3)
+    assert (first['batter_b_runs'], first['batter_b_balls']) == (0, 1)
+    for row in partnerships():
+        assert row['runs'] == row['batter_a_runs'] + row['batter_b_runs'] + row['extras']
+
+
+def test_retirement_continues_at_the_same_wicket():
+    _, retired, resumed, _, _ = partnerships()
+    assert (retired['batter_a'], retired['batter_b'], retired['runs']) == ('a2', 'a3', 2)
+    # Retired hurt ends the stand but is not a wicket, so the next stand is still for the 2nd wicket
+    assert retired['ended_by_wicket'] is False
+    assert (resumed['batter_a'], resumed['batter_b'], resumed['wicket_no']) == ('a2', 'a4', 2)
+
+
+def test_last_stand_is_unbroken():
+    rows = partnerships()
+    resumed, last = rows[2], rows[-1]
+    assert (resumed['runs'], resumed['balls'], resumed['end_over'], resumed['ended_by_wicket']) == \
+        (8, 3, 1.3, False)
+    assert (resumed['batter_a_runs'], resumed['batter_b_runs']) == (1, 7)
+    assert (last['batter_a'], last['batter_b'], last['runs'], last['ended_by_wicket']) == ('c1', 'c3', 4, False)
+
+
+def test_non_striker_run_out_ends_the_stand():
+    run_out = partnerships()[3]
+    assert (run_out['batter_a'], run_out['batter_b'], run_out['runs'], run_out['balls']) == ('c1', 'c2', 1, 2)
+    assert (run_out['batter_a_balls'], run_out['batter_b_balls']) == (2, 0)
+    assert run_out['ended_by_wicket'] is True
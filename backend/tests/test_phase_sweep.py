@@ -0,0 +1,129 @@
+"""Custom-phase sweeps from prefix sums against a brute-force aggregation"""
+import numpy as np
+import pytest
+from api.phase_performance import MAX_SWEEP_CELLS, compute_custom_phase_sweep, parse_sweep_params
+from utils.phase_sweep import COUNTERS, MAX_RANGE_VALUES, load_prefix_sums, parse_int_values, sweep
+
+
+class RowsCursor:
+    """Answers PLAYER_OVERS_QUERY with fixed per-over rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+
+def synthetic_overs(seed=0, innings=40):
+    """Per-over rows for a batter who comes in and leaves at random overs"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(innings):
+        first = int(rng.integers(0, 45))
+        last = int(rng.integers(first, 50))
+        for over in range(first, last + 1):
+            balls = int(rng.integers(0, 7))
+            runs = int(rng.integers(0, balls * 2 + 1))
+            rows.append({
+                'match_id': f'm{i // 2}', 'innings_no': i % 2, 'over_num': over,
+                'balls': balls, 'runs': runs, 'dismissals': int(over == last and rng.random() < 0.7),
+                'r0': balls, 'r1_3': 0, 'r4': 0, 'r5': 0, 'r6': 0, 'r7': 0
+            })
+    return rows
+
+
+def brute_force(rows, over_start, overs_to_analyze, balls_before, min_balls_in_phase):
+    """One cell by summing the per-over rows of each innings directly"""
+    innings = {}
+    for row in rows:
+        innings.setdefault((row['match_id'], row['innings_no']), []).append(row)
+
+    analyzed = balls = runs = dismissed = 0
+    for overs in innings.values():
+        faced_before = sum(r['balls'] for r in overs if r['over_num'] < over_start)
+        phase = [r for r in overs if over_start <= r['over_num'] < over_start + overs_to_analyze]
+        phase_balls = sum(r['balls'] for r in phase)
+        if faced_before >= balls_before and phase_balls >= min_balls_in_phase:
+            analyzed += 1
+            balls += phase_balls
+            runs += sum(r['runs'] for r in phase)
+            dismissed += sum(r['dismissals'] for r in phase)
+    return {'innings_analyzed': analyzed, 'total_balls': balls, 'total_runs': runs, 'times_dismissed': dismissed}
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_sweep_matches_brute_force(seed):
+    rows = synthetic_overs(seed)
+    _, prefix = load_prefix_sums(RowsCursor(rows), 'x')
+    over_starts, overs_values, balls_before_values = [0, 5, 17, 40, 49], [1, 3, 10, 50], [0, 1, 15, 60]
+
+    cells = sweep(prefix, over_starts, overs_values, balls_before_values, min_balls_in_phase=4)
+    assert len(cells) == len(over_starts) * len(overs_values) * len(balls_before_values)
+    for cell in cells:
+        expected = brute_force(rows, cell['over_start'], cell['overs_to_analyze'], cell['balls_before'], 4)
+        assert {key: cell[key] for key in expected} == expected, cell
+
+
+def test_prefix_sums_are_cumulative_per_innings():
+    rows = synthetic_overs(2, innings=3)
+    keys, prefix = load_prefix_sums(RowsCursor(rows), 'x')
+    assert len(keys) == 3 and prefix.shape[2] == len(COUNTERS)
+    assert (prefix[:, 0] == 0).all()
+    assert prefix[:, -1, 0].sum() == sum(row['balls'] for row in rows)
+    assert load_prefix_sums(RowsCursor([]), 'x') == ([], None)
+
+
+def test_balls_before_counts_only_balls_before_over_start():
+    def over(match_id, over_num, balls):
+        return {'match_id': match_id, 'innings_no': 0, 'over_num': over_num, 'balls': balls, 'runs': balls,
+                'dismissals': 0, 'r0': 0, 'r1_3': balls, 'r4': 0, 'r5': 0, 'r6': 0, 'r7': 0}
+
+    rows = [
+        # Faced 12 balls before over 10
+        over('early', 8, 6), over('early', 9, 6), over('early', 10, 6), over('early', 11, 6),
+        # Came in at over 10 and faced 30 balls, none of them before it
+        *[over('late', o, 6) for o in range(10, 15)],
+    ]
+    _, prefix = load_prefix_sums(RowsCursor(rows), 'x')
+    by_threshold = {cell['balls_before']: cell for cell in sweep(prefix, [10], [2], [0, 12, 13], 1)}
+    assert by_threshold[0]['innings_analyzed'] == 2
+    # Balls faced later in the innings do not count towards balls_before
+    assert by_threshold[12]['innings_analyzed'] == 1
+    assert by_threshold[12]['total_balls'] == 12
+    assert by_threshold[13]['innings_analyzed'] == 0
+
+
+@pytest.mark.parametrize('value,expected', [
+    (None, [7]), ('', [7]), ('5', [5]), ('3,1,3', [1, 3]), ('0-10:5', [0, 5, 10]), ('4-2', [7]), ('60', [49]),
+    ('45-60', [45, 46, 47, 48, 49]),
+])
+def test_parse_int_values(value, expected):
+    assert parse_int_values(value, 7, maximum=49) == expected
+
+
+def test_ranges_are_bounded_before_expansion():
+    assert len(parse_int_values(f'0-{MAX_RANGE_VALUES - 1}', 0)) == MAX_RANGE_VALUES
+    with pytest.raises(ValueError):
+        parse_int_values(f'0-{MAX_RANGE_VALUES}', 0)
+    with pytest.raises(ValueError):
+        # Clamping happens after the size check, so this never builds a huge range
+        parse_int_values('0-999999999999', 0, maximum=49)
+    # A wide range with a large step is fine, and is clamped like any other
+    assert parse_int_values('0-999999999999:1000000000', 0, maximum=49) == [0]
+
+
+def test_sweep_params_are_clamped_to_an_innings():
+    over_starts, overs_values, balls_before_values = parse_sweep_params(
+        {'over_start': '48-55', 'overs_to_analyze': '80', 'balls_before': '500'})
+    assert (over_starts, overs_values, balls_before_values) == ([48, 49], [50], [300])
+
+
+def test_oversized_grids_are_rejected_before_loading():
+    # 50 x 50 x 5 cells; raised before any database access
+    with pytest.raises(ValueError):
+        compute_custom_phase_sweep('x', list(range(50)), list(range(1, 51)), list(range(5)))
+    assert 50 * 50 * 5 > MAX_SWEEP_CELLS
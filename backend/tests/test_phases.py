@@ -0,0 +1,81 @@
+"""Phase classification of each over from allotted overs and powerplay windows"""
+import pytest
+from utils.helpers import classify_innings_overs, get_allotted_overs, get_phase_from_over, get_powerplay_windows
+
+
+def innings(overs, powerplays=None, target_overs=None):
+    document = {'team': 'A', 'overs': [{'over': o, 'deliveries': []} for o in range(overs)]}
+    if powerplays is not None:
+        document['powerplays'] = [{'from': start, 'to': stop, 'type': kind} for start, stop, kind in powerplays]
+    if target_overs is not None:
+        document['target'] = {'overs': target_overs, 'runs': 150}
+    return document
+
+
+def phases(overs):
+    """{phase: [first over, last over]} from a classify_innings_overs result"""
+    spans = {}
+    for over_num, (phase, _) in sorted(overs.items()):
+        spans.setdefault(phase, [over_num, over_num])[1] = over_num
+    return spans
+
+
+def test_full_innings_without_powerplays_uses_10_40_split():
+    overs = classify_innings_overs(innings(50))
+    assert phases(overs) == {'Powerplay': [0, 9], 'Middle Overs': [10, 39], 'Death Overs': [40, 49]}
+    assert all(label is None for _, label in overs.values())
+
+
+@pytest.mark.parametrize('over_num,allotted,phase', [
+    (9, 50, 'Powerplay'), (10, 50, 'Middle Overs'), (39, 50, 'Middle Overs'), (40, 50, 'Death Overs'),
+    (3, 20, 'Powerplay'), (4, 20, 'Middle Overs'), (16, 20, 'Death Overs'),
+    # Very short innings still get one over of each end
+    (0, 3, 'Powerplay'), (1, 3, 'Middle Overs'), (2, 3, 'Death Overs'),
+])
+def test_phase_from_over_scales_with_allotted_overs(over_num, allotted, phase):
+    assert get_phase_from_over(over_num, allotted) == phase
+
+
+def test_reduced_chase_uses_target_overs():
+    # 33.4 overs to chase in means the 34th over is still available
+    assert get_allotted_overs(innings(34, target_overs=33.4)) == 34
+    assert get_allotted_overs(innings(20, target_overs=20)) == 20
+    assert get_allotted_overs(innings(50), match_overs=None) == 50
+
+    overs = classify_innings_overs(innings(20, target_overs=20))
+    assert phases(overs) == {'Powerplay': [0, 3], 'Middle Overs': [4, 15], 'Death Overs': [16, 19]}
+
+
+def test_match_overs_override_without_target():
+    overs = classify_innings_overs(innings(40), match_overs=40)
+    assert phases(overs) == {'Powerplay': [0, 7], 'Middle Overs': [8, 31], 'Death Overs': [32, 39]}
+
+
+def test_powerplay_windows_are_ordered_and_labelled():
+    windows = get_powerplay_windows(innings(50, [(40.1, 49.6, 'mandatory'), (0.1, 9.6, 'mandatory'),
+                                                 (10.1, 39.6, 'mandatory')]))
+    assert windows == [('P1', 'mandatory', 0, 9), ('P2', 'mandatory', 10, 39), ('P3', 'mandatory', 40, 49)]
+    assert get_powerplay_windows(innings(50)) == []
+
+
+def test_mandatory_windows_override_the_10_40_split():
+    # A rain-reduced 35-over innings with its powerplays rescaled
+    overs = classify_innings_overs(innings(35, [(0.1, 6.6, 'mandatory'), (7.1, 27.6, 'mandatory'),
+                                                (28.1, 34.6, 'mandatory')]))
+    assert phases(overs) == {'Powerplay': [0, 6], 'Middle Overs': [7, 27], 'Death Overs': [28, 34]}
+    assert [overs[o][1] for o in (0, 7, 28)] == ['P1', 'P2', 'P3']
+
+
+def test_overs_past_the_last_recorded_window():
+    overs = classify_innings_overs(innings(50, [(0.1, 9.6, 'mandatory'), (10.1, 39.6, 'mandatory')]))
+    assert phases(overs) == {'Powerplay': [0, 9], 'Middle Overs': [10, 39], 'Death Overs': [40, 49]}
+    assert overs[45][1] is None
+
+
+def test_floating_powerplays_fall_back_to_allotted_overs():
+    # Older rules: a mandatory P1 of 8 overs plus a batting powerplay in the death
+    overs = classify_innings_overs(innings(50, [(0.1, 7.6, 'mandatory'), (42.1, 46.6, 'batting')]))
+    # Overs 8-9 are outside P1, so not Powerplay even though they are in the first fifth
+    assert phases(overs) == {'Powerplay': [0, 7], 'Middle Overs': [8, 39], 'Death Overs': [40, 49]}
+    assert overs[44] == ('Death Overs', 'P2')
+    assert overs[41] == ('Death Overs', None)
@@ -0,0 +1,100 @@
+"""Scorecard totals and bowling figures on a hand-built match document"""
+from utils.scorecard import build_scorecard, overs_text
+
+
+def ball(batter, non_striker, bowler, runs=0, extras=None, wicket=None):
+    extras = extras or {}
+    delivery = {
+        'batter': batter,
+        'non_striker': non_striker,
+        'bowler': bowler,
+        'runs': {'batter': runs, 'extras': sum(extras.values()), 'total': runs + sum(extras.values())}
+    }
+    if extras:
+        delivery['extras'] = extras
+    if wicket:
+        delivery['wickets'] = [wicket]
+    return delivery
+
+
+def match_document():
+    overs = [
+        {'over': 0, 'deliveries': [
+            ball('a1', 'a2', 'b1'),
+            ball('a1', 'a2', 'b1', runs=4),
+            ball('a1', 'a2', 'b1', extras={'wides': 1}),
+            ball('a1', 'a2', 'b1', runs=1),
+            ball('a2', 'a1', 'b1', extras={'legbyes': 1}),
+            ball('a1', 'a2', 'b1', wicket={'player_out': 'a1', 'kind': 'bowled'}),
+            ball('a3', 'a2', 'b1'),
+        ]},
+        {'over': 1, 'deliveries': [
+            ball('a2', 'a3', 'b2', runs=6),
+            ball('a2', 'a3', 'b2', runs=1, extras={'noballs': 1}),
+            ball('a3', 'a2', 'b2', wicket={'player_out': 'a3', 'kind': 'caught', 'fielders': [{'name': 'b3'}]}),
+            # a4 took too long to arrive; a timed out is not the bowler's wicket
+            ball('a5', 'a2', 'b2', wicket={'player_out': 'a4', 'kind': 'timed out'}),
+            ball('a5', 'a2', 'b2', runs=1, wicket={'player_out': 'a2', 'kind': 'run out',
+                                                  'fielders': [{'name': 'b1'}]}),
+            ball('a5', 'a6', 'b2'),
+            ball('a5', 'a6', 'b2', runs=2),
+        ]},
+        # Byes are not charged to the bowler, so this is still a maiden
+        {'over': 2, 'deliveries': [ball('a6', 'a5', 'b1')] * 4 + [
+            ball('a6', 'a5', 'b1', extras={'byes': 4}),
+            ball('a6', 'a5', 'b1'),
+        ]},
+    ]
+    return {
+        'info': {
+            'teams': ['A', 'B'],
+            'players': {'A': ['a1', 'a2', 'a3', 'a4', 'a5', 'a6', 'a7'], 'B': ['b1', 'b2', 'b3']},
+        },
+        'innings': [{'team': 'A', 'overs': overs, 'penalty_runs': {'post': 5}}]
+    }
+
+
+def test_totals_reconcile():
+    innings = build_scorecard(match_document())['innings'][0]
+    batting_runs = sum(row['runs'] for row in innings['batting'])
+    bowling_runs = sum(row['runs'] for row in innings['bowling'])
+    extras = innings['extras']
+
+    assert innings['total'] == batting_runs + extras['total'] == 27
+    assert extras == {'byes': 4, 'legbyes': 1, 'wides': 1, 'noballs': 1, 'penalty': 5, 'total': 12}
+    # Byes, leg byes and penalty runs are the only runs not charged to a bowler
+    assert bowling_runs + extras['byes'] + extras['legbyes'] + extras['penalty'] == innings['total']
+    assert innings['overs'] == '3'
+    assert innings['wickets'] == 4
+
+
+def test_bowler_figures():
+    innings = build_scorecard(match_document())['innings'][0]
+    figures = {row['bowler']: row for row in innings['bowling']}
+
+    assert (figures['b1']['overs'], figures['b1']['maidens'], figures['b1']['runs'], figures['b1']['wickets']) == \
+        ('2', 1, 6, 1)
+    assert (figures['b2']['overs'], figures['b2']['maidens'], figures['b2']['runs'], figures['b2']['wickets']) == \
+        ('1', 0, 11, 1)
+    assert figures['b1']['wides'] == 1 and figures['b2']['noballs'] == 1
+    assert sum(row['wickets'] for row in innings['bowling']) == 2
+
+
+def test_batting_and_fall_of_wickets():
+    innings = build_scorecard(match_document())['innings'][0]
+    batting = {row['batter']: row for row in innings['batting']}
+
+    assert [row['batter'] for row in innings['batting']] == ['a1', 'a2', 'a3', 'a5', 'a4', 'a6']
+    assert (batting['a1']['runs'], batting['a1']['balls'], batting['a1']['dismissal']) == (5, 4, 'b b1')
+    assert (batting['a2']['runs'], batting['a2']['balls'], batting['a2']['sixes']) == (7, 3, 1)
+    assert batting['a3']['dismissal'] == 'c b3 b b2'
+    assert batting['a4']['dismissal'] == 'timed out' and batting['a4']['bowler'] is None
+    assert batting['a2']['dismissal'] == 'run out (b1)'
+    assert innings['did_not_bat'] == ['a7']
+    assert [(w['wicket'], w['score'], w['over']) for w in innings['fall_of_wickets']] == [
+        (1, 7, '0.5'), (2, 15, '1.2'), (3, 15, '1.3'), (4, 16, '1.4')
+    ]
+
+
+def test_overs_text():
+    assert [overs_text(b) for b in (0, 5, 6, 50, 300)] == ['0', '0.5', '1', '8.2', '50']
@@ -0,0 +1,57 @@
+"""Field projection parsing for match details"""
+import pytest
+from flask import Flask
+from api.search import FIELD_PRESETS, MAX_PROJECTED_FIELDS, parse_field_path, projection_sql, search_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    return app.test_client()
+
+
+@pytest.mark.parametrize('field,path', [
+    ('info', ['info']),
+    ('info.venue', ['info', 'venue']),
+    ('info.dates[0]', ['info', 'dates', '0']),
+    ('innings[1].overs[0].deliveries', ['innings', '1', 'overs', '0', 'deliveries']),
+    ('info.outcome.by.runs', ['info', 'outcome', 'by', 'runs']),
+])
+def test_parse_field_path(field, path):
+    assert parse_field_path(field) == path
+
+
+@pytest.mark.parametrize('field', ['', 'info.', '.venue', 'info..venue', 'info[x]', 'info.dates[0', '1info',
+                                   "info.venue'); --"])
+def test_malformed_field_paths(field):
+    assert parse_field_path(field) is None
+
+
+def test_projection_reads_only_the_named_innings():
+    expression, params = projection_sql(['innings', '1', 'overs'])
+    assert 'mn.innings_no = %s' in expression
+    assert params == [['overs'], 1]
+    assert projection_sql(['info', 'venue']) == ('mi.info #> %s::text[]', [['venue']])
+    assert projection_sql(['innings'])[1] == []
+
+
+@pytest.mark.parametrize('path', [['inof', 'venue'], ['metadata'], ['innings', 'team']])
+def test_unknown_fields_raise(path):
+    with pytest.raises(ValueError):
+        projection_sql(path)
+
+
+def test_presets_are_valid_paths():
+    for fields in FIELD_PRESETS.values():
+        assert len(fields) <= MAX_PROJECTED_FIELDS
+        for field in fields:
+            projection_sql(parse_field_path(field))
+
+
+@pytest.mark.parametrize('fields', ['inof.venue', 'info,innings.team', 'info.venue[', ','.join(
+    f'info.f{i}' for i in range(MAX_PROJECTED_FIELDS + 1))])
+def test_bad_fields_are_rejected_before_querying(client, fields):
+    response = client.get('/api/search/match/1234', query_string={'fields': fields})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,87 @@
+"""The vectorized pattern matcher against Python's re on synthetic innings"""
+import re
+import numpy as np
+import pytest
+from utils.sequences import SequenceStore, parse_outcome, parse_pattern, query_pattern
+
+# One character per ball code, so a pattern can be checked with an equivalent regex
+CODE_CHARS = '.12346W'
+
+PATTERNS = [
+    ('.{4,}', r'\.{4,}'),
+    ('.', r'\.'),
+    ('. 4 .{2}', r'\.4\.{2}'),
+    ('!B{6,} W', r'[^46]{6,}W'),
+    ('[.1]{3,5} B', r'[.1]{3,5}[46]'),
+    ('R+ W .', r'[1-46]+W\.'),
+    ('*{3} 6', r'.{3}6'),
+    ('[.1]+ [12]{2,3} .', r'[.1]+[12]{2,3}\.'),
+]
+
+
+def synthetic_store(seed, innings=60):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, 80, size=innings)
+    # Dot-heavy, like real data, so long streaks occur
+    codes = rng.choice(len(CODE_CHARS), size=lengths.sum(),
+                       p=[0.45, 0.3, 0.07, 0.02, 0.08, 0.03, 0.05]).astype(np.int8)
+    innings_ids = np.repeat(np.arange(innings), lengths).astype(np.int32)
+    columns = {'team': innings_ids % 2, 'batter': np.zeros(len(codes), dtype=np.int32)}
+    labels = {'team': ['A', 'B'], 'batter': ['x']}
+    return SequenceStore(codes, innings_ids, labels, columns)
+
+
+def regex_ends(store, regex):
+    """Balls at which some match of regex ends, found innings by innings"""
+    expected = np.zeros(store.size, dtype=bool)
+    text = ''.join(CODE_CHARS[c] for c in store.codes)
+    starts = list(np.flatnonzero(store.innings_start)) + [store.size]
+    anchored = re.compile(f'(?:{regex})$')
+    for start, stop in zip(starts[:-1], starts[1:]):
+        for end in range(start, stop):
+            if anchored.search(text, start, end + 1):
+                expected[end] = True
+    return expected
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('pattern,regex', PATTERNS)
+def test_match_ends_equals_regex(pattern, regex, seed):
+    store = synthetic_store(seed)
+    np.testing.assert_array_equal(store.match_ends(parse_pattern(pattern)), regex_ends(store, regex))
+
+
+def test_matches_do_not_cross_innings():
+    # Two dots at the end of one innings and two at the start of the next
+    store = SequenceStore(np.array([1, 0, 0, 0, 0, 1], dtype=np.int8), np.array([0, 0, 0, 1, 1, 1]),
+                          {}, {})
+    assert not store.match_ends(parse_pattern('.{4}')).any()
+    np.testing.assert_array_equal(store.match_ends(parse_pattern('.{2}')), [0, 0, 1, 0, 1, 0])
+
+
+def test_query_counts_onsets_and_windows():
+    # innings 0: . . . W 1 .    innings 1: . . . 1 W
+    codes = np.array([0, 0, 0, 6, 1, 0, 0, 0, 0, 1, 6], dtype=np.int8)
+    innings = np.array([0] * 6 + [1] * 5)
+    store = SequenceStore(codes, innings, {'team': ['A']}, {'team': np.zeros(len(codes), dtype=np.int32)})
+
+    result = query_pattern(store, '.{3}', 'W', within=1)
+    # One onset per streak; only the first is followed by a wicket next ball
+    assert result['overall']['trials'] == 2
+    assert result['overall']['successes'] == 1
+
+    assert query_pattern(store, '.{3}', 'W', within=2)['overall']['successes'] == 2
+    # Every ball of a long enough streak is a trial with overlap
+    assert query_pattern(store, '.{2,}', 'W', within=1, overlap=True)['overall']['trials'] == 4
+
+
+@pytest.mark.parametrize('pattern', ['', 'Z', '.{0}', '.{3,2}', '[]', '.{x}'])
+def test_invalid_patterns_raise(pattern):
+    with pytest.raises(ValueError):
+        parse_pattern(pattern)
+
+
+def test_outcome_must_be_a_single_class():
+    assert parse_outcome('B') == {4, 5}
+    with pytest.raises(ValueError):
+        parse_outcome('W{2}')
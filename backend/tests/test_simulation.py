@@ -0,0 +1,143 @@
+"""Monte Carlo innings simulation with fixed seeds on synthetic outcome tables"""
+import numpy as np
+import pytest
+from flask import Flask
+import api.simulation
+from api.simulation import MAX_SYNC_SIMULATIONS, simulation_bp
+from utils import simulation
+from utils.simulation import OUTCOMES, chunk_plan, run_simulations, simulate_chunk, simulate_innings
+
+# Per-ball outcome probabilities: 0, 1, 2, 3, 4, 6, W, extra
+TYPICAL = np.array([0.45, 0.3, 0.08, 0.01, 0.09, 0.02, 0.03, 0.02])
+
+
+def cumulative_table(probabilities, slots=3, overs=10):
+    table = np.broadcast_to(np.cumsum(probabilities), (slots, overs, len(OUTCOMES))).copy()
+    table[..., -1] = 1.0
+    return table
+
+
+def outcome(name):
+    probabilities = np.zeros(len(OUTCOMES))
+    probabilities[OUTCOMES.index(name)] = 1.0
+    return probabilities
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Several chunks without simulating hundreds of thousands of innings
+    monkeypatch.setattr(simulation, 'CHUNK_SIZE', 1000)
+
+
+def test_chunk_plan_covers_every_simulation(small_chunks):
+    plan = chunk_plan(3500, seed=7)
+    assert [size for size, _ in plan] == [1000, 1000, 1000, 500]
+    assert [child.spawn_key for _, child in plan] == [(0,), (1,), (2,), (3,)]
+    assert [size for size, _ in chunk_plan(2000, seed=7)] == [1000, 1000]
+
+
+def test_same_seed_same_result(small_chunks):
+    table = cumulative_table(TYPICAL)
+    first = run_simulations(table, 10, 2500, 10, seed=42)
+    second = run_simulations(table, 10, 2500, 10, seed=42)
+    other = run_simulations(table, 10, 2500, 10, seed=43)
+    for a, b in zip(first, second):
+        np.testing.assert_array_equal(a, b)
+    assert not np.array_equal(first[0], other[0])
+
+
+def test_results_do_not_depend_on_workers(small_chunks):
+    table = cumulative_table(TYPICAL)
+    serial = run_simulations(table, 10, 3500, 10, seed=5, workers=1)
+    pooled = run_simulations(table, 10, 3500, 10, seed=5, workers=3)
+    for a, b in zip(serial, pooled):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_results_do_not_depend_on_chunk_count(small_chunks):
+    # A chunk's seed depends only on its position, so a longer run extends a shorter one
+    table = cumulative_table(TYPICAL)
+    short = run_simulations(table, 10, 2000, 10, seed=9)
+    longer = run_simulations(table, 10, 3500, 10, seed=9)
+    for a, b in zip(short, longer):
+        np.testing.assert_array_equal(a, b[:2000])
+
+
+def test_innings_end_at_wickets_or_overs():
+    runs, wickets, balls = simulate_chunk(cumulative_table(TYPICAL), 10, 5000, 4, seed=1)
+    assert wickets.max() <= 4 and balls.max() <= 60
+    assert ((wickets == 4) | (balls == 60)).all()
+    # Extras add a run without using up a ball
+    assert runs.max() > 0
+
+
+def test_every_ball_a_wicket():
+    runs, wickets, balls = simulate_chunk(cumulative_table(outcome('W')), 10, 100, 10, seed=1)
+    assert (wickets == 10).all() and (balls == 10).all() and (runs == 0).all()
+
+
+def test_every_ball_a_single():
+    runs, wickets, balls = simulate_chunk(cumulative_table(outcome('1')), 5, 100, 10, seed=1)
+    assert (runs == 30).all() and (wickets == 0).all() and (balls == 30).all()
+
+
+def test_wickets_bring_in_the_next_batter():
+    # Slot 0 hits every ball for six, slot 1 is out first ball
+    six = cumulative_table(outcome('6'), slots=1)[0]
+    out = cumulative_table(outcome('W'), slots=1)[0]
+    table = np.stack([six, out, six])
+    # The striker changes at the end of the over, and one wicket in hand ends the innings
+    runs, wickets, balls = simulate_chunk(table, 10, 10, 1, seed=1)
+    assert (runs == 36).all() and (wickets == 1).all() and (balls == 7).all()
+    # With two in hand the replacement (last slot) carries on hitting sixes
+    runs, wickets, balls = simulate_chunk(table, 2, 10, 2, seed=1)
+    assert (runs == 36 + 30).all() and (wickets == 1).all() and (balls == 12).all()
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'batters': []},
+    {'attack': []},
+    {'over_start': 45, 'overs': 10},
+    {'wickets_lost': 10},
+    {'simulations': 0},
+    {'simulations': simulation.MAX_SIMULATIONS + 1},
+])
+def test_invalid_parameters_raise(kwargs):
+    arguments = {'batters': ['a', 'b'], 'attack': ['pace'], **kwargs}
+    with pytest.raises(ValueError):
+        simulate_innings(None, **arguments)
+
+
+class NoDatabase:
+    cursor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api.simulation, 'Database', NoDatabase)
+    monkeypatch.setattr(api.simulation, 'simulate_innings', lambda cursor, **kwargs: calls.append(kwargs) or {})
+    app = Flask(__name__)
+    app.register_blueprint(simulation_bp, url_prefix='/api/simulation')
+    app.calls = calls
+    return app.test_client()
+
+
+def test_synchronous_runs_are_capped(client):
+    response = client.get('/api/simulation/innings', query_string={
+        'batters': 'a,b', 'attack': 'pace', 'simulations': MAX_SYNC_SIMULATIONS + 1})
+    assert response.status_code == 400
+    assert client.application.calls == []
+
+
+def test_synchronous_runs_use_one_worker(client):
+    response = client.get('/api/simulation/innings', query_string={
+        'batters': 'a,b', 'attack': 'pace', 'simulations': MAX_SYNC_SIMULATIONS, 'workers': 8})
+    assert response.status_code == 200
+    assert client.application.calls[0]['workers'] == 1
@@ -0,0 +1,125 @@
+"""KLL and HyperLogLog sketches against exact answers on synthetic streams"""
+import numpy as np
+import pytest
+from utils.sketches import HyperLogLog, KLLSketch, load_sketch
+
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+# Normalized rank error allowed for k=200
+RANK_ERROR = 0.02
+
+
+def kll_from(values, k=200):
+    sketch = KLLSketch(k)
+    for value in values:
+        sketch.update(value)
+    return sketch
+
+
+def total_weight(sketch):
+    return sum(len(items) << level for level, items in enumerate(sketch.levels))
+
+
+def assert_quantiles_close(sketch, values):
+    ordered = np.sort(values)
+    for q in QUANTILES:
+        estimate = sketch.quantile(q)
+        # Where the estimate falls among the exact values, against the rank asked for
+        rank = np.searchsorted(ordered, estimate, side='right') / len(ordered)
+        assert abs(rank - q) <= RANK_ERROR, (q, estimate, np.percentile(values, q * 100))
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_kll_quantiles_within_rank_error(seed):
+    values = np.random.default_rng(seed).lognormal(3, 1, size=20000)
+    sketch = kll_from(values)
+    assert sketch.n == len(values)
+    assert len(sketch.levels) > 1
+    assert_quantiles_close(sketch, values)
+
+
+@pytest.mark.parametrize('size', [1, 201, 1001, 4999])
+def test_kll_compaction_preserves_weight(size):
+    # Odd level sizes leave one item behind instead of dropping it
+    sketch = kll_from(range(size), k=8)
+    assert total_weight(sketch) == sketch.n == size
+
+
+def test_kll_small_stream_is_exact():
+    sketch = kll_from([5, 1, 4, 2, 3])
+    assert [sketch.quantile(q) for q in (0.2, 0.5, 1.0)] == [1, 3, 5]
+    assert sketch.percentiles(points=(50,)) == {'p50': 3}
+    assert KLLSketch().quantile(0.5) is None
+    assert KLLSketch().percentiles(points=(50,)) == {'p50': None}
+
+
+def test_kll_merge_matches_combined_stream():
+    rng = np.random.default_rng(7)
+    parts = [rng.normal(50, 20, size=size) for size in (3000, 12000, 500)]
+    merged = kll_from(parts[0])
+    for part in parts[1:]:
+        merged.merge(kll_from(part))
+
+    combined = np.concatenate(parts)
+    assert merged.n == len(combined) == total_weight(merged)
+    assert_quantiles_close(merged, combined)
+    # Merging gives the same answers, in rank, as one sketch over the combined stream
+    ordered = np.sort(combined)
+    direct = kll_from(combined)
+    for q in QUANTILES:
+        ranks = np.searchsorted(ordered, [merged.quantile(q), direct.quantile(q)], side='right')
+        assert abs(ranks[0] - ranks[1]) / len(ordered) <= RANK_ERROR
+
+
+def test_kll_round_trip():
+    sketch = kll_from(np.random.default_rng(3).random(5000))
+    restored = load_sketch(sketch.to_bytes())
+    assert isinstance(restored, KLLSketch)
+    assert (restored.k, restored.n, restored.levels) == (sketch.k, sketch.n, sketch.levels)
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+
+def hll_from(values, p=11):
+    sketch = HyperLogLog(p)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.mark.parametrize('cardinality', [10, 100, 1000, 10000, 50000])
+def test_hll_count_error(cardinality):
+    # Repeats must not change the count
+    sketch = hll_from([f'player-{i % cardinality}' for i in range(cardinality * 2)])
+    assert abs(sketch.count() - cardinality) <= max(1, 0.07 * cardinality)
+
+
+def test_hll_empty_counts_zero():
+    assert HyperLogLog().count() == 0
+
+
+@pytest.mark.parametrize('cardinality,dense', [(5, False), (300, False), (5000, True)])
+def test_hll_round_trip(cardinality, dense):
+    sketch = hll_from(range(cardinality))
+    data = sketch.to_bytes()
+    # Sparse stores 3 bytes per touched register, dense one per register
+    assert data[2] == dense
+    assert len(data) == 3 + (sketch.m if dense else 3 * np.count_nonzero(sketch.registers))
+    restored = load_sketch(data)
+    assert isinstance(restored, HyperLogLog)
+    np.testing.assert_array_equal(restored.registers, sketch.registers)
+    assert restored.count() == sketch.count()
+
+
+def test_hll_merge_equals_combined_stream():
+    names = [f'bowler-{i}' for i in range(3000)]
+    merged = hll_from(names[:2000]).merge(hll_from(names[1000:]))
+    np.testing.assert_array_equal(merged.registers, hll_from(names).registers)
+    # A stored sparse sketch merges the same as a live one
+    sparse = HyperLogLog.from_bytes(hll_from(names[2900:]).to_bytes())
+    np.testing.assert_array_equal(hll_from(names[:2900]).merge(sparse).registers, hll_from(names).registers)
+
+
+def test_unknown_sketch_bytes_raise():
+    with pytest.raises(ValueError):
+        load_sketch(b'Zxyz')
+    with pytest.raises(ValueError):
+        KLLSketch.from_bytes(HyperLogLog().to_bytes() + bytes(16))
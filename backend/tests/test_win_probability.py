@@ -0,0 +1,128 @@
+"""Logistic fit, per-innings model and comeback detection on synthetic matches"""
+import numpy as np
+import pytest
+from utils.win_probability import comeback_rows, fit_logistic, predict, sigmoid, train
+
+# Runs per legal ball and the chance of a wicket, roughly an ODI scoring rate
+RUNS = np.array([0, 1, 2, 4, 6])
+RUN_PROBABILITIES = np.array([0.5, 0.3, 0.08, 0.1, 0.02])
+WICKET_PROBABILITY = 0.03
+
+COLUMNS = ('match_id', 'innings_no', 'ball_seq', 'over_num', 'ball_in_over', 'batting_team', 'score',
+           'legal_balls', 'wickets', 'allotted_overs', 'target', 'batting_first', 'winner')
+
+
+def play_innings(rng, target=None):
+    """[(score, wickets, legal balls)] after each ball of a 50-over innings"""
+    out = rng.random(300) < WICKET_PROBABILITY
+    runs = np.where(out, 0, rng.choice(RUNS, size=300, p=RUN_PROBABILITIES))
+    score, wickets = np.cumsum(runs), np.cumsum(out)
+    finished = (wickets >= 10) | (score >= (target if target is not None else np.inf))
+    balls = int(np.argmax(finished)) + 1 if finished.any() else 300
+    return [(int(score[b]), int(wickets[b]), b + 1) for b in range(balls)]
+
+
+def synthetic_states(matches=300, seed=0):
+    """Column arrays in the shape load_states returns"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for m in range(matches):
+        first = play_innings(rng)
+        target = first[-1][0] + 1
+        chase = play_innings(rng, target)
+        final = chase[-1][0]
+        winner = 'B' if final >= target else ('A' if final < target - 1 else None)
+        for innings_no, (team, balls) in enumerate((('A', first), ('B', chase))):
+            for seq, (score, wickets, legal) in enumerate(balls, 1):
+                rows.append((f'm{m:04d}', innings_no, seq, (legal - 1) // 6, (legal - 1) % 6 + 1, team,
+                             score, legal, wickets, 50, target, 'A', winner))
+    return states_from_rows(rows)
+
+
+def states_from_rows(rows):
+    states = {}
+    for name, values in zip(COLUMNS, zip(*rows)):
+        dtype = object if name in ('match_id', 'batting_team', 'batting_first', 'winner') else np.int64
+        states[name] = np.array(values, dtype=dtype)
+    key = states['match_id'] + ':' + states['innings_no'].astype(str).astype(object)
+    states['innings_end'] = np.r_[key[1:] != key[:-1], True]
+    return states
+
+
+def chase_state(runs_required, balls_remaining, wickets_down, target=250):
+    """One mid-chase row of a match that has not finished"""
+    score = target - runs_required
+    legal = 300 - balls_remaining
+    return states_from_rows([
+        ('x', 1, legal, legal // 6, legal % 6 + 1, 'B', score, legal, wickets_down, 50, target, 'A', 'A'),
+        ('x', 1, legal + 1, legal // 6, legal % 6 + 1, 'B', score, legal, wickets_down, 50, target, 'A', 'A'),
+    ])
+
+
+def chase_win(model, runs_required, balls_remaining, wickets_down):
+    states = chase_state(runs_required, balls_remaining, wickets_down)
+    return 1 - predict(model, states)[0]
+
+
+@pytest.fixture(scope='module')
+def model():
+    model, metrics = train(synthetic_states())
+    # Far better than guessing
+    assert metrics['holdout_accuracy'] > 0.7
+    assert metrics['holdout_brier'] < 0.2
+    return model
+
+
+def test_fit_recovers_known_coefficients():
+    rng = np.random.default_rng(1)
+    X = np.column_stack([np.ones(40000), rng.normal(size=40000), rng.uniform(-1, 1, size=40000)])
+    true = np.array([0.5, -1.5, 2.0])
+    y = (rng.random(40000) < sigmoid(X @ true)).astype(float)
+    np.testing.assert_allclose(fit_logistic(X, y), true, atol=0.1)
+
+
+def test_sigmoid_does_not_overflow():
+    with np.errstate(over='raise'):
+        np.testing.assert_allclose(sigmoid(np.array([-1000.0, 0.0, 1000.0])), [0, 0.5, 1], atol=1e-12)
+
+
+def test_chase_is_harder_with_more_runs_required(model):
+    probabilities = [chase_win(model, runs, 120, 3) for runs in (20, 60, 100, 140, 180)]
+    assert probabilities == sorted(probabilities, reverse=True)
+    assert probabilities[0] > 0.9 and probabilities[-1] < 0.2
+
+
+def test_chase_is_easier_with_more_wickets_in_hand(model):
+    probabilities = [chase_win(model, 100, 120, down) for down in (1, 3, 5, 7, 9)]
+    assert probabilities == sorted(probabilities, reverse=True)
+
+
+def test_first_innings_probability_rises_with_score(model):
+    rows = [('x', 0, 150, 24, 6, 'A', score, 150, 3, 50, 0, 'A', 'A') for score in (80, 110, 140, 170)]
+    probabilities = predict(model, states_from_rows(rows))
+    assert list(probabilities) == sorted(probabilities)
+
+
+def test_decided_chases_are_certain(model):
+    states = states_from_rows([
+        # Target reached
+        ('w', 1, 200, 33, 2, 'B', 251, 200, 4, 50, 251, 'A', 'B'),
+        # Bowled out one short of the target is a tie
+        ('t', 1, 250, 41, 4, 'B', 250, 250, 10, 50, 251, 'A', None),
+        # Out of balls well short
+        ('l', 1, 300, 49, 6, 'B', 200, 300, 6, 50, 251, 'A', 'A'),
+    ])
+    np.testing.assert_array_equal(predict(model, states), [0.0, 0.5, 1.0])
+
+
+def test_comeback_is_the_winners_lowest_point():
+    states = states_from_rows([
+        ('m1', 0, 1, 0, 1, 'A', 4, 1, 0, 50, 100, 'A', 'B'),
+        ('m1', 1, 1, 0, 1, 'B', 0, 1, 1, 50, 100, 'A', 'B'),
+        ('m1', 1, 2, 0, 2, 'B', 1, 2, 1, 50, 100, 'A', 'B'),
+        # No winner: no comeback row
+        ('m2', 0, 1, 0, 1, 'A', 0, 1, 0, 50, 100, 'A', None),
+    ])
+    # Probabilities are for the team batting first, so B's were 0.4, 0.1 and 0.3
+    rows = comeback_rows(states, np.array([0.6, 0.9, 0.7, 0.5]))
+    assert rows == [('m1', 'B', 0.1, 1, 0.1, 0, 1)]
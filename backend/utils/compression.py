@@ -0,0 +1,62 @@
+"""
+Negotiated response compression
+Large JSON responses (full match documents, leaderboards) are compressed with
+brotli when the client accepts it and the brotli package is installed,
+otherwise with gzip.
+"""
+import gzip
+import os
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_LEVEL_GZIP = int(os.getenv('COMPRESS_LEVEL_GZIP', 6))
+COMPRESS_LEVEL_BROTLI = int(os.getenv('COMPRESS_LEVEL_BROTLI', 5))
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/csv')
+
+
+def choose_encoding(accept_encodings):
+    """Pick the best supported encoding from a werkzeug Accept-Encoding header"""
+    if brotli is not None and accept_encodings['br']:
+        return 'br'
+    if accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_payload(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_LEVEL_BROTLI)
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL_GZIP)
+
+
+def init_compression(app):
+    """Register the response compression hook on the Flask app"""
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+
+        response.set_data(compress_payload(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,297 @@
+"""
+Fantasy points for every player in every match
+A rule set is a plain dict (DEFAULT_RULES shows every key; a custom set only
+needs the keys it changes). Counters for each (match, player) in the playing
+XIs come from one query over deliveries and wickets, and points are computed
+for all rows at once with NumPy, so scoring the full history is a single
+batch. Results are stored in fantasy_points per rule set.
+"""
+import copy
+import json
+import time
+import numpy as np
+from psycopg2.extras import execute_values
+
+DEFAULT_RULES = {
+    'playing': 4,
+    'batting': {
+        'run': 1,
+        'four': 1,
+        'six': 2,
+        'half_century': 4,
+        'century': 8,
+        'duck': -3,
+        # Strike-rate bands: [from (inclusive), to (exclusive), points]
+        'strike_rate_min_balls': 20,
+        'strike_rate': [[140, None, 6], [120, 140, 4], [100, 120, 2], [40, 50, -2], [30, 40, -4], [None, 30, -6]],
+    },
+    'bowling': {
+        'wicket': 25,
+        'lbw_bowled': 8,
+        'four_wickets': 4,
+        'five_wickets': 8,
+        'maiden': 4,
+        # Economy bands, runs per over
+        'economy_min_balls': 30,
+        'economy': [[None, 2.5, 6], [2.5, 3.5, 4], [3.5, 4.5, 2], [7, 8, -2], [8, 9, -4], [9, None, -6]],
+    },
+    'fielding': {
+        'catch': 8,
+        'three_catches': 4,
+        'stumping': 12,
+        'run_out_direct': 12,
+        'run_out_indirect': 6,
+    },
+}
+
+# One row per player in each match's XIs; super overs are not scored
+COUNTERS_QUERY = """
+    WITH squads AS (
+        SELECT mi.id as match_id, squad.key as team, player, mi.info->>'season' as season
+        FROM match_info mi,
+        LATERAL jsonb_each(mi.info->'players') as squad,
+        LATERAL jsonb_array_elements_text(squad.value) as player
+        {match_filter}
+    ),
+    batting AS (
+        SELECT match_id, batter as player,
+               SUM(runs_batter) as runs,
+               COUNT(*) FILTER (WHERE wides = 0) as balls,
+               COUNT(*) FILTER (WHERE runs_batter = 4) as fours,
+               COUNT(*) FILTER (WHERE runs_batter = 6) as sixes
+        FROM deliveries
+        WHERE innings_no < 2 {delivery_filter}
+        GROUP BY match_id, batter
+    ),
+    outs AS (
+        SELECT match_id, player_out as player, COUNT(*) as dismissals
+        FROM wickets
+        WHERE innings_no < 2 AND is_dismissal {delivery_filter}
+        GROUP BY match_id, player_out
+    ),
+    overs AS (
+        SELECT match_id, bowler,
+               COUNT(*) FILTER (WHERE is_legal) as balls,
+               SUM(runs_batter + wides + noballs) as runs
+        FROM deliveries
+        WHERE innings_no < 2 {delivery_filter}
+        GROUP BY match_id, innings_no, over_num, bowler
+    ),
+    bowling AS (
+        SELECT match_id, bowler as player,
+               SUM(balls) as balls,
+               SUM(runs) as runs,
+               COUNT(*) FILTER (WHERE balls = 6 AND runs = 0) as maidens
+        FROM overs
+        GROUP BY match_id, bowler
+    ),
+    bowler_wickets AS (
+        SELECT match_id, bowler as player,
+               COUNT(*) as wickets,
+               COUNT(*) FILTER (WHERE kind IN ('lbw', 'bowled')) as lbw_bowled
+        FROM wickets
+        WHERE innings_no < 2 AND bowler_wicket {delivery_filter}
+        GROUP BY match_id, bowler
+    ),
+    fielding AS (
+        SELECT match_id, fielder as player,
+               COUNT(*) FILTER (WHERE kind = 'caught') as catches,
+               COUNT(*) FILTER (WHERE kind = 'stumped') as stumpings,
+               COUNT(*) FILTER (WHERE kind = 'run out' AND cardinality(fielders) = 1) as run_outs_direct,
+               COUNT(*) FILTER (WHERE kind = 'run out' AND cardinality(fielders) > 1) as run_outs_indirect
+        FROM wickets, unnest(fielders) as fielder
+        WHERE innings_no < 2 {delivery_filter}
+        GROUP BY match_id, fielder
+        UNION ALL
+        SELECT match_id, bowler, COUNT(*), 0, 0, 0
+        FROM wickets
+        WHERE innings_no < 2 AND kind = 'caught and bowled' {delivery_filter}
+        GROUP BY match_id, bowler
+    ),
+    fielding_totals AS (
+        SELECT match_id, player, SUM(catches) as catches, SUM(stumpings) as stumpings,
+               SUM(run_outs_direct) as run_outs_direct, SUM(run_outs_indirect) as run_outs_indirect
+        FROM fielding
+        GROUP BY match_id, player
+    )
+    SELECT
+        s.match_id, s.player, s.team, s.season,
+        COALESCE(b.runs, 0) as runs, COALESCE(b.balls, 0) as balls_faced,
+        COALESCE(b.fours, 0) as fours, COALESCE(b.sixes, 0) as sixes,
+        COALESCE(o.dismissals, 0) as dismissals,
+        COALESCE(bw.balls, 0) as balls_bowled, COALESCE(bw.runs, 0) as runs_conceded,
+        COALESCE(bw.maidens, 0) as maidens,
+        COALESCE(wk.wickets, 0) as wickets, COALESCE(wk.lbw_bowled, 0) as lbw_bowled,
+        COALESCE(f.catches, 0) as catches, COALESCE(f.stumpings, 0) as stumpings,
+        COALESCE(f.run_outs_direct, 0) as run_outs_direct, COALESCE(f.run_outs_indirect, 0) as run_outs_indirect
+    FROM squads s
+    LEFT JOIN batting b ON b.match_id = s.match_id AND b.player = s.player
+    LEFT JOIN outs o ON o.match_id = s.match_id AND o.player = s.player
+    LEFT JOIN bowling bw ON bw.match_id = s.match_id AND bw.player = s.player
+    LEFT JOIN bowler_wickets wk ON wk.match_id = s.match_id AND wk.player = s.player
+    LEFT JOIN fielding_totals f ON f.match_id = s.match_id AND f.player = s.player
+    ORDER BY s.match_id, s.team, s.player
+"""
+
+TEXT_COLUMNS = ('match_id', 'player', 'team', 'season')
+
+
+def merge_rules(custom=None):
+    """DEFAULT_RULES with any keys from custom (nested one level) overriding them"""
+    rules = copy.deepcopy(DEFAULT_RULES)
+    for key, value in (custom or {}).items():
+        if key not in rules:
+            raise ValueError(f'Unknown rule section: {key}')
+        if isinstance(rules[key], dict):
+            unknown = set(value) - set(rules[key])
+            if unknown:
+                raise ValueError(f"Unknown {key} rules: {', '.join(sorted(unknown))}")
+            rules[key].update(value)
+        else:
+            rules[key] = value
+    return rules
+
+
+def load_counters(cursor, match_id=None):
+    """Counter columns as arrays, one entry per (match, player)"""
+    if match_id is None:
+        query = COUNTERS_QUERY.format(match_filter='', delivery_filter='')
+        params = ()
+    else:
+        query = COUNTERS_QUERY.format(match_filter='WHERE mi.id = %(match_id)s',
+                                      delivery_filter='AND match_id = %(match_id)s')
+        params = {'match_id': match_id}
+
+    plain = cursor.connection.cursor()
+    plain.execute(query, params)
+    names = [column.name for column in plain.description]
+    rows = plain.fetchall()
+    plain.close()
+    if not rows:
+        return {}
+    return {
+        name: np.array(values, dtype=object if name in TEXT_COLUMNS else np.int64)
+        for name, values in zip(names, zip(*rows))
+    }
+
+
+def band_points(values, eligible, bands):
+    """Points for the first [from, to) band containing each value, where eligible"""
+    points = np.zeros(len(values))
+    assigned = ~eligible
+    for low, high, score in bands:
+        inside = ~assigned
+        if low is not None:
+            inside &= values >= low
+        if high is not None:
+            inside &= values < high
+        points[inside] = score
+        assigned |= inside
+    return points
+
+
+def score(counters, rules):
+    """{'batting', 'bowling', 'fielding', 'playing', 'total'} point arrays"""
+    bat, bowl, field = rules['batting'], rules['bowling'], rules['fielding']
+    c = counters
+
+    runs = c['runs']
+    batting = (runs * bat['run'] + c['fours'] * bat['four'] + c['sixes'] * bat['six']
+               + np.where(runs >= 100, bat['century'], np.where(runs >= 50, bat['half_century'], 0))
+               + np.where((runs == 0) & (c['dismissals'] > 0), bat['duck'], 0))
+    strike_rate = np.divide(runs * 100, c['balls_faced'], out=np.zeros(len(runs)), where=c['balls_faced'] > 0)
+    batting = batting + band_points(strike_rate, c['balls_faced'] >= bat['strike_rate_min_balls'],
+                                    bat['strike_rate'])
+
+    wickets = c['wickets']
+    bowling = (wickets * bowl['wicket'] + c['lbw_bowled'] * bowl['lbw_bowled'] + c['maidens'] * bowl['maiden']
+               + np.where(wickets >= 5, bowl['five_wickets'], np.where(wickets >= 4, bowl['four_wickets'], 0)))
+    economy = np.divide(c['runs_conceded'] * 6, c['balls_bowled'], out=np.zeros(len(runs)),
+                        where=c['balls_bowled'] > 0)
+    bowling = bowling + band_points(economy, c['balls_bowled'] >= bowl['economy_min_balls'], bowl['economy'])
+
+    fielding = (c['catches'] * field['catch'] + np.where(c['catches'] >= 3, field['three_catches'], 0)
+                + c['stumpings'] * field['stumping'] + c['run_outs_direct'] * field['run_out_direct']
+                + c['run_outs_indirect'] * field['run_out_indirect'])
+
+    playing = np.full(len(runs), rules['playing'], dtype=float)
+    return {
+        'batting': batting.astype(float),
+        'bowling': bowling.astype(float),
+        'fielding': fielding.astype(float),
+        'playing': playing,
+        'total': batting + bowling + fielding + playing,
+    }
+
+
+def save_points(cursor, rule_set, counters, points, match_id=None):
+    if match_id is None:
+        cursor.execute("DELETE FROM fantasy_points WHERE rule_set = %s", (rule_set,))
+    else:
+        cursor.execute("DELETE FROM fantasy_points WHERE rule_set = %s AND match_id = %s", (rule_set, match_id))
+    if not counters:
+        return
+    rows = zip(
+        [rule_set] * len(counters['match_id']), counters['match_id'], counters['player'],
+        counters['team'], counters['season'],
+        *(points[part].tolist() for part in ('batting', 'bowling', 'fielding', 'playing', 'total'))
+    )
+    execute_values(cursor, """
+        INSERT INTO fantasy_points (
+            rule_set, match_id, player, team, season, batting, bowling, fielding, playing, total
+        ) VALUES %s
+    """, list(rows), page_size=5000)
+
+
+def save_rule_set(cursor, name, rules, timings=None):
+    cursor.execute("""
+        INSERT INTO fantasy_rule_sets (name, rules, timings, scored_at) VALUES (%s, %s, %s, now())
+        ON CONFLICT (name) DO UPDATE
+        SET rules = EXCLUDED.rules, timings = EXCLUDED.timings, scored_at = now()
+    """, (name, json.dumps(rules), json.dumps(timings) if timings else None))
+
+
+def load_rule_sets(cursor):
+    """{name: rules} for every stored rule set"""
+    plain = cursor.connection.cursor()
+    plain.execute("SELECT name, rules FROM fantasy_rule_sets")
+    rule_sets = dict(plain.fetchall())
+    plain.close()
+    return rule_sets
+
+
+def score_all(cursor, rule_set='default', custom_rules=None):
+    """
+    Batch mode: score every match under a rule set and persist it.
+    Returns the timing breakdown in seconds plus the row count.
+    """
+    rules = merge_rules(custom_rules)
+
+    started = time.perf_counter()
+    counters = load_counters(cursor)
+    loaded = time.perf_counter()
+    points = score(counters, rules) if counters else {}
+    scored = time.perf_counter()
+    save_points(cursor, rule_set, counters, points)
+    saved = time.perf_counter()
+
+    timings = {
+        'rows': len(counters.get('match_id', [])),
+        'matches': len(set(counters.get('match_id', []))),
+        'load_seconds': round(loaded - started, 3),
+        'score_seconds': round(scored - loaded, 4),
+        'save_seconds': round(saved - scored, 3),
+        'total_seconds': round(saved - started, 3),
+    }
+    save_rule_set(cursor, rule_set, rules, timings)
+    return timings
+
+
+def score_match(cursor, match_id):
+    """Rescore one match under every stored rule set (used at ingest)"""
+    rule_sets = load_rule_sets(cursor)
+    if not rule_sets:
+        return
+    counters = load_counters(cursor, match_id)
+    for name, rules in rule_sets.items():
+        save_points(cursor, name, counters, score(counters, rules) if counters else {}, match_id)
@@ -0,0 +1,116 @@
+"""
+Career timelines and rolling form from per-innings prefix sums
+A player's innings are loaded once in chronological order and each counter
+(runs, balls, dismissals, wickets) becomes a cumulative array with a leading
+zero, so the total over any run of innings is one subtraction and a rolling
+window over the whole career is a single vectorized pass.
+"""
+import numpy as np
+
+BATTING_INNINGS_QUERY = """
+    WITH faced AS (
+        SELECT match_id, innings_no, SUM(runs_batter) as runs, COUNT(*) as balls
+        FROM deliveries
+        WHERE batter = %s
+        GROUP BY match_id, innings_no
+    ),
+    outs AS (
+        SELECT match_id, innings_no, COUNT(*) as dismissals
+        FROM wickets
+        WHERE player_out = %s AND is_dismissal
+        GROUP BY match_id, innings_no
+    )
+    SELECT
+        match_id,
+        innings_no,
+        mi.info->'dates'->>0 as match_date,
+        mi.info->>'season' as season,
+        COALESCE(f.runs, 0) as runs,
+        COALESCE(f.balls, 0) as balls,
+        COALESCE(o.dismissals, 0) as dismissals
+    FROM faced f
+    FULL JOIN outs o USING (match_id, innings_no)
+    JOIN match_info mi ON mi.id = match_id
+    {entry_filter}
+    ORDER BY match_date, match_id, innings_no
+"""
+
+BOWLING_INNINGS_QUERY = """
+    WITH bowled AS (
+        SELECT
+            match_id,
+            innings_no,
+            SUM(runs_total) as runs,
+            COUNT(*) as balls,
+            SUM(CASE WHEN bowler_wicket THEN 1 ELSE 0 END) as wickets
+        FROM deliveries
+        WHERE bowler = %s
+        GROUP BY match_id, innings_no
+    )
+    SELECT
+        b.match_id,
+        b.innings_no,
+        mi.info->'dates'->>0 as match_date,
+        mi.info->>'season' as season,
+        b.runs,
+        b.balls,
+        b.wickets
+    FROM bowled b
+    JOIN match_info mi ON mi.id = b.match_id
+    ORDER BY match_date, b.match_id, b.innings_no
+"""
+
+
+def prefix_sums(values):
+    """Cumulative sums with a leading zero: total of values[i:j] is p[j] - p[i]"""
+    p = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(values, out=p[1:])
+    return p
+
+
+def rolling_sums(values, window):
+    """Sum over the last `window` innings ending at each innings"""
+    p = prefix_sums(values)
+    end = np.arange(1, len(values) + 1)
+    return p[end] - p[np.maximum(end - window, 0)]
+
+
+def last_n_sum(values, n):
+    p = prefix_sums(values)
+    return int(p[-1] - p[max(len(values) - n, 0)])
+
+
+def ratios(numerator, denominator, scale=1, digits=2):
+    """Element-wise numerator / denominator * scale, None where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    out = np.divide(numerator * scale, denominator,
+                    out=np.full(numerator.shape, np.nan), where=denominator != 0)
+    return [None if np.isnan(v) else round(float(v), digits) for v in np.atleast_1d(out)]
+
+
+def ratio(numerator, denominator, scale=1, digits=2):
+    return ratios([numerator], [denominator], scale, digits)[0]
+
+
+def group_totals(keys, columns):
+    """
+    Sum each column per key, keeping keys in order of first appearance.
+    Returns (keys, {column name: summed array}, innings per key).
+    """
+    unique, first, inverse = np.unique(np.asarray(keys, dtype=object).astype(str),
+                                       return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    slot = rank[inverse]
+
+    totals = {name: np.bincount(slot, weights=values, minlength=len(unique)).astype(np.int64)
+              for name, values in columns.items()}
+    counts = np.bincount(slot, minlength=len(unique))
+    return [keys[i] for i in first[order]], totals, counts
+
+
+def innings_arrays(rows, columns):
+    """Column arrays from the chronologically ordered innings rows"""
+    return {name: np.array([row[name] for row in rows], dtype=np.int64) for name in columns}
@@ -1,6 +1,7 @@
 """
 Utility functions for the ODI Cricket Analytics application
 """
+import re
 
 def format_player_name(name):
     """Format player name for consistent display"""
@@ -46,11 +47,106 @@ def format_date(date_str):
     except:
         return date_str
 
-def get_phase_from_over(over_num):
-    """Get match phase from over number"""
-    if over_num < 10:
+PHASES = ('Powerplay', 'Middle Overs', 'Death Overs')
+
+# Phase for each window when an innings only has mandatory powerplays (P1/P2/P3)
+MANDATORY_WINDOW_PHASES = {0: 'Powerplay', 1: 'Middle Overs', 2: 'Death Overs'}
+
+
+def parse_over_ball(value):
+    """Split a cricsheet over.ball marker (e.g. 9.6) into (over, ball)"""
+    over = int(value)
+    return over, int(round((value - over) * 10))
+
+
+def get_allotted_overs(innings, match_overs=50):
+    """Overs available to an innings, honouring a reduced chase target"""
+    target_overs = (innings.get('target') or {}).get('overs')
+    if target_overs:
+        return int(target_overs) + (1 if target_overs % 1 else 0)
+    return match_overs or 50
+
+
+def get_phase_from_over(over_num, allotted_overs=50):
+    """
+    Get match phase from over number when no powerplay data is available.
+    The first and last fifth of the innings are Powerplay and Death Overs,
+    i.e. overs 0-9 and 40-49 of a full 50-over innings.
+    """
+    edge = max(1, round(allotted_overs / 5))
+    if over_num < edge:
         return 'Powerplay'
-    elif over_num < 40:
+    elif over_num < allotted_overs - edge:
         return 'Middle Overs'
     else:
         return 'Death Overs'
+
+
+def get_powerplay_windows(innings):
+    """
+    Return [(label, type, first_over, last_over)] for an innings' powerplays,
+    labelled P1, P2, P3 in chronological order.
+    """
+    windows = []
+    for powerplay in sorted(innings.get('powerplays') or [], key=lambda p: p.get('from', 0)):
+        first_over, _ = parse_over_ball(powerplay.get('from', 0))
+        last_over, _ = parse_over_ball(powerplay.get('to', powerplay.get('from', 0)))
+        windows.append((f'P{len(windows) + 1}', powerplay.get('type'), first_over, last_over))
+    return windows
+
+
+def classify_innings_overs(innings, match_overs=50):
+    """
+    Map each over number in an innings to (phase, powerplay label).
+
+    Innings under the current rules carry three mandatory powerplays that
+    partition the innings (P1 = Powerplay, P2 = Middle Overs, P3 = Death
+    Overs), already scaled for rain-reduced matches. Older innings have a
+    mandatory P1 plus floating fielding/batting powerplays; there P1 is the
+    Powerplay and the rest falls back to get_phase_from_over on the allotted
+    overs.
+    """
+    allotted = get_allotted_overs(innings, match_overs)
+    windows = get_powerplay_windows(innings)
+    all_mandatory = bool(windows) and all(w[1] == 'mandatory' for w in windows)
+
+    overs = {}
+    for over in innings.get('overs') or []:
+        over_num = over.get('over', 0)
+        label = None
+        window_index = None
+        for index, (window_label, _, first_over, last_over) in enumerate(windows):
+            if first_over <= over_num <= last_over:
+                label = window_label
+                window_index = index
+                break
+
+        if all_mandatory and window_index in MANDATORY_WINDOW_PHASES:
+            phase = MANDATORY_WINDOW_PHASES[window_index]
+        elif window_index == 0 and windows[0][1] == 'mandatory':
+            phase = 'Powerplay'
+        elif all_mandatory and len(windows) >= 2 and over_num > windows[-1][3]:
+            # Past the last recorded window of a partitioned innings
+            phase = MANDATORY_WINDOW_PHASES.get(len(windows), 'Death Overs')
+        else:
+            phase = get_phase_from_over(over_num, allotted)
+            if phase == 'Powerplay' and windows and windows[0][1] == 'mandatory':
+                # Outside the recorded P1, so not a powerplay over
+                phase = 'Middle Overs'
+
+        overs[over_num] = (phase, label)
+
+    return overs
+
+
+def normalize_venue(name):
+    """
+    Key used to group spellings of the same ground: the name before any
+    ", City" suffix, lowercased, with punctuation and repeated spaces removed.
+    "Brisbane Cricket Ground, Woolloongabba" -> "brisbane cricket ground"
+    """
+    if not name:
+        return None
+    ground = name.split(',')[0]
+    ground = re.sub(r'[^0-9a-z ]+', ' ', ground.lower())
+    return ' '.join(ground.split()) or None
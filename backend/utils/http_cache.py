@@ -0,0 +1,167 @@
+"""
+HTTP caching keyed on the dataset version
+Data only changes when the loader ingests matches, so every GET response can be
+validated against the version stamp in dataset_version. Repeat requests with a
+matching If-None-Match are answered with 304 before any route query runs.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import g, request
+from models.database import Database
+
+CACHE_MAX_AGE = int(os.getenv('HTTP_CACHE_MAX_AGE', 300))
+VERSION_TTL_SECONDS = float(os.getenv('DATASET_VERSION_TTL', 5))
+MATCH_CACHE_SIZE = int(os.getenv('MATCH_CACHE_SIZE', 512))
+
+# Responses under these prefixes are not derived from the dataset alone
+UNCACHED_PREFIXES = ('/api/health', '/api/admin', '/api/jobs')
+
+_version_lock = threading.Lock()
+# Marks an empty cache, so a missing version (None) is cached like any other
+_UNSET = object()
+_version_cache = {'value': _UNSET, 'fetched_at': 0.0}
+
+
+def get_dataset_version():
+    """
+    Return {'version', 'updated_at'} for the loaded dataset, or None if the
+    dataset_version table has not been created yet. Cached per process for
+    DATASET_VERSION_TTL seconds so validation rarely needs a query.
+    """
+    now = time.time()
+    with _version_lock:
+        if _version_cache['value'] is not _UNSET and now - _version_cache['fetched_at'] < VERSION_TTL_SECONDS:
+            return _version_cache['value']
+
+    with Database() as db:
+        results = db.execute_query("SELECT version, updated_at FROM dataset_version WHERE id = 1")
+
+    value = results[0] if results else None
+    with _version_lock:
+        _version_cache['value'] = value
+        _version_cache['fetched_at'] = now
+    return value
+
+
+def clear_version_cache():
+    """Forget the cached version so the next request re-reads it"""
+    with _version_lock:
+        _version_cache['value'] = _UNSET
+        _version_cache['fetched_at'] = 0.0
+
+
+class VersionedCache:
+    """
+    Small per-process LRU for per-match payloads. Entries are tagged with the
+    dataset version they were built from and rebuilt once it changes.
+    """
+
+    def __init__(self, max_size=MATCH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss"""
+        version = get_dataset_version()
+        version = version['version'] if version else None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = (version, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return value
+
+    def get_many(self, keys, loader):
+        """
+        Return {key: value} for keys, calling loader(missing keys) once for
+        the misses; loader returns {key: value} and may omit unknown keys
+        """
+        version = get_dataset_version()
+        version = version['version'] if version else None
+
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+
+        missing = [key for key in keys if key not in found]
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                for key, value in loaded.items():
+                    if value is None:
+                        continue
+                    found[key] = value
+                    self._entries[key] = (version, value)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return found
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _is_cacheable_request():
+    return (
+        request.method in ('GET', 'HEAD')
+        and request.path.startswith('/api/')
+        and not request.path.startswith(UNCACHED_PREFIXES)
+    )
+
+
+def init_http_cache(app):
+    """Register the conditional GET hooks on the Flask app"""
+
+    @app.before_request
+    def check_not_modified():
+        if not _is_cacheable_request():
+            return None
+
+        version = get_dataset_version()
+        if not version:
+            return None
+
+        g.dataset_etag = f"v{version['version']}"
+        g.dataset_updated_at = version['updated_at']
+
+        not_modified = request.if_none_match.contains_weak(g.dataset_etag)
+        if not request.if_none_match and request.if_modified_since:
+            not_modified = g.dataset_updated_at.replace(microsecond=0) <= request.if_modified_since
+
+        if not_modified:
+            response = app.response_class(status=304)
+            _set_cache_headers(response)
+            return response
+
+        return None
+
+    @app.after_request
+    def add_cache_headers(response):
+        if getattr(g, 'dataset_etag', None) and response.status_code == 200:
+            _set_cache_headers(response)
+        return response
+
+
+def _set_cache_headers(response):
+    response.set_etag(g.dataset_etag, weak=True)
+    response.last_modified = g.dataset_updated_at
+    response.cache_control.public = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    response.vary.add('Origin')
@@ -0,0 +1,829 @@
+"""
+Derived tables built from each match document at ingest
+The loaders call ingest_match for every newly inserted match, and
+`python manage.py rebuild-derived` replays it over everything in odiwc2023.
+Each writer deletes the match's previous rows first, so ingesting twice is safe;
+sketches instead skip matches already merged, and a rebuild clears them first.
+"""
+from psycopg2.extras import Json, execute_values
+from utils.helpers import classify_innings_overs, get_allotted_overs, normalize_venue
+from utils.player_styles import (
+    UNKNOWN_STYLE, load_player_styles, resolve_bowling_types, resolve_player_styles
+)
+from utils.sketches import SKETCH_METRICS, load_sketch
+from utils.fantasy import score_match
+from utils.win_probability import comeback_rows, load_model, load_states, predict, save_comebacks
+
+# Dismissal kinds credited to the bowler; everything else (run out, timed out,
+# handled the ball, retirements, ...) is not
+BOWLER_WICKETS = ('bowled', 'caught', 'caught and bowled', 'lbw', 'stumped', 'hit wicket')
+# Wicket entries that do not end the batter's innings as a dismissal
+NOT_DISMISSALS = ('retired hurt', 'retired not out')
+
+
+def parse_match_date(info):
+    dates = info.get('dates') or []
+    return dates[0] if dates else None
+
+
+def parse_season_year(info):
+    season = str(info.get('season') or '')
+    return int(season[:4]) if season[:4].isdigit() else None
+
+
+def player_team(info, player):
+    """Return the team a player was listed for in this match, if any"""
+    for team, players in (info.get('players') or {}).items():
+        if player in players:
+            return team
+    return None
+
+
+def match_result(info, team):
+    """Result of the match from the point of view of team"""
+    outcome = info.get('outcome') or {}
+    if outcome.get('winner'):
+        return 'won' if outcome['winner'] == team else 'lost'
+    if outcome.get('result') == 'tie':
+        return 'tied'
+    return 'no result'
+
+
+def motm_award_rows(match_id, data):
+    """One row per player of the match award"""
+    info = data.get('info') or {}
+    teams = info.get('teams') or []
+    outcome = info.get('outcome') or {}
+    rows = []
+
+    for player in dict.fromkeys(info.get('player_of_match') or []):
+        team = player_team(info, player)
+        opponent = next((t for t in teams if t != team), None) if team else None
+        rows.append((
+            match_id,
+            player,
+            team,
+            opponent,
+            info.get('season'),
+            parse_season_year(info),
+            parse_match_date(info),
+            info.get('venue'),
+            info.get('city'),
+            (info.get('event') or {}).get('name'),
+            Json(teams),
+            outcome.get('winner'),
+            Json(outcome.get('by')) if outcome.get('by') else None,
+            match_result(info, team) if team else None
+        ))
+
+    return rows
+
+
+def write_motm_awards(cursor, match_id, data):
+    cursor.execute("DELETE FROM motm_awards WHERE match_id = %s", (match_id,))
+    rows = motm_award_rows(match_id, data)
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO motm_awards (
+                match_id, player, team, opponent, season, season_year, match_date,
+                venue, city, event_name, teams, winner, win_margin, result
+            ) VALUES %s
+        """, rows)
+
+
+def write_match_split(cursor, match_id, data):
+    """Store the header and each innings separately so info-only reads stay small"""
+    cursor.execute("DELETE FROM match_innings WHERE match_id = %s", (match_id,))
+    cursor.execute("""
+        INSERT INTO match_info (id, meta, info) VALUES (%s, %s, %s)
+        ON CONFLICT (id) DO UPDATE SET meta = EXCLUDED.meta, info = EXCLUDED.info
+    """, (match_id, Json(data.get('meta')) if 'meta' in data else None, Json(data.get('info') or {})))
+
+    innings = data.get('innings') or []
+    if innings:
+        execute_values(cursor, """
+            INSERT INTO match_innings (match_id, innings_no, data) VALUES %s
+        """, [(match_id, innings_no, Json(inning)) for innings_no, inning in enumerate(innings)])
+
+
+def iter_deliveries(data):
+    """
+    Walk every ball of a match in order, yielding
+    (innings_no, ball_seq, over_num, ball_in_over, batting_team, bowling_team,
+     phase, powerplay, delivery) with the phase resolved from the innings' powerplays
+    """
+    info = data.get('info') or {}
+    teams = info.get('teams') or []
+
+    for innings_no, innings in enumerate(data.get('innings') or []):
+        batting_team = innings.get('team')
+        bowling_team = next((t for t in teams if t != batting_team), None)
+        phases = classify_innings_overs(innings, info.get('overs'))
+        ball_seq = 0
+
+        for over in innings.get('overs') or []:
+            over_num = over.get('over', 0)
+            phase, powerplay = phases[over_num]
+
+            for ball_in_over, delivery in enumerate(over.get('deliveries') or [], 1):
+                ball_seq += 1
+                yield (innings_no, ball_seq, over_num, ball_in_over, batting_team,
+                       bowling_team, phase, powerplay, delivery)
+
+
+def delivery_rows(match_id, data, styles=None):
+    """
+    One row per ball, with its phase resolved from the innings' powerplays and
+    the batter's hand / bowler's style from styles ({name: (batting, bowling)})
+    """
+    styles = styles or {}
+    rows = []
+
+    for (innings_no, ball_seq, over_num, ball_in_over, batting_team,
+         bowling_team, phase, powerplay, delivery) in iter_deliveries(data):
+        runs = delivery.get('runs') or {}
+        extras = delivery.get('extras') or {}
+        wickets = delivery.get('wickets') or []
+        rows.append((
+            match_id,
+            innings_no,
+            ball_seq,
+            over_num,
+            ball_in_over,
+            batting_team,
+            bowling_team,
+            delivery.get('batter'),
+            delivery.get('bowler'),
+            delivery.get('non_striker'),
+            runs.get('batter', 0),
+            runs.get('extras', 0),
+            runs.get('total', 0),
+            extras.get('wides', 0),
+            extras.get('noballs', 0),
+            'wides' not in extras and 'noballs' not in extras,
+            bool(wickets),
+            any(w.get('kind') in BOWLER_WICKETS for w in wickets),
+            [w.get('player_out') for w in wickets],
+            phase,
+            powerplay,
+            styles.get(delivery.get('batter'), (None, None))[0],
+            styles.get(delivery.get('bowler'), (None, None))[1]
+        ))
+
+    return rows
+
+
+def registry_people(data):
+    """{cricsheet name: registry id} for everyone listed in the match"""
+    return ((data.get('info') or {}).get('registry') or {}).get('people') or {}
+
+
+def write_player_styles(cursor, match_id, data):
+    resolve_player_styles(cursor, registry_people(data))
+
+
+def write_deliveries(cursor, match_id, data):
+    cursor.execute("DELETE FROM deliveries WHERE match_id = %s", (match_id,))
+    rows = delivery_rows(match_id, data, load_player_styles(cursor, registry_people(data)))
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO deliveries (
+                match_id, innings_no, ball_seq, over_num, ball_in_over,
+                batting_team, bowling_team, batter, bowler, non_striker,
+                runs_batter, runs_extras, runs_total, wides, noballs,
+                is_legal, is_wicket, bowler_wicket, players_out, phase, powerplay,
+                batter_style, bowler_style
+            ) VALUES %s
+        """, rows, page_size=500)
+
+
+def wicket_rows(match_id, data):
+    """One row per wicket, including the second wicket on a ball"""
+    rows = []
+
+    for (innings_no, ball_seq, over_num, ball_in_over, batting_team,
+         bowling_team, phase, powerplay, delivery) in iter_deliveries(data):
+        for wicket_no, wicket in enumerate(delivery.get('wickets') or []):
+            kind = wicket.get('kind')
+            rows.append((
+                match_id,
+                innings_no,
+                ball_seq,
+                wicket_no,
+                over_num,
+                ball_in_over,
+                batting_team,
+                bowling_team,
+                delivery.get('batter'),
+                delivery.get('bowler'),
+                wicket.get('player_out'),
+                kind,
+                [f.get('name') for f in wicket.get('fielders') or [] if f.get('name')],
+                kind in BOWLER_WICKETS,
+                kind not in NOT_DISMISSALS,
+                phase
+            ))
+
+    return rows
+
+
+def write_wickets(cursor, match_id, data):
+    cursor.execute("DELETE FROM wickets WHERE match_id = %s", (match_id,))
+    rows = wicket_rows(match_id, data)
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO wickets (
+                match_id, innings_no, ball_seq, wicket_no, over_num, ball_in_over,
+                batting_team, bowling_team, batter, bowler, player_out, kind,
+                fielders, bowler_wicket, is_dismissal, phase
+            ) VALUES %s
+        """, rows)
+
+
+def write_team_phase_cube(cursor, match_id, data):
+    """Roll the match's deliveries and wickets up by innings and phase"""
+    info = data.get('info') or {}
+    cursor.execute("DELETE FROM team_phase_cube WHERE match_id = %s", (match_id,))
+    cursor.execute("""
+        INSERT INTO team_phase_cube (
+            match_id, innings_no, batting_team, bowling_team, season, venue, phase,
+            runs, extras, balls, wickets, fours, sixes, dots
+        )
+        SELECT
+            d.match_id, d.innings_no, d.batting_team, d.bowling_team, %s, %s, d.phase,
+            SUM(d.runs_batter),
+            SUM(d.runs_extras),
+            COUNT(*),
+            COALESCE(MAX(w.wickets), 0),
+            SUM(CASE WHEN d.runs_batter = 4 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN d.runs_batter = 6 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN d.runs_batter = 0 THEN 1 ELSE 0 END)
+        FROM deliveries d
+        LEFT JOIN (
+            SELECT innings_no, phase, COUNT(*) as wickets
+            FROM wickets
+            WHERE match_id = %s AND is_dismissal
+            GROUP BY innings_no, phase
+        ) w ON w.innings_no = d.innings_no AND w.phase = d.phase
+        WHERE d.match_id = %s
+        GROUP BY d.match_id, d.innings_no, d.batting_team, d.bowling_team, d.phase
+    """, (str(info['season']) if info.get('season') is not None else None,
+          info.get('venue'), match_id, match_id))
+
+
+def write_style_matchups(cursor, match_id, data):
+    """Per-player counters against each opposing style and phase for the match"""
+    cursor.execute("DELETE FROM style_matchups WHERE match_id = %s", (match_id,))
+    cursor.execute("""
+        INSERT INTO style_matchups (
+            match_id, player, role, opposing_style, phase, balls, runs, dismissals, dots, fours, sixes
+        )
+        SELECT
+            d.match_id, d.batter, 'batting', COALESCE(d.bowler_style, %(unknown)s), d.phase,
+            COUNT(*) FILTER (WHERE d.wides = 0),
+            SUM(d.runs_batter),
+            COUNT(w.ball_seq),
+            COUNT(*) FILTER (WHERE d.wides = 0 AND d.runs_batter = 0),
+            COUNT(*) FILTER (WHERE d.runs_batter = 4),
+            COUNT(*) FILTER (WHERE d.runs_batter = 6)
+        FROM deliveries d
+        LEFT JOIN wickets w ON w.match_id = d.match_id AND w.innings_no = d.innings_no
+            AND w.ball_seq = d.ball_seq AND w.player_out = d.batter AND w.is_dismissal
+        WHERE d.match_id = %(match_id)s
+        GROUP BY d.match_id, d.batter, COALESCE(d.bowler_style, %(unknown)s), d.phase
+
+        UNION ALL
+
+        SELECT
+            d.match_id, d.bowler, 'bowling', COALESCE(d.batter_style, %(unknown)s), d.phase,
+            COUNT(*) FILTER (WHERE d.is_legal),
+            SUM(d.runs_total),
+            COUNT(*) FILTER (WHERE d.bowler_wicket),
+            COUNT(*) FILTER (WHERE d.is_legal AND d.runs_total = 0),
+            COUNT(*) FILTER (WHERE d.runs_batter = 4),
+            COUNT(*) FILTER (WHERE d.runs_batter = 6)
+        FROM deliveries d
+        WHERE d.match_id = %(match_id)s
+        GROUP BY d.match_id, d.bowler, COALESCE(d.batter_style, %(unknown)s), d.phase
+    """, {'match_id': match_id, 'unknown': UNKNOWN_STYLE})
+
+
+def sketch_updates(data):
+    """Per-match sketches keyed by (entity type, entity, metric, season)"""
+    info = data.get('info') or {}
+    season = str(info['season']) if info.get('season') is not None else ''
+    updates = {}
+
+    def sketch(entity_type, entity, metric):
+        key = (entity_type, entity, metric, season)
+        if key not in updates:
+            updates[key] = SKETCH_METRICS[metric]()
+        return updates[key]
+
+    batting = {}
+    bowling = {}
+    totals = {}
+    for (innings_no, _, _, _, batting_team, bowling_team,
+         _, _, delivery) in iter_deliveries(data):
+        runs = delivery.get('runs') or {}
+        batter, bowler = delivery.get('batter'), delivery.get('bowler')
+
+        bat = batting.setdefault((innings_no, batter), {'runs': 0, 'opponent': bowling_team})
+        bat['runs'] += runs.get('batter', 0)
+        sketch('player', batter, 'batting_bowlers').add(bowler)
+
+        bowl = bowling.setdefault((innings_no, bowler), {'runs': 0, 'balls': 0, 'opponent': batting_team})
+        bowl['runs'] += runs.get('total', 0)
+        bowl['balls'] += 1
+        for wicket in delivery.get('wickets') or []:
+            if wicket.get('kind') in BOWLER_WICKETS:
+                sketch('player', bowler, 'bowling_victims').add(wicket.get('player_out'))
+
+        totals[(innings_no, batting_team)] = totals.get((innings_no, batting_team), 0) + runs.get('total', 0)
+
+    for (_, batter), bat in batting.items():
+        sketch('player', batter, 'batting_runs').update(bat['runs'])
+        sketch('player', batter, 'batting_opponents').add(bat['opponent'])
+
+    for (_, bowler), bowl in bowling.items():
+        sketch('player', bowler, 'bowling_economy').update(bowl['runs'] / bowl['balls'] * 6)
+        sketch('player', bowler, 'bowling_opponents').add(bowl['opponent'])
+
+    for (_, team), total in totals.items():
+        sketch('team', team, 'team_total').update(total)
+
+    for team, players in (info.get('players') or {}).items():
+        for player in players:
+            sketch('team', team, 'team_players').add(player)
+
+    return updates
+
+
+def write_sketches(cursor, match_id, data):
+    """Merge the match into the stored sketches, once per match"""
+    cursor.execute("INSERT INTO sketch_matches (match_id) VALUES (%s) ON CONFLICT DO NOTHING", (match_id,))
+    if not cursor.rowcount:
+        return
+
+    updates = sketch_updates(data)
+    if not updates:
+        return
+
+    keys = list(updates)
+    existing = execute_values(cursor, """
+        SELECT s.entity_type, s.entity, s.metric, s.season, s.sketch
+        FROM sketches s
+        JOIN (VALUES %s) AS k (entity_type, entity, metric, season)
+            USING (entity_type, entity, metric, season)
+        FOR UPDATE OF s
+    """, keys, page_size=len(keys), fetch=True)
+
+    for row in existing:
+        if isinstance(row, dict):
+            row = (row['entity_type'], row['entity'], row['metric'], row['season'], row['sketch'])
+        updates[row[:4]].merge(load_sketch(row[4]))
+
+    execute_values(cursor, """
+        INSERT INTO sketches (entity_type, entity, metric, season, sketch) VALUES %s
+        ON CONFLICT (entity_type, entity, metric, season) DO UPDATE SET sketch = EXCLUDED.sketch
+    """, [key + (update.to_bytes(),) for key, update in updates.items()], page_size=len(keys))
+
+
+# Column prefix in venue_matches for each phase
+VENUE_PHASE_COLUMNS = {'Powerplay': 'powerplay', 'Middle Overs': 'middle', 'Death Overs': 'death'}
+
+
+def venue_match_row(cursor, match_id, data):
+    """Scores, chase outcome, phase scoring and pace/spin wickets for one match"""
+    info = data.get('info') or {}
+    venue_key = normalize_venue(info.get('venue'))
+    if not venue_key:
+        return None
+
+    innings_runs = {}
+    innings_wickets = {}
+    phase_totals = {f'{prefix}_{measure}': 0 for prefix in VENUE_PHASE_COLUMNS.values()
+                    for measure in ('runs', 'balls')}
+    bowler_wickets = []
+    innings_list = data.get('innings') or []
+
+    for (innings_no, _, _, _, _, _, phase, _, delivery) in iter_deliveries(data):
+        if innings_list[innings_no].get('super_over'):
+            continue
+        runs = delivery.get('runs') or {}
+        extras = delivery.get('extras') or {}
+        wickets = delivery.get('wickets') or []
+
+        innings_runs[innings_no] = innings_runs.get(innings_no, 0) + runs.get('total', 0)
+        innings_wickets[innings_no] = innings_wickets.get(innings_no, 0) + sum(
+            1 for w in wickets if w.get('kind') not in NOT_DISMISSALS)
+
+        prefix = VENUE_PHASE_COLUMNS[phase]
+        phase_totals[f'{prefix}_runs'] += runs.get('total', 0)
+        if 'wides' not in extras and 'noballs' not in extras:
+            phase_totals[f'{prefix}_balls'] += 1
+
+        bowler_wickets.extend(delivery.get('bowler') for w in wickets
+                              if w.get('kind') in BOWLER_WICKETS)
+
+    styles = resolve_bowling_types(cursor, bowler_wickets)
+    style_counts = {'pace': 0, 'spin': 0, None: 0}
+    for bowler in bowler_wickets:
+        style_counts[styles[bowler]] += 1
+
+    innings = data.get('innings') or []
+    winner = (info.get('outcome') or {}).get('winner')
+    chase_result = None
+    if len(innings) >= 2:
+        if winner:
+            chase_result = 'won' if winner == innings[1].get('team') else 'lost'
+        elif (info.get('outcome') or {}).get('result') == 'tie':
+            chase_result = 'tied'
+
+    return (
+        match_id, venue_key, info.get('venue'), info.get('city'), parse_match_date(info),
+        innings_runs.get(0), innings_wickets.get(0), innings_runs.get(1), chase_result,
+        phase_totals['powerplay_runs'], phase_totals['powerplay_balls'],
+        phase_totals['middle_runs'], phase_totals['middle_balls'],
+        phase_totals['death_runs'], phase_totals['death_balls'],
+        style_counts['pace'], style_counts['spin'], style_counts[None]
+    )
+
+
+def refresh_venue_profile(cursor, venue_key):
+    """Recompute one venue's profile row from its venue_matches rows"""
+    cursor.execute("DELETE FROM venue_profiles WHERE venue_key = %s", (venue_key,))
+    cursor.execute("""
+        INSERT INTO venue_profiles (
+            venue_key, venue, city, aliases, matches, first_match, last_match,
+            avg_first_innings, avg_second_innings, chases_won, chases_lost, chase_success_rate,
+            powerplay_run_rate, middle_run_rate, death_run_rate,
+            pace_wickets, spin_wickets, unclassified_wickets
+        )
+        SELECT
+            venue_key,
+            mode() WITHIN GROUP (ORDER BY venue),
+            mode() WITHIN GROUP (ORDER BY city),
+            array_agg(DISTINCT venue),
+            COUNT(*),
+            MIN(match_date),
+            MAX(match_date),
+            ROUND(AVG(first_innings_runs), 1),
+            ROUND(AVG(second_innings_runs), 1),
+            COUNT(*) FILTER (WHERE chase_result = 'won'),
+            COUNT(*) FILTER (WHERE chase_result = 'lost'),
+            ROUND(COUNT(*) FILTER (WHERE chase_result = 'won')::numeric * 100 /
+                  NULLIF(COUNT(*) FILTER (WHERE chase_result IN ('won', 'lost')), 0), 2),
+            ROUND(SUM(powerplay_runs)::numeric * 6 / NULLIF(SUM(powerplay_balls), 0), 2),
+            ROUND(SUM(middle_runs)::numeric * 6 / NULLIF(SUM(middle_balls), 0), 2),
+            ROUND(SUM(death_runs)::numeric * 6 / NULLIF(SUM(death_balls), 0), 2),
+            SUM(pace_wickets),
+            SUM(spin_wickets),
+            SUM(unclassified_wickets)
+        FROM venue_matches
+        WHERE venue_key = %s
+        GROUP BY venue_key
+    """, (venue_key,))
+
+
+def write_venue_stats(cursor, match_id, data):
+    cursor.execute("DELETE FROM venue_matches WHERE match_id = %s RETURNING venue_key", (match_id,))
+    stale = {row['venue_key'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()}
+
+    row = venue_match_row(cursor, match_id, data)
+    if row:
+        cursor.execute(f"""
+            INSERT INTO venue_matches (
+                match_id, venue_key, venue, city, match_date,
+                first_innings_runs, first_innings_wickets, second_innings_runs, chase_result,
+                powerplay_runs, powerplay_balls, middle_runs, middle_balls, death_runs, death_balls,
+                pace_wickets, spin_wickets, unclassified_wickets
+            ) VALUES ({', '.join(['%s'] * len(row))})
+        """, row)
+        stale.add(row[1])
+
+    for venue_key in stale:
+        refresh_venue_profile(cursor, venue_key)
+
+
+def partnership_rows(match_id, data):
+    """
+    Partnerships for every innings in one pass over the deliveries.
+    A partnership ends on a wicket, or when the pair at the crease changes
+    without one (e.g. an unrecorded retirement).
+    """
+    rows = []
+    current = None
+    innings_seen = None
+    partnership_no = wicket_no = 1
+
+    def close(partnership, ended_by_wicket):
+        if len(partnership['batters']) < 2:
+            return
+        a, b = sorted(partnership['batters'])
+        rows.append((
+            match_id, partnership['innings_no'], partnership['partnership_no'], partnership['wicket_no'],
+            partnership['batting_team'], partnership['bowling_team'],
+            a, b,
+            partnership['batters'][a]['runs'], partnership['batters'][a]['balls'],
+            partnership['batters'][b]['runs'], partnership['batters'][b]['balls'],
+            partnership['extras'], partnership['runs'], partnership['balls'],
+            partnership['start_over'], partnership['end_over'], ended_by_wicket
+        ))
+
+    for (innings_no, _, over_num, ball_in_over, batting_team,
+         bowling_team, _, _, delivery) in iter_deliveries(data):
+        batter, non_striker = delivery.get('batter'), delivery.get('non_striker')
+        over_ball = round(over_num + ball_in_over / 10, 1)
+
+        if innings_no != innings_seen:
+            if current:
+                close(current, False)
+            current = None
+            innings_seen = innings_no
+            partnership_no = wicket_no = 1
+
+        if current and set(current['batters']) != {batter, non_striker}:
+            close(current, False)
+            current = None
+            partnership_no += 1
+
+        if current is None:
+            current = {
+                'innings_no': innings_no,
+                'partnership_no': partnership_no,
+                'wicket_no': wicket_no,
+                'batting_team': batting_team,
+                'bowling_team': bowling_team,
+                'batters': {batter: {'runs': 0, 'balls': 0}, non_striker: {'runs': 0, 'balls': 0}},
+                'extras': 0,
+                'runs': 0,
+                'balls': 0,
+                'start_over': over_ball,
+                'end_over': over_ball
+            }
+
+        runs = delivery.get('runs') or {}
+        extras = delivery.get('extras') or {}
+        current['batters'][batter]['runs'] += runs.get('batter', 0)
+        if 'wides' not in extras:
+            current['batters'][batter]['balls'] += 1
+            current['balls'] += 1
+        current['extras'] += runs.get('extras', 0)
+        current['runs'] += runs.get('total', 0)
+        current['end_over'] = over_ball
+
+        wickets = delivery.get('wickets') or []
+        if wickets:
+            dismissals = sum(1 for w in wickets if w.get('kind') not in NOT_DISMISSALS)
+            close(current, dismissals > 0)
+            current = None
+            partnership_no += 1
+            wicket_no += dismissals
+
+    if current:
+        close(current, False)
+
+    return rows
+
+
+def write_partnerships(cursor, match_id, data):
+    cursor.execute("DELETE FROM partnerships WHERE match_id = %s", (match_id,))
+    rows = partnership_rows(match_id, data)
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO partnerships (
+                match_id, innings_no, partnership_no, wicket_no, batting_team, bowling_team,
+                batter_a, batter_b, batter_a_runs, batter_a_balls, batter_b_runs, batter_b_balls,
+                extras, runs, balls, start_over, end_over, ended_by_wicket
+            ) VALUES %s
+        """, rows)
+
+
+def batting_innings_rows(match_id, data):
+    """
+    One row per batter per innings: batting position in order of arrival and
+    the legal balls, score and wickets down when they first appear at either end
+    """
+    info = data.get('info') or {}
+    season = str(info['season']) if info.get('season') is not None else None
+    innings_list = data.get('innings') or []
+    innings_batters = {}
+    state = {}
+
+    def entry(innings_no, name, batting_team, bowling_team):
+        batters = innings_batters.setdefault(innings_no, {})
+        if name not in batters:
+            balls_bowled, score, wickets = state[innings_no]
+            batters[name] = {
+                'batting_team': batting_team, 'bowling_team': bowling_team,
+                'position': len(batters) + 1, 'entry_balls': balls_bowled, 'entry_score': score,
+                'entry_wickets': wickets, 'runs': 0, 'balls': 0, 'fours': 0, 'sixes': 0,
+                'dismissed': False, 'kind': None
+            }
+        return batters[name]
+
+    for (innings_no, _, _, _, batting_team, bowling_team,
+         _, _, delivery) in iter_deliveries(data):
+        if innings_list[innings_no].get('super_over'):
+            continue
+        state.setdefault(innings_no, (0, 0, 0))
+        runs = delivery.get('runs') or {}
+        extras = delivery.get('extras') or {}
+
+        striker = entry(innings_no, delivery.get('batter'), batting_team, bowling_team)
+        entry(innings_no, delivery.get('non_striker'), batting_team, bowling_team)
+
+        if 'wides' not in extras:
+            striker['balls'] += 1
+            striker['runs'] += runs.get('batter', 0)
+            if not runs.get('non_boundary'):
+                striker['fours'] += runs.get('batter', 0) == 4
+                striker['sixes'] += runs.get('batter', 0) == 6
+
+        dismissals = 0
+        for wicket in delivery.get('wickets') or []:
+            out = entry(innings_no, wicket.get('player_out'), batting_team, bowling_team)
+            out['kind'] = wicket.get('kind')
+            if wicket.get('kind') not in NOT_DISMISSALS:
+                out['dismissed'] = True
+                dismissals += 1
+
+        balls_bowled, score, wickets = state[innings_no]
+        legal = 'wides' not in extras and 'noballs' not in extras
+        state[innings_no] = (balls_bowled + legal, score + runs.get('total', 0), wickets + dismissals)
+
+    return [
+        (
+            match_id, innings_no, name, row['batting_team'], row['bowling_team'], season,
+            parse_match_date(info), row['position'], row['entry_balls'] // 6, row['entry_balls'],
+            row['entry_score'], row['entry_wickets'], row['runs'], row['balls'], row['fours'],
+            row['sixes'], row['dismissed'], row['kind']
+        )
+        for innings_no, batters in innings_batters.items()
+        for name, row in batters.items()
+        if name
+    ]
+
+
+def write_batting_innings(cursor, match_id, data):
+    cursor.execute("DELETE FROM batting_innings WHERE match_id = %s", (match_id,))
+    rows = batting_innings_rows(match_id, data)
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO batting_innings (
+                match_id, innings_no, batter, batting_team, bowling_team, season, match_date,
+                position, entry_over, entry_balls, entry_score, entry_wickets,
+                runs, balls, fours, sixes, dismissed, dismissal_kind
+            ) VALUES %s
+        """, rows)
+
+
+def innings_progression(innings, match_overs, target=None):
+    """
+    Fixed-length per-over arrays (one slot per allotted over) for one innings.
+    Overs that were not bowled are None so charts stop where the innings ended.
+    """
+    overs = innings.get('overs') or []
+    length = max(get_allotted_overs(innings, match_overs),
+                 max((o.get('over', 0) for o in overs), default=-1) + 1)
+    runs = [None] * length
+    wickets = [None] * length
+    cumulative = [None] * length
+    required = [None] * length if target else None
+
+    total = 0
+    legal_balls = 0
+    balls_available = get_allotted_overs(innings, match_overs) * 6
+    for over in overs:
+        over_num = over.get('over', 0)
+        over_runs = 0
+        over_wickets = 0
+        for delivery in over.get('deliveries') or []:
+            over_runs += (delivery.get('runs') or {}).get('total', 0)
+            over_wickets += sum(1 for w in delivery.get('wickets') or [] if w.get('kind') not in NOT_DISMISSALS)
+            extras = delivery.get('extras') or {}
+            if 'wides' not in extras and 'noballs' not in extras:
+                legal_balls += 1
+        total += over_runs
+        runs[over_num] = over_runs
+        wickets[over_num] = over_wickets
+        cumulative[over_num] = total
+        if target:
+            remaining = balls_available - legal_balls
+            if total < target and remaining > 0:
+                required[over_num] = round((target - total) * 6 / remaining, 2)
+
+    progression = {
+        'team': innings.get('team'),
+        'overs': length,
+        'runs_per_over': runs,
+        'cumulative_runs': cumulative,
+        'wickets_per_over': wickets
+    }
+    if target:
+        progression['target'] = target
+        progression['required_run_rate'] = required
+    return progression
+
+
+def match_progression(data):
+    """Progression arrays for each innings, skipping super overs"""
+    info = data.get('info') or {}
+    innings_list = [i for i in data.get('innings') or [] if not i.get('super_over')]
+    progression = []
+
+    for innings_no, innings in enumerate(innings_list):
+        target = None
+        if innings_no == 1:
+            target = (innings.get('target') or {}).get('runs')
+            if not target and progression:
+                # Older data has no recorded target: first innings total + 1
+                first_total = next((r for r in reversed(progression[0]['cumulative_runs']) if r is not None), 0)
+                target = first_total + 1
+        progression.append(innings_progression(innings, info.get('overs'), target))
+
+    return progression
+
+
+def write_match_progression(cursor, match_id, data):
+    cursor.execute("""
+        INSERT INTO match_progression (match_id, innings) VALUES (%s, %s)
+        ON CONFLICT (match_id) DO UPDATE SET innings = EXCLUDED.innings
+    """, (match_id, Json(match_progression(data))))
+
+
+def write_win_probability(cursor, match_id, data):
+    """Score a new match against the trained model (skipped until one exists)"""
+    model = load_model(cursor)
+    if model is None:
+        return
+    cursor.execute("DELETE FROM match_comebacks WHERE match_id = %s", (match_id,))
+    states = load_states(cursor, match_id)
+    if states:
+        save_comebacks(cursor, comeback_rows(states, predict(model, states)))
+
+
+def write_fantasy_points(cursor, match_id, data):
+    """Score the match under every stored fantasy rule set (none until score-fantasy has run)"""
+    score_match(cursor, match_id)
+
+
+# Writers run in order for every ingested match
+DERIVED_WRITERS = [
+    write_match_split,
+    write_motm_awards,
+    write_player_styles,
+    write_deliveries,  # tags each ball with the styles resolved above
+    write_wickets,
+    write_team_phase_cube,  # reads the deliveries and wickets rows written above
+    write_style_matchups,
+    write_sketches,
+    write_venue_stats,
+    write_partnerships,
+    write_batting_innings,
+    write_match_progression,
+    write_win_probability,  # reads deliveries, wickets and match_progression
+    write_fantasy_points,
+]
+
+# Tables that cannot be refreshed per match are emptied before a rebuild
+DERIVED_RESETS = [
+    "DELETE FROM sketches",
+    "DELETE FROM sketch_matches",
+    # Re-match every player to its profile, e.g. after cleaned_all_players is reloaded
+    "DELETE FROM player_styles",
+]
+
+
+def ingest_match(cursor, match_id, data):
+    """Refresh every derived table for one match document"""
+    for writer in DERIVED_WRITERS:
+        writer(cursor, match_id, data)
+
+
+def rebuild_derived(conn, batch_size=100, progress=None):
+    """
+    Replay ingest_match over every stored match.
+    Uses a server-side cursor so the full table is never held in memory.
+    Returns the number of matches processed.
+    """
+    read_cursor = conn.cursor(name='rebuild_derived_matches')
+    read_cursor.itersize = batch_size
+    read_cursor.execute("SELECT id, metadata FROM odiwc2023 ORDER BY id")
+
+    write_cursor = conn.cursor()
+    for statement in DERIVED_RESETS:
+        write_cursor.execute(statement)
+
+    processed = 0
+    # Reads happen inside the same transaction, so commit once at the end
+    for match_id, data in read_cursor:
+        ingest_match(write_cursor, match_id, data)
+        processed += 1
+        if progress and processed % batch_size == 0:
+            progress(processed)
+
+    read_cursor.close()
+    write_cursor.close()
+    return processed
@@ -0,0 +1,137 @@
+"""
+Background job queue for long-running analyses
+Runs jobs on a bounded local thread pool, deduplicates identical submissions
+and keeps finished results around for a retention window so clients can poll.
+Job state lives in this process only, so the app must run as a single gunicorn
+worker (threads are fine); see gunicorn.conf.py.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of unfinished jobs"""
+
+
+class Job:
+    def __init__(self, job_type, params, key):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.params = params
+        self.key = key
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.id,
+            'type': self.type,
+            'params': self.params,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+        if include_result:
+            data['result'] = self.result
+            data['error'] = self.error
+        return data
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_pending=32, retention_seconds=600):
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self.handlers = {}
+        self.jobs = {}
+        self.jobs_by_key = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+
+    def register(self, job_type, handler):
+        """Register a callable that takes the job params dict and returns a JSON-able result"""
+        self.handlers[job_type] = handler
+
+    def job_key(self, job_type, params):
+        """Identical type + params map to the same key, so repeat submissions share one job"""
+        payload = json.dumps({'type': job_type, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def submit(self, job_type, params):
+        """Queue a job, or return the existing job for identical parameters"""
+        if job_type not in self.handlers:
+            raise KeyError(f"Unknown job type: {job_type}")
+
+        key = self.job_key(job_type, params)
+
+        with self.lock:
+            self._prune()
+
+            existing = self.jobs_by_key.get(key)
+            if existing and existing.status != 'failed':
+                return existing, False
+
+            unfinished = sum(1 for job in self.jobs.values() if not job.done.is_set())
+            if unfinished >= self.max_pending:
+                raise QueueFullError('Too many analyses in progress, try again shortly')
+
+            job = Job(job_type, params, key)
+            self.jobs[job.id] = job
+            self.jobs_by_key[key] = job
+
+        self.executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id):
+        with self.lock:
+            self._prune()
+            return self.jobs.get(job_id)
+
+    def wait(self, job_id, timeout):
+        """Block up to timeout seconds for a job to finish (long-poll)"""
+        job = self.get(job_id)
+        if job and timeout > 0:
+            job.done.wait(timeout)
+        return job
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = self.handlers[job.type](job.params)
+            job.status = 'finished'
+        except Exception as e:
+            print(f"Error in background job {job.type}: {e}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    def _prune(self):
+        """Drop finished jobs older than the retention window. Caller holds the lock."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.done.is_set() and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self.jobs.pop(job_id)
+            if self.jobs_by_key.get(job.key) is job:
+                del self.jobs_by_key[job.key]
+
+
+# Global job queue (per worker process)
+job_queue = JobQueue(
+    max_workers=int(os.getenv('JOB_WORKERS', 2)),
+    max_pending=int(os.getenv('JOB_MAX_PENDING', 32)),
+    retention_seconds=int(os.getenv('JOB_RETENTION_SECONDS', 600))
+)
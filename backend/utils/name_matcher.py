@@ -186,10 +186,12 @@ def find_best_player_match(query, players, threshold=60):
     if not matches:
         return None
 
-    # Sort by adjusted score
+    # Sort by adjusted score. The list reads as empty while it is being sorted,
+    # so take the top score up front.
+    top_score = max(m['score'] for m in matches)
     matches.sort(key=lambda x: (
         # If scores are within 10 points, prioritize by adjusted score
-        x['adjusted_score'] if abs(x['score'] - matches[0]['score']) <= 10 else x['score']
+        x['adjusted_score'] if abs(x['score'] - top_score) <= 10 else x['score']
     ), reverse=True)
 
     best_match = matches[0]
@@ -0,0 +1,153 @@
+"""
+Custom phase analysis from per-innings prefix sums
+A player's deliveries are summed per over once, then turned into cumulative
+arrays (innings x over) so any phase window is a subtraction of two columns.
+Evaluating a whole grid of over_start / overs_to_analyze / balls_before values
+costs one query plus a few array operations per cell.
+"""
+import numpy as np
+
+RUN_RANGES = ['0', '1-3', '4', '5', '6', '7+']
+
+PLAYER_OVERS_QUERY = """
+    SELECT
+        d.match_id,
+        d.innings_no,
+        d.over_num,
+        COUNT(*) as balls,
+        SUM(d.runs_batter) as runs,
+        COUNT(w.ball_seq) as dismissals,
+        SUM(CASE WHEN d.runs_batter = 0 THEN 1 ELSE 0 END) as r0,
+        SUM(CASE WHEN d.runs_batter BETWEEN 1 AND 3 THEN 1 ELSE 0 END) as r1_3,
+        SUM(CASE WHEN d.runs_batter = 4 THEN 1 ELSE 0 END) as r4,
+        SUM(CASE WHEN d.runs_batter = 5 THEN 1 ELSE 0 END) as r5,
+        SUM(CASE WHEN d.runs_batter = 6 THEN 1 ELSE 0 END) as r6,
+        SUM(CASE WHEN d.runs_batter > 6 THEN 1 ELSE 0 END) as r7
+    FROM deliveries d
+    -- Retirements are in players_out but are not dismissals
+    LEFT JOIN wickets w ON w.match_id = d.match_id AND w.innings_no = d.innings_no
+        AND w.ball_seq = d.ball_seq AND w.player_out = d.batter AND w.is_dismissal
+    WHERE d.batter = %s
+    GROUP BY d.match_id, d.innings_no, d.over_num
+"""
+
+# Column order of the per-over counters
+COUNTERS = ['balls', 'runs', 'dismissals', 'r0', 'r1_3', 'r4', 'r5', 'r6', 'r7']
+
+
+# Largest number of values a single "start-stop:step" range may expand to
+MAX_RANGE_VALUES = 1000
+
+
+def parse_int_values(value, default, maximum=None):
+    """
+    Parse "7", "1,3,5" or an inclusive range "0-10" (optionally "0-10:2")
+    into a sorted list of non-negative ints, each clamped to maximum
+    """
+    if value is None or str(value).strip() == '':
+        return [default]
+
+    values = set()
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        step = 1
+        if ':' in part:
+            part, step = part.split(':', 1)
+            step = max(int(step), 1)
+        if '-' in part:
+            start, stop = (int(v) for v in part.split('-', 1))
+            if stop >= start and (stop - start) // step + 1 > MAX_RANGE_VALUES:
+                raise ValueError(f'range "{part}" has more than {MAX_RANGE_VALUES} values')
+            if maximum is not None:
+                start, stop = min(start, maximum), min(stop, maximum)
+            values.update(range(start, stop + 1, step))
+        else:
+            values.add(int(part) if maximum is None else min(int(part), maximum))
+    return sorted(values) or [default]
+
+
+def load_prefix_sums(cursor, player_name):
+    """
+    Return (innings keys, prefix array) for a player's batting.
+    prefix[i, o, c] is counter c summed over overs < o of innings i,
+    so a window [start, end) is prefix[:, end] - prefix[:, start].
+    """
+    cursor.execute(PLAYER_OVERS_QUERY, (player_name,))
+    rows = cursor.fetchall()
+    if not rows:
+        return [], None
+
+    keys = {}
+    for row in rows:
+        keys.setdefault((row['match_id'], row['innings_no']), len(keys))
+
+    num_overs = max(row['over_num'] for row in rows) + 1
+    per_over = np.zeros((len(keys), num_overs, len(COUNTERS)), dtype=np.int64)
+    for row in rows:
+        per_over[keys[(row['match_id'], row['innings_no'])], row['over_num']] = [
+            row[c] for c in COUNTERS
+        ]
+
+    prefix = np.zeros((len(keys), num_overs + 1, len(COUNTERS)), dtype=np.int64)
+    np.cumsum(per_over, axis=1, out=prefix[:, 1:])
+    return list(keys), prefix
+
+
+def window(prefix, over_start, overs_to_analyze):
+    """Counters per innings for overs [over_start, over_start + overs_to_analyze)"""
+    width = prefix.shape[1] - 1
+    start = min(max(over_start, 0), width)
+    end = min(max(over_start + overs_to_analyze, 0), width)
+    return prefix[:, start], prefix[:, end] - prefix[:, start]
+
+
+def summarize_cells(before, in_phase, balls_before_values, min_balls_in_phase):
+    """
+    Evaluate every balls_before value for one phase window at once.
+    Returns one dict of summary metrics per balls_before value.
+    """
+    thresholds = np.asarray(balls_before_values)
+    # innings x balls_before
+    mask = (before[:, 0][:, None] >= thresholds[None, :]) & \
+           (in_phase[:, 0] >= min_balls_in_phase)[:, None]
+
+    innings = mask.sum(axis=0)
+    totals = in_phase[:, :3].T @ mask  # (balls, runs, dismissals) x balls_before
+
+    cells = []
+    for j, balls_before in enumerate(balls_before_values):
+        balls, runs, dismissed = (int(v) for v in totals[:, j])
+        analyzed = int(innings[j])
+        cells.append({
+            'balls_before': balls_before,
+            'innings_analyzed': analyzed,
+            'total_runs': runs,
+            'total_balls': balls,
+            'times_dismissed': dismissed,
+            'avg_runs_per_ball': round(runs / balls, 1) if balls else 0,
+            'strike_rate': round(runs / balls * 100) if balls else 0,
+            'dismissal_rate': round(dismissed / analyzed * 100) if analyzed else 0,
+        })
+    return cells
+
+
+def run_distribution(in_phase, mask):
+    """Run-range frequencies for the selected innings, skipping empty ranges"""
+    counts = in_phase[mask][:, 3:].sum(axis=0)
+    return [
+        {'run_range': label, 'frequency': int(count)}
+        for label, count in zip(RUN_RANGES, counts) if count
+    ]
+
+
+def sweep(prefix, over_starts, overs_values, balls_before_values, min_balls_in_phase):
+    """Evaluate the full parameter grid. Returns a flat list of cells."""
+    grid = []
+    for over_start in over_starts:
+        for overs_to_analyze in overs_values:
+            before, in_phase = window(prefix, over_start, overs_to_analyze)
+            for cell in summarize_cells(before, in_phase, balls_before_values, min_balls_in_phase):
+                grid.append({'over_start': over_start, 'overs_to_analyze': overs_to_analyze, **cell})
+    return grid
@@ -0,0 +1,250 @@
+"""
+Batting and bowling style lookups for cricsheet player names
+cleaned_all_players stores full names ("Virat Kohli") while match data uses
+cricsheet names ("V Kohli"), so names are resolved with the smart matcher.
+Ingest resolves each registry player once into the player_styles table;
+ad-hoc lookups are cached for the life of the process.
+"""
+from psycopg2.extras import execute_values
+from utils.name_matcher import find_best_player_match
+
+PACE_MARKERS = ('fast', 'medium', 'seam', 'pace')
+SPIN_MARKERS = ('spin', 'break', 'orthodox', 'googly', 'chinaman', 'wrist', 'finger', 'slow')
+
+_style_cache = {}
+
+
+def bowling_type(bowlingstyle):
+    """Classify a bowlingstyle string as 'pace', 'spin' or None when unknown"""
+    style = (bowlingstyle or '').lower()
+    if any(marker in style for marker in PACE_MARKERS):
+        return 'pace'
+    if any(marker in style for marker in SPIN_MARKERS):
+        return 'spin'
+    return None
+
+
+def bowling_style_group(bowlingstyle):
+    """Finer bowling style used for matchup splits, or None when unknown"""
+    style = (bowlingstyle or '').lower()
+    kind = bowling_type(style)
+    left = 'left' in style
+    if kind == 'pace':
+        return 'left-arm pace' if left else 'right-arm pace'
+    if kind == 'spin':
+        if any(marker in style for marker in ('chinaman', 'wrist')) or (left and 'googly' in style):
+            return 'left-arm wrist-spin'
+        if left:
+            return 'left-arm orthodox'
+        if any(marker in style for marker in ('leg', 'googly')):
+            return 'leg-spin'
+        return 'off-spin'
+    return None
+
+
+def batting_hand(battingstyle):
+    """'left-hand' / 'right-hand' from a battingstyle string, or None"""
+    style = (battingstyle or '').lower()
+    if 'left' in style:
+        return 'left-hand'
+    if 'right' in style:
+        return 'right-hand'
+    return None
+
+
+BOWLING_STYLES = ('right-arm pace', 'left-arm pace', 'off-spin', 'leg-spin',
+                  'left-arm orthodox', 'left-arm wrist-spin')
+BATTING_STYLES = ('right-hand', 'left-hand')
+UNKNOWN_STYLE = 'unknown'
+
+# vs_style values accepted by the stats endpoints, mapped to stored style groups
+STYLE_FILTERS = {
+    **{style: (style,) for style in BOWLING_STYLES + BATTING_STYLES + (UNKNOWN_STYLE,)},
+    'pace': ('right-arm pace', 'left-arm pace'),
+    'spin': ('off-spin', 'leg-spin', 'left-arm orthodox', 'left-arm wrist-spin'),
+    'left-arm spin': ('left-arm orthodox', 'left-arm wrist-spin'),
+    'wrist-spin': ('leg-spin', 'left-arm wrist-spin'),
+    'finger-spin': ('off-spin', 'left-arm orthodox'),
+}
+
+
+def parse_vs_style(value):
+    """Stored style groups for a vs_style query value; ValueError if unrecognised"""
+    key = (value or '').strip().lower().replace('_', '-')
+    if key not in STYLE_FILTERS:
+        raise ValueError(f"Unknown style '{value}'. Available: {', '.join(sorted(STYLE_FILTERS))}")
+    return list(STYLE_FILTERS[key])
+
+
+def profiles_available(cursor):
+    """Whether cleaned_all_players exists; it is loaded separately from the match data"""
+    cursor.execute("SELECT to_regclass('cleaned_all_players') IS NOT NULL as available")
+    row = cursor.fetchone()
+    return row['available'] if isinstance(row, dict) else row[0]
+
+
+def lookup_profile(cursor, player_name):
+    """
+    (fullname, battingstyle, bowlingstyle) from cleaned_all_players for a
+    cricsheet name, or None (also when the profile table has not been loaded)
+    """
+    if not profiles_available(cursor):
+        return None
+    cursor.execute("""
+        SELECT fullname, battingstyle, bowlingstyle FROM cleaned_all_players WHERE fullname = %s LIMIT 1
+    """, (player_name,))
+    rows = cursor.fetchall()
+    if not rows:
+        last_name = player_name.split()[-1] if player_name.split() else player_name
+        cursor.execute("SELECT fullname, battingstyle, bowlingstyle FROM cleaned_all_players WHERE fullname ILIKE %s",
+                       (f'%{last_name}%',))
+        candidates = cursor.fetchall()
+        names = [row['fullname'] if isinstance(row, dict) else row[0] for row in candidates]
+        best = find_best_player_match(player_name, names, threshold=60)
+        rows = [row for row, name in zip(candidates, names) if best and name == best['player']]
+
+    if not rows:
+        return None
+    row = rows[0]
+    return (row['fullname'], row['battingstyle'], row['bowlingstyle']) if isinstance(row, dict) else tuple(row)
+
+
+def lookup_bowlingstyle(cursor, player_name):
+    """bowlingstyle from cleaned_all_players for a cricsheet name, or None"""
+    profile = lookup_profile(cursor, player_name)
+    return profile[2] if profile else None
+
+
+def resolve_player_styles(cursor, people):
+    """
+    Make sure every player in a match registry ({name: registry id}) has a
+    player_styles row, matching new names to their profile once.
+    """
+    names = [name for name in people if name]
+    if not names:
+        return
+    cursor.execute("SELECT player FROM player_styles WHERE player = ANY(%s)", (names,))
+    known = {row['player'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()}
+
+    rows = []
+    for name in names:
+        if name in known:
+            continue
+        fullname, battingstyle, bowlingstyle = lookup_profile(cursor, name) or (None, None, None)
+        rows.append((name, people[name], fullname, battingstyle, bowlingstyle,
+                     batting_hand(battingstyle), bowling_style_group(bowlingstyle), bowling_type(bowlingstyle)))
+    if rows:
+        execute_values(cursor, """
+            INSERT INTO player_styles (
+                player, registry_id, profile_name, battingstyle, bowlingstyle,
+                batting_style, bowling_style, bowling_type
+            ) VALUES %s
+            ON CONFLICT (player) DO NOTHING
+        """, rows)
+
+
+def load_player_styles(cursor, player_names):
+    """{name: (batting_style, bowling_style)} from player_styles for the given names"""
+    cursor.execute("""
+        SELECT player, batting_style, bowling_style FROM player_styles WHERE player = ANY(%s)
+    """, (list(player_names),))
+    styles = {}
+    for row in cursor.fetchall():
+        if isinstance(row, dict):
+            row = (row['player'], row['batting_style'], row['bowling_style'])
+        styles[row[0]] = (row[1], row[2])
+    return styles
+
+
+def resolve_bowling_types(cursor, player_names):
+    """Map each player name to 'pace', 'spin' or None, resolving each name once"""
+    missing = [name for name in set(player_names) - set(_style_cache) if name]
+    if missing:
+        # Players already resolved at ingest need no profile matching
+        cursor.execute("SELECT player, bowling_type FROM player_styles WHERE player = ANY(%s)", (missing,))
+        for row in cursor.fetchall():
+            name, kind = (row['player'], row['bowling_type']) if isinstance(row, dict) else row
+            _style_cache[name] = kind
+    unresolved = set(player_names) - set(_style_cache)
+    if unresolved and not profiles_available(cursor):
+        # Unclassified for now, and not cached so they resolve once profiles are loaded
+        return {name: _style_cache.get(name) for name in player_names}
+    for name in unresolved:
+        _style_cache[name] = bowling_type(lookup_bowlingstyle(cursor, name)) if name else None
+    return {name: _style_cache[name] for name in player_names}
+
+
+def clear_style_cache():
+    _style_cache.clear()
+
+
+# Rate columns for style_matchups rollups; 'dismissals' are wickets for bowlers
+STYLE_RATE_COLUMNS = {
+    'batting': """
+        ROUND(SUM(runs)::numeric / NULLIF(SUM(dismissals), 0), 2) as average,
+        ROUND(SUM(runs)::numeric / NULLIF(SUM(balls), 0) * 100, 2) as strike_rate,
+        ROUND(SUM(dots)::numeric / NULLIF(SUM(balls), 0) * 100, 2) as dot_ball_percentage
+    """,
+    'bowling': """
+        ROUND(SUM(runs)::numeric / NULLIF(SUM(balls), 0) * 6, 2) as economy_rate,
+        ROUND(SUM(runs)::numeric / NULLIF(SUM(dismissals), 0), 2) as average,
+        ROUND(SUM(balls)::numeric / NULLIF(SUM(dismissals), 0), 2) as strike_rate,
+        ROUND(SUM(dots)::numeric / NULLIF(SUM(balls), 0) * 100, 2) as dot_ball_percentage
+    """,
+}
+
+
+def fetch_style_splits(cursor, player, role, styles=None, phase=None, group_by=('opposing_style',)):
+    """
+    Roll a player's style_matchups counters up by group_by (any of
+    opposing_style, phase; empty for a single total), optionally restricted
+    to opposing styles and a phase.
+    """
+    conditions = ["player = %s", "role = %s"]
+    params = [player, role]
+    if styles:
+        conditions.append("opposing_style = ANY(%s)")
+        params.append(list(styles))
+    if phase:
+        conditions.append("phase = %s")
+        params.append(phase)
+
+    columns = ''.join(f'{column}, ' for column in group_by)
+    grouping = f"GROUP BY {', '.join(group_by)} ORDER BY SUM(balls) DESC" if group_by else ''
+    cursor.execute(f"""
+        SELECT
+            {columns}
+            COUNT(DISTINCT match_id) as matches,
+            SUM(balls) as balls,
+            SUM(runs) as runs,
+            SUM(dismissals) as dismissals,
+            SUM(dots) as dots,
+            SUM(fours) as fours,
+            SUM(sixes) as sixes,
+            {STYLE_RATE_COLUMNS[role]}
+        FROM style_matchups
+        WHERE {' AND '.join(conditions)}
+        {grouping}
+    """, params)
+    return [row for row in cursor.fetchall() if row['balls']]
+
+
+def style_split_summary(cursor, player, role, vs_style=None, phase=None):
+    """
+    API payload for a player's record against a vs_style filter (or every
+    style when vs_style is None). Returns None when there are no balls.
+    """
+    if vs_style:
+        styles = parse_vs_style(vs_style)
+        totals = fetch_style_splits(cursor, player, role, styles, phase, group_by=())
+        if not totals:
+            return None
+        return {
+            'vs_style': vs_style,
+            'styles': styles,
+            'stats': totals[0],
+            'by_phase': fetch_style_splits(cursor, player, role, styles, phase, group_by=('phase',))
+        }
+
+    splits = fetch_style_splits(cursor, player, role, phase=phase)
+    return {'splits': splits} if splits else None
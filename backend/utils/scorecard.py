@@ -0,0 +1,166 @@
+"""
+Traditional scorecards rebuilt from a match document
+One pass over each innings' deliveries accumulates batting, bowling, extras
+and fall-of-wicket state; nothing is re-walked afterwards.
+"""
+from utils.helpers import calculate_economy_rate, calculate_strike_rate
+from utils.ingest import BOWLER_WICKETS, NOT_DISMISSALS
+
+
+def fielder_name(fielder):
+    name = fielder.get('name') or 'sub'
+    return f'sub ({name})' if fielder.get('substitute') else name
+
+
+def dismissal_text(wicket, bowler):
+    """Scorecard wording such as "c Smith b Jones" or "run out (Smith)" """
+    kind = wicket.get('kind', '')
+    fielders = [fielder_name(f) for f in wicket.get('fielders') or []]
+    if kind == 'caught':
+        return f"c {fielders[0] if fielders else 'sub'} b {bowler}"
+    if kind == 'caught and bowled':
+        return f'c & b {bowler}'
+    if kind == 'bowled':
+        return f'b {bowler}'
+    if kind == 'lbw':
+        return f'lbw b {bowler}'
+    if kind == 'stumped':
+        return f'st {fielders[0]} b {bowler}' if fielders else f'st b {bowler}'
+    if kind == 'hit wicket':
+        return f'hit wicket b {bowler}'
+    if kind == 'run out':
+        return f"run out ({'/'.join(fielders)})" if fielders else 'run out'
+    return kind
+
+
+def overs_text(balls):
+    return f'{balls // 6}.{balls % 6}' if balls % 6 else str(balls // 6)
+
+
+def innings_scorecard(innings, squad):
+    """Batting, bowling, extras and fall of wickets for one innings"""
+    batting = {}
+    bowling = {}
+    extras = {'byes': 0, 'legbyes': 0, 'wides': 0, 'noballs': 0, 'penalty': 0}
+    fall_of_wickets = []
+    total = wickets = legal_balls = 0
+
+    def batter_entry(name):
+        if name not in batting:
+            batting[name] = {'batter': name, 'position': len(batting) + 1, 'dismissal': 'not out',
+                             'runs': 0, 'balls': 0, 'fours': 0, 'sixes': 0, 'dots': 0}
+        return batting[name]
+
+    for over in innings.get('overs') or []:
+        over_num = over.get('over', 0)
+        # (runs charged, legal balls) per bowler within this over, for maidens
+        over_spells = {}
+        over_balls = 0
+        for delivery in over.get('deliveries') or []:
+            runs = delivery.get('runs') or {}
+            delivery_extras = delivery.get('extras') or {}
+            bowler_name = delivery.get('bowler')
+            striker = batter_entry(delivery.get('batter'))
+            batter_entry(delivery.get('non_striker'))
+
+            if bowler_name not in bowling:
+                bowling[bowler_name] = {'bowler': bowler_name, 'balls': 0, 'maidens': 0, 'runs': 0,
+                                        'wickets': 0, 'dots': 0, 'wides': 0, 'noballs': 0}
+            bowler = bowling[bowler_name]
+
+            legal = 'wides' not in delivery_extras and 'noballs' not in delivery_extras
+            batter_runs = runs.get('batter', 0)
+            # Byes, leg byes and penalties are not charged to the bowler
+            charged = batter_runs + delivery_extras.get('wides', 0) + delivery_extras.get('noballs', 0)
+
+            if 'wides' not in delivery_extras:
+                striker['balls'] += 1
+                striker['runs'] += batter_runs
+                if batter_runs == 0:
+                    striker['dots'] += 1
+                elif not runs.get('non_boundary'):
+                    striker['fours'] += batter_runs == 4
+                    striker['sixes'] += batter_runs == 6
+
+            bowler['runs'] += charged
+            bowler['balls'] += legal
+            bowler['dots'] += legal and runs.get('total', 0) == 0
+            bowler['wides'] += bool(delivery_extras.get('wides'))
+            bowler['noballs'] += bool(delivery_extras.get('noballs'))
+            spell = over_spells.setdefault(bowler_name, [0, 0])
+            spell[0] += charged
+            spell[1] += legal
+
+            for key in extras:
+                extras[key] += delivery_extras.get(key, 0)
+            total += runs.get('total', 0)
+            legal_balls += legal
+            over_balls += legal
+
+            for wicket in delivery.get('wickets') or []:
+                kind = wicket.get('kind')
+                out = batter_entry(wicket.get('player_out'))
+                out['dismissal'] = dismissal_text(wicket, bowler_name)
+                out['kind'] = kind
+                out['bowler'] = bowler_name if kind in BOWLER_WICKETS else None
+                out['fielders'] = [fielder_name(f) for f in wicket.get('fielders') or []]
+                if kind in BOWLER_WICKETS:
+                    bowler['wickets'] += 1
+                if kind not in NOT_DISMISSALS:
+                    wickets += 1
+                    fall_of_wickets.append({
+                        'wicket': wickets,
+                        'score': total,
+                        'player': wicket.get('player_out'),
+                        'over': f'{over_num}.{over_balls}'
+                    })
+
+        for name, (charged, balls) in over_spells.items():
+            if balls == 6 and charged == 0:
+                bowling[name]['maidens'] += 1
+
+    penalty = innings.get('penalty_runs') or {}
+    extra_penalty = penalty.get('pre', 0) + penalty.get('post', 0)
+    extras['penalty'] += extra_penalty
+    total += extra_penalty
+    extras['total'] = sum(extras.values())
+
+    absent_hurt = innings.get('absent_hurt') or []
+    batting_rows = list(batting.values())
+    for row in batting_rows:
+        row['strike_rate'] = calculate_strike_rate(row['runs'], row['balls'])
+
+    bowling_rows = list(bowling.values())
+    for row in bowling_rows:
+        row['overs'] = overs_text(row['balls'])
+        row['economy'] = calculate_economy_rate(row['runs'], row['balls'])
+
+    return {
+        'team': innings.get('team'),
+        'super_over': bool(innings.get('super_over')),
+        'total': total,
+        'wickets': wickets,
+        'overs': overs_text(legal_balls),
+        'batting': batting_rows,
+        'did_not_bat': [p for p in squad if p not in batting and p not in absent_hurt],
+        'absent_hurt': absent_hurt,
+        'extras': extras,
+        'fall_of_wickets': fall_of_wickets,
+        'bowling': bowling_rows
+    }
+
+
+def build_scorecard(data):
+    """Scorecard for every innings in a match document"""
+    info = data.get('info') or {}
+    squads = info.get('players') or {}
+    return {
+        'teams': info.get('teams'),
+        'venue': info.get('venue'),
+        'date': (info.get('dates') or [None])[0],
+        'toss': info.get('toss'),
+        'outcome': info.get('outcome'),
+        'player_of_match': info.get('player_of_match'),
+        'innings': [innings_scorecard(innings, squads.get(innings.get('team')) or [])
+                    for innings in data.get('innings') or []]
+    }
@@ -0,0 +1,316 @@
+"""
+Pattern queries over ball-by-ball sequences
+Every innings is encoded once as a small-integer array (one code per legal
+ball, plus illegal balls that took a wicket), concatenated into one array for
+the whole dataset. A pattern such as ".{4,}" (four or more dots in a row) is
+matched with run-length streaks and prefix sums, so each element of a pattern
+is a handful of vectorized passes no matter how many innings there are. A
+query then asks how often an outcome follows within N balls of each match,
+against the baseline rate from any ball, grouped by batter, bowler, phase or
+batting team.
+
+Pattern syntax, elements written one after another:
+    .  dot ball         1 2 3  runs (3 covers 3+ without a boundary)
+    4 6  boundaries     W  wicket
+    B  boundary (4|6)   R  any scoring ball
+    *  any ball         [...]  any of several, e.g. [.1]
+    !x not x, e.g. !B
+Each element may take a quantifier: {n}, {n,}, {n,m} or + (one or more).
+"""
+import re
+import numpy as np
+from utils.http_cache import VersionedCache
+
+DOT, ONE, TWO, THREE, FOUR, SIX, WICKET = range(7)
+CODES = 7
+
+SYMBOLS = {
+    '.': (DOT,),
+    '1': (ONE,),
+    '2': (TWO,),
+    '3': (THREE,),
+    '4': (FOUR,),
+    '6': (SIX,),
+    'W': (WICKET,),
+    'B': (FOUR, SIX),
+    'R': (ONE, TWO, THREE, FOUR, SIX),
+    '*': tuple(range(CODES)),
+}
+
+GROUPS = ('batter', 'bowler', 'phase', 'team')
+MAX_ELEMENTS = 10
+MAX_WITHIN = 60
+
+ELEMENT_RE = re.compile(r"""
+    \s*(?P<negate>!?)
+    (?P<atom>\[[^\]]*\]|[^\s\[\]{}+!])
+    (?:\{(?P<low>\d+)(?P<comma>,)?(?P<high>\d*)\}|(?P<plus>\+))?
+""", re.VERBOSE)
+
+SEQUENCE_QUERY = """
+    SELECT
+        d.match_id,
+        d.innings_no,
+        d.batting_team,
+        d.batter,
+        d.bowler,
+        d.phase,
+        mi.info->>'season' as season,
+        d.runs_batter,
+        d.runs_total,
+        w.ball_seq IS NOT NULL as dismissal
+    FROM deliveries d
+    JOIN match_info mi ON mi.id = d.match_id
+    LEFT JOIN (
+        SELECT DISTINCT match_id, innings_no, ball_seq
+        FROM wickets
+        WHERE is_dismissal
+    ) w ON w.match_id = d.match_id AND w.innings_no = d.innings_no AND w.ball_seq = d.ball_seq
+    WHERE d.innings_no < 2 AND (d.is_legal OR w.ball_seq IS NOT NULL)
+    ORDER BY d.match_id, d.innings_no, d.ball_seq
+"""
+
+# The encoded dataset only changes with the dataset version
+sequence_cache = VersionedCache(max_size=1)
+
+
+class Element:
+    def __init__(self, members, low=1, high=1):
+        self.members = members
+        self.low = low
+        self.high = high
+
+    def __repr__(self):
+        return f'Element({sorted(self.members)}, {self.low}, {self.high})'
+
+
+def parse_atom(atom):
+    if atom.startswith('['):
+        members = set()
+        for symbol in atom[1:-1].replace(' ', ''):
+            if symbol not in SYMBOLS:
+                raise ValueError(f"unknown symbol '{symbol}'")
+            members.update(SYMBOLS[symbol])
+        if not members:
+            raise ValueError('empty [] set')
+        return members
+    if atom not in SYMBOLS:
+        raise ValueError(f"unknown symbol '{atom}'")
+    return set(SYMBOLS[atom])
+
+
+def parse_pattern(text):
+    """Parse pattern syntax (see module docstring) into a list of Elements"""
+    text = (text or '').strip()
+    if not text:
+        raise ValueError('pattern is empty')
+
+    elements = []
+    position = 0
+    while position < len(text):
+        if text[position:].isspace():
+            break
+        match = ELEMENT_RE.match(text, position)
+        if not match:
+            raise ValueError(f'cannot parse pattern at "{text[position:]}"')
+        members = parse_atom(match['atom'])
+        if match['negate']:
+            members = set(range(CODES)) - members
+
+        if match['plus']:
+            low, high = 1, None
+        elif match['low'] is not None:
+            low = int(match['low'])
+            high = (int(match['high']) if match['high'] else None) if match['comma'] else low
+        else:
+            low, high = 1, 1
+        if low < 1 or (high is not None and high < low):
+            raise ValueError(f'invalid quantifier in "{match.group().strip()}"')
+
+        elements.append(Element(members, low, high))
+        position = match.end()
+
+    if len(elements) > MAX_ELEMENTS:
+        raise ValueError(f'patterns are limited to {MAX_ELEMENTS} elements')
+    return elements
+
+
+def parse_outcome(text):
+    """An outcome is a single ball class such as W, B or [.W]"""
+    elements = parse_pattern(text)
+    if len(elements) != 1 or (elements[0].low, elements[0].high) != (1, 1):
+        raise ValueError('outcome must be a single ball class, e.g. W or B')
+    return elements[0].members
+
+
+def factorize(values):
+    """(codes array, labels list) for a column of strings"""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+class SequenceStore:
+    """
+    The whole dataset as parallel arrays, one entry per ball in sequence.
+    innings_start marks the first ball of each innings so no streak or
+    window ever crosses into the next one.
+    """
+
+    def __init__(self, codes, innings, labels, columns):
+        self.codes = codes
+        self.innings = innings
+        self.labels = labels
+        self.columns = columns
+        self.size = len(codes)
+        self.innings_start = np.ones(self.size, dtype=bool)
+        self.innings_start[1:] = innings[1:] != innings[:-1]
+        # A trial needs at least one more ball in the same innings
+        self.has_next = np.zeros(self.size, dtype=bool)
+        self.has_next[:-1] = ~self.innings_start[1:]
+
+    def membership(self, members):
+        table = np.zeros(CODES, dtype=bool)
+        table[list(members)] = True
+        return table[self.codes]
+
+    def streaks(self, member):
+        """Length of the run of members ending at each ball, reset per innings"""
+        position = np.arange(self.size)
+        breaks = np.where(~member, position, np.where(self.innings_start, position - 1, -1))
+        return position - np.maximum.accumulate(breaks)
+
+    def match_ends(self, elements):
+        """Boolean array: some match of the pattern ends at this ball"""
+        # prefix[t]: the elements so far can match ending just before ball t
+        prefix = np.ones(self.size + 1, dtype=bool)
+        t = np.arange(1, self.size + 1)
+        ends = None
+        for element in elements:
+            streak = self.streaks(self.membership(element.members))
+            longest = streak if element.high is None else np.minimum(streak, element.high)
+            # Any prefix match at t - L for L in [low, longest]
+            counts = np.concatenate([[0], np.cumsum(prefix)])
+            lo = np.clip(t - longest, 0, self.size)
+            hi = np.clip(t - element.low, -1, self.size)
+            ends = (streak >= element.low) & (counts[hi + 1] - counts[lo] > 0)
+            prefix = np.concatenate([[False], ends & self.has_next])
+        return ends
+
+    def label_codes(self, column, value):
+        """Codes of the filter value in column, or None if it never occurs"""
+        codes, labels = self.columns[column], self.labels[column]
+        try:
+            return codes == labels.index(value)
+        except ValueError:
+            return None
+
+
+def load_sequences(cursor):
+    plain = cursor.connection.cursor()
+    plain.execute(SEQUENCE_QUERY)
+    rows = plain.fetchall()
+    plain.close()
+    if not rows:
+        return None
+
+    (match_ids, innings_nos, teams, batters, bowlers, phases, seasons,
+     runs_batter, runs_total, dismissal) = zip(*rows)
+
+    runs_batter = np.array(runs_batter)
+    runs_total = np.array(runs_total)
+    codes = np.minimum(runs_total, 3).astype(np.int8)
+    codes[runs_batter == 4] = FOUR
+    codes[runs_batter >= 6] = SIX
+    codes[np.array(dismissal)] = WICKET
+
+    innings, _ = factorize(list(zip(match_ids, innings_nos)))
+    columns, labels = {}, {}
+    for name, values in (('team', teams), ('batter', batters), ('bowler', bowlers),
+                         ('phase', phases), ('season', seasons)):
+        columns[name], labels[name] = factorize(values)
+    return SequenceStore(codes, innings, labels, columns)
+
+
+def get_sequence_store(cursor):
+    return sequence_cache.get('sequences', lambda: load_sequences(cursor))
+
+
+def outcome_within(store, outcome, within):
+    """Boolean array: the outcome occurs within `within` balls after this ball, same innings"""
+    hits = np.flatnonzero(store.membership(outcome))
+    following = np.searchsorted(hits, np.arange(store.size), side='right')
+    found = following < len(hits)
+    nxt = hits[np.minimum(following, len(hits) - 1)]
+    return found & (nxt - np.arange(store.size) <= within) & (store.innings[nxt] == store.innings)
+
+
+def query_pattern(store, pattern, outcome, within=3, group_by=None, filters=None,
+                  overlap=False, min_trials=20, limit=50):
+    """
+    How often `outcome` follows within `within` balls of each match of `pattern`.
+    By default only the ball at which a pattern first completes is a trial
+    (four dots in a row is one trial, not one per further dot); overlap=True
+    counts every ball at which the pattern holds. Trials are attributed to the
+    next ball's batter, bowler, phase and batting team, which is also what
+    filters ({'batter', 'bowler', 'phase', 'team', 'season'}) apply to.
+    """
+    elements = parse_pattern(pattern)
+    outcome_members = parse_outcome(outcome)
+    if not 1 <= within <= MAX_WITHIN:
+        raise ValueError(f'within must be between 1 and {MAX_WITHIN}')
+    if group_by is not None and group_by not in GROUPS:
+        raise ValueError(f"group_by must be one of: {', '.join(GROUPS)}")
+
+    ends = store.match_ends(elements)
+    if not overlap:
+        ends[1:] &= ~(ends[:-1] & ~store.innings_start[1:])
+
+    eligible = store.has_next.copy()
+    for column, value in (filters or {}).items():
+        if value in (None, ''):
+            continue
+        selected = store.label_codes(column, value)
+        if selected is None:
+            eligible[:] = False
+            break
+        # Attribute each ball to the one after it
+        eligible[:-1] &= selected[1:]
+
+    trials = ends & eligible
+    success = outcome_within(store, outcome_members, within)
+
+    def summary(trial_count, success_count, base_trials, base_successes):
+        probability = success_count / trial_count if trial_count else None
+        baseline = base_successes / base_trials if base_trials else None
+        return {
+            'trials': int(trial_count),
+            'successes': int(success_count),
+            'probability': round(probability, 4) if probability is not None else None,
+            'baseline': round(baseline, 4) if baseline is not None else None,
+            'lift': round(probability / baseline, 3) if probability is not None and baseline else None
+        }
+
+    result = {
+        'pattern': pattern,
+        'outcome': outcome,
+        'within': within,
+        'overlap': overlap,
+        'balls_scanned': store.size,
+        'overall': summary(trials.sum(), (trials & success).sum(), eligible.sum(), (eligible & success).sum())
+    }
+
+    if group_by:
+        column = store.columns[group_by]
+        group = np.zeros(store.size, dtype=np.int32)
+        group[:-1] = column[1:]
+        size = len(store.labels[group_by])
+        counts = [np.bincount(group[mask], minlength=size)
+                  for mask in (trials, trials & success, eligible, eligible & success)]
+        qualifying = np.flatnonzero(counts[0] >= max(min_trials, 1))
+        rows = [{group_by: store.labels[group_by][g], **summary(*(c[g] for c in counts))} for g in qualifying]
+        rows.sort(key=lambda r: (-r['probability'], -r['trials']))
+        result['group_by'] = group_by
+        result['groups'] = rows[:limit]
+
+    return result
@@ -0,0 +1,54 @@
+"""
+Fast JSON serialization for API responses
+Uses orjson when it is installed; falls back to Flask's default provider.
+"""
+import decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_default(value):
+    # Only reached for types orjson cannot encode itself. NUMERIC columns are
+    # already cast to float by models.database, so this is rarely hit.
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson (dates/datetimes become ISO 8601)"""
+
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        option = self.option
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_orjson_default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self.option
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+def init_json_provider(app):
+    """Install the fastest available JSON provider on the app"""
+    if orjson is not None:
+        app.json_provider_class = OrjsonProvider
+        app.json = OrjsonProvider(app)
+    return app.json
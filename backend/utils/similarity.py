@@ -0,0 +1,142 @@
+"""
+Similar-player search over per-player stat vectors
+Batting and bowling profiles (phase scoring rates, dot and boundary rates,
+dismissal rates and dismissal-kind mix, share of balls per phase) are built
+from the style_matchups counters and the wickets table, z-scored per feature
+and scaled to unit length. A query is then one matrix-vector product: cosine
+similarity against every qualifying player.
+"""
+import numpy as np
+
+PHASES = ('Powerplay', 'Middle Overs', 'Death Overs')
+PHASE_KEYS = ('powerplay', 'middle', 'death')
+DISMISSAL_KINDS = ('caught', 'bowled', 'lbw', 'run out', 'stumped')
+MIN_BALLS = {'batting': 300, 'bowling': 300}
+
+COUNTERS_QUERY = """
+    SELECT player, phase, SUM(balls) as balls, SUM(runs) as runs, SUM(dismissals) as dismissals,
+           SUM(dots) as dots, SUM(fours) as fours, SUM(sixes) as sixes
+    FROM style_matchups
+    WHERE role = %s
+    GROUP BY player, phase
+"""
+
+KINDS_QUERY = {
+    'batting': """
+        SELECT player_out as player, kind, COUNT(*) as n
+        FROM wickets
+        WHERE is_dismissal
+        GROUP BY player_out, kind
+    """,
+    'bowling': """
+        SELECT bowler as player, kind, COUNT(*) as n
+        FROM wickets
+        WHERE bowler_wicket
+        GROUP BY bowler, kind
+    """,
+}
+
+
+def feature_names(role):
+    rate = 'strike_rate' if role == 'batting' else 'economy'
+    kinds = DISMISSAL_KINDS if role == 'batting' else tuple(k for k in DISMISSAL_KINDS if k != 'run out')
+    return (
+        [f'{rate}_{p}' for p in PHASE_KEYS]
+        + ['dot_pct', 'boundary_pct', 'six_share', 'dismissals_per_100']
+        + [f'balls_share_{p}' for p in PHASE_KEYS]
+        + [f"{k.replace(' ', '_')}_share" for k in kinds + ('other',)]
+    )
+
+
+def safe_divide(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.full(np.shape(numerator), np.nan, dtype=float),
+                     where=np.asarray(denominator) != 0)
+
+
+class SimilarityIndex:
+    def __init__(self, role, players, balls, features):
+        self.role = role
+        self.players = players
+        self.balls = balls
+        self.features = features
+        self.names = feature_names(role)
+        self.position = {name: i for i, name in enumerate(players)}
+        self.lower = {name.lower(): name for name in players}
+
+        # z-score each column, then unit rows so a dot product is cosine similarity
+        std = features.std(axis=0)
+        z = (features - features.mean(axis=0)) / np.where(std > 0, std, 1)
+        norms = np.linalg.norm(z, axis=1, keepdims=True)
+        self.unit = z / np.where(norms > 0, norms, 1)
+
+    def resolve(self, name):
+        return name if name in self.position else self.lower.get(name.lower())
+
+    def profile(self, i):
+        return {name: round(float(v), 2) for name, v in zip(self.names, self.features[i])}
+
+    def neighbours(self, name, k=10):
+        """The k most similar players to name (excluding itself), best first"""
+        i = self.position[name]
+        similarity = self.unit @ self.unit[i]
+        similarity[i] = -np.inf
+        k = min(k, len(self.players) - 1)
+        top = np.argpartition(-similarity, k - 1)[:k] if k > 0 else np.array([], dtype=int)
+        top = top[np.argsort(-similarity[top])]
+        return [
+            {
+                'player': self.players[j],
+                'similarity': round(float(similarity[j]), 4),
+                'balls': int(self.balls[j]),
+                'profile': self.profile(j)
+            }
+            for j in top
+        ]
+
+
+def build_index(cursor, role):
+    """Assemble the feature matrix for every player with at least MIN_BALLS[role] balls"""
+    cursor.execute(COUNTERS_QUERY, (role,))
+    counters = {}
+    for row in cursor.fetchall():
+        counters.setdefault(row['player'], {})[row['phase']] = row
+
+    cursor.execute(KINDS_QUERY[role])
+    kinds = {}
+    for row in cursor.fetchall():
+        kinds.setdefault(row['player'], {})[row['kind']] = row['n']
+
+    players = sorted(p for p, phases in counters.items()
+                     if sum(r['balls'] for r in phases.values()) >= MIN_BALLS[role])
+    columns = ('balls', 'runs', 'dismissals', 'dots', 'fours', 'sixes')
+    # [player, phase, counter]
+    cube = np.array([
+        [[float(counters[p].get(phase, {}).get(c) or 0) for c in columns] for phase in PHASES]
+        for p in players
+    ]).reshape(len(players), len(PHASES), len(columns))
+    balls, runs, dismissals, dots, fours, sixes = (cube[:, :, i] for i in range(len(columns)))
+    total = {name: values.sum(axis=1) for name, values in
+             zip(columns, (balls, runs, dismissals, dots, fours, sixes))}
+
+    scale = 100 if role == 'batting' else 6
+    phase_rates = safe_divide(runs * scale, balls)
+    # A phase the player never featured in takes their overall rate
+    overall_rate = safe_divide(total['runs'] * scale, total['balls'])
+    phase_rates = np.where(np.isnan(phase_rates), overall_rate[:, None], phase_rates)
+
+    kind_names = DISMISSAL_KINDS if role == 'batting' else tuple(k for k in DISMISSAL_KINDS if k != 'run out')
+    kind_counts = np.array([[kinds.get(p, {}).get(k, 0) for k in kind_names] for p in players], dtype=float)
+    all_kinds = np.array([sum(kinds.get(p, {}).values()) for p in players], dtype=float)
+    kind_counts = np.column_stack([kind_counts, all_kinds - kind_counts.sum(axis=1)])
+    kind_share = np.nan_to_num(safe_divide(kind_counts * 100, all_kinds[:, None]))
+
+    features = np.column_stack([
+        phase_rates,
+        safe_divide(total['dots'] * 100, total['balls']),
+        safe_divide((total['fours'] + total['sixes']) * 100, total['balls']),
+        np.nan_to_num(safe_divide(total['sixes'] * 100, total['fours'] + total['sixes'])),
+        safe_divide(total['dismissals'] * 100, total['balls']),
+        safe_divide(balls * 100, total['balls'][:, None]),
+        kind_share,
+    ])
+    return SimilarityIndex(role, players, total['balls'], np.nan_to_num(features))
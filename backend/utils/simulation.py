@@ -0,0 +1,263 @@
+"""
+Monte Carlo innings simulation from empirical ball outcomes
+Each batter gets an outcome distribution per (bowler type, phase) built from
+deliveries, shrunk towards the batter's phase average and the global
+(bowler type, phase) average when the sample is small. Thousands of innings
+are then played ball by ball in parallel as NumPy arrays. Work is split into
+fixed-size chunks with their own child seeds, so a given seed gives the same
+result whether the chunks run in this process or a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import numpy as np
+from utils.helpers import get_phase_from_over
+from utils.http_cache import VersionedCache
+from utils.player_styles import resolve_bowling_types
+
+# Delivery outcomes: dot, 1, 2, 3, 4, 6, striker out, extra (wide/no-ball, re-bowled).
+# The rare all-run 5 is counted as a 3.
+OUTCOMES = ('0', '1', '2', '3', '4', '6', 'W', 'extra')
+OUTCOME_RUNS = np.array([0, 1, 2, 3, 4, 6, 0, 1])
+WICKET, EXTRA = 6, 7
+
+BOWLER_TYPES = ('pace', 'spin', 'unknown')
+PHASES = ('Powerplay', 'Middle Overs', 'Death Overs')
+
+# Pseudo-balls of prior weight when shrinking a thin sample
+PRIOR_WEIGHT = 30
+CHUNK_SIZE = 25000
+MAX_SIMULATIONS = 1000000
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+OUTCOME_COUNTS_QUERY = """
+    SELECT
+        {group_columns},
+        d.bowler,
+        d.phase,
+        COUNT(*) FILTER (WHERE d.is_legal AND NOT d.out AND d.runs_batter = 0) as c0,
+        COUNT(*) FILTER (WHERE d.is_legal AND NOT d.out AND d.runs_batter = 1) as c1,
+        COUNT(*) FILTER (WHERE d.is_legal AND NOT d.out AND d.runs_batter = 2) as c2,
+        COUNT(*) FILTER (WHERE d.is_legal AND NOT d.out AND d.runs_batter IN (3, 5)) as c3,
+        COUNT(*) FILTER (WHERE d.is_legal AND NOT d.out AND d.runs_batter = 4) as c4,
+        COUNT(*) FILTER (WHERE d.is_legal AND NOT d.out AND d.runs_batter >= 6) as c6,
+        COUNT(*) FILTER (WHERE d.out) as cw,
+        COUNT(*) FILTER (WHERE NOT d.is_legal AND NOT d.out) as cx
+    FROM (
+        -- Retirements are in players_out but are not dismissals
+        SELECT d.*, w.ball_seq IS NOT NULL as out
+        FROM deliveries d
+        LEFT JOIN wickets w ON w.match_id = d.match_id AND w.innings_no = d.innings_no
+            AND w.ball_seq = d.ball_seq AND w.player_out = d.batter AND w.is_dismissal
+    ) d
+    {where}
+    GROUP BY {group_columns}, d.bowler, d.phase
+"""
+
+COUNT_COLUMNS = ('c0', 'c1', 'c2', 'c3', 'c4', 'c6', 'cw', 'cx')
+
+# The all-batters distribution only changes with the dataset
+global_cache = VersionedCache(max_size=1)
+
+
+def fold_by_type(cursor, rows):
+    """Sum outcome counts into [bowler type, phase, outcome] arrays"""
+    types = resolve_bowling_types(cursor, {row['bowler'] for row in rows})
+    counts = np.zeros((len(BOWLER_TYPES), len(PHASES), len(OUTCOMES)))
+    for row in rows:
+        t = BOWLER_TYPES.index(types.get(row['bowler']) or 'unknown')
+        counts[t, PHASES.index(row['phase'])] += [row[c] for c in COUNT_COLUMNS]
+    return counts
+
+
+def shrink(counts, prior):
+    """Posterior mean of a multinomial with prior weight PRIOR_WEIGHT"""
+    return (counts + PRIOR_WEIGHT * prior) / (counts.sum(axis=-1, keepdims=True) + PRIOR_WEIGHT)
+
+
+def load_global_table(cursor):
+    """All-batters (type, phase) distribution, backed off to the phase average for thin types"""
+    cursor.execute(OUTCOME_COUNTS_QUERY.format(group_columns='d.phase', where=''))
+    overall = fold_by_type(cursor, cursor.fetchall())
+    phase_prior = overall.sum(axis=0) / overall.sum(axis=(0, 2))[:, None]
+    return shrink(overall, phase_prior[None])
+
+
+def load_outcome_tables(cursor, batters):
+    """
+    Outcome probabilities per batter as [batter, bowler type, phase, outcome],
+    plus the raw ball counts behind each cell. An extra final row holds the
+    global distribution, used for batters beyond the named lineup.
+    """
+    cursor.execute(OUTCOME_COUNTS_QUERY.format(group_columns='d.batter', where='WHERE d.batter = ANY(%s)'),
+                   (list(batters),))
+    by_batter = {}
+    for row in cursor.fetchall():
+        by_batter.setdefault(row['batter'], []).append(row)
+
+    global_probs = global_cache.get('global', lambda: load_global_table(cursor))
+
+    probs = np.empty((len(batters) + 1, len(BOWLER_TYPES), len(PHASES), len(OUTCOMES)))
+    samples = np.zeros((len(batters), len(BOWLER_TYPES), len(PHASES)), dtype=np.int64)
+    for i, batter in enumerate(batters):
+        counts = fold_by_type(cursor, by_batter.get(batter, []))
+        # The batter's own phase record, regardless of bowler type, is the first prior
+        batter_phase = shrink(counts.sum(axis=0), global_probs.mean(axis=0))
+        probs[i] = shrink(counts, batter_phase[None])
+        samples[i] = counts.sum(axis=-1)
+    probs[-1] = global_probs
+    return probs, samples
+
+
+def simulate_chunk(cumulative, over_cells, n, wickets_in_hand, seed):
+    """
+    Play n innings over the given overs.
+    cumulative: [lineup slot, over, outcome] cumulative probabilities, last
+    slot being the replacement batter. Returns (runs, wickets, balls) arrays.
+    """
+    rng = np.random.default_rng(seed)
+    slots = cumulative.shape[0]
+    total_balls = over_cells * 6
+
+    runs = np.zeros(n, dtype=np.int64)
+    wickets = np.zeros(n, dtype=np.int64)
+    balls = np.zeros(n, dtype=np.int64)
+    striker = np.zeros(n, dtype=np.int64)
+    non_striker = np.ones(n, dtype=np.int64)
+    next_batter = np.full(n, 2, dtype=np.int64)
+    active = np.arange(n)
+
+    while len(active):
+        over = balls[active] // 6
+        slot = np.minimum(striker[active], slots - 1)
+        cells = cumulative[slot, over]
+        outcome = (rng.random(len(active))[:, None] > cells).sum(axis=1)
+
+        runs[active] += OUTCOME_RUNS[outcome]
+        legal = outcome != EXTRA
+        balls[active] += legal
+
+        out = outcome == WICKET
+        if out.any():
+            fallen = active[out]
+            wickets[fallen] += 1
+            striker[fallen] = next_batter[fallen]
+            next_batter[fallen] += 1
+
+        # Odd runs swap ends, as does the end of an over
+        swap = (OUTCOME_RUNS[outcome] % 2 == 1) & legal
+        swap ^= legal & (balls[active] % 6 == 0)
+        swapped = active[swap]
+        striker[swapped], non_striker[swapped] = non_striker[swapped], striker[swapped].copy()
+
+        active = active[(balls[active] < total_balls) & (wickets[active] < wickets_in_hand)]
+
+    return runs, wickets, balls
+
+
+def chunk_plan(simulations, seed):
+    """Fixed-size chunks, each with an independent child seed"""
+    sizes = [CHUNK_SIZE] * (simulations // CHUNK_SIZE)
+    if simulations % CHUNK_SIZE:
+        sizes.append(simulations % CHUNK_SIZE)
+    children = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(sizes, children))
+
+
+def run_simulations(cumulative, over_cells, simulations, wickets_in_hand, seed, workers=1):
+    """Run every chunk, in a process pool when workers > 1, and concatenate"""
+    plan = chunk_plan(simulations, seed)
+    if workers > 1 and len(plan) > 1:
+        # Spawned, not forked: callers are request and job-queue threads, and
+        # forking a multi-threaded process can deadlock the child
+        with ProcessPoolExecutor(max_workers=min(workers, len(plan)), mp_context=get_context('spawn')) as pool:
+            futures = [pool.submit(simulate_chunk, cumulative, over_cells, size, wickets_in_hand, child)
+                       for size, child in plan]
+            results = [f.result() for f in futures]
+    else:
+        results = [simulate_chunk(cumulative, over_cells, size, wickets_in_hand, child)
+                   for size, child in plan]
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def summarize(runs, wickets, balls, wickets_in_hand):
+    """Score and wicket distributions for the API response"""
+    histogram_edges = np.arange(0, runs.max() + 11, 10)
+    histogram, _ = np.histogram(runs, bins=histogram_edges)
+    wicket_counts = np.bincount(wickets, minlength=wickets_in_hand + 1)
+    return {
+        'runs': {
+            'mean': round(float(runs.mean()), 2),
+            'std': round(float(runs.std()), 2),
+            'percentiles': {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(runs, PERCENTILES))},
+            'histogram': [
+                {'from': int(lo), 'to': int(lo) + 9, 'probability': round(float(c) / len(runs), 4)}
+                for lo, c in zip(histogram_edges[:-1], histogram) if c
+            ]
+        },
+        'wickets': {
+            'mean': round(float(wickets.mean()), 2),
+            'distribution': {str(k): round(float(c) / len(wickets), 4) for k, c in enumerate(wicket_counts)},
+            'all_out_probability': round(float((wickets >= wickets_in_hand).mean()), 4)
+        },
+        'balls': {
+            'mean': round(float(balls.mean()), 2)
+        }
+    }
+
+
+def simulate_innings(cursor, batters, attack, over_start=40, overs=10, wickets_lost=0,
+                     simulations=10000, seed=None, workers=1):
+    """
+    Simulate `simulations` innings of `batters` (in batting order, the first
+    two at the crease) against an attack bowling overs round-robin.
+    attack entries are bowler types ('pace'/'spin') or bowler names, which
+    are resolved to their type. Returns the distributions plus the seed used.
+    """
+    if not batters:
+        raise ValueError('At least one batter is required')
+    if not attack:
+        raise ValueError('At least one bowler or bowler type is required')
+    if overs < 1 or over_start < 0 or over_start + overs > 50:
+        raise ValueError('Overs must lie within 0-49')
+    if not 0 <= wickets_lost <= 9:
+        raise ValueError('wickets_lost must be between 0 and 9')
+    if not 1 <= simulations <= MAX_SIMULATIONS:
+        raise ValueError(f'simulations must be between 1 and {MAX_SIMULATIONS}')
+
+    named = [a for a in attack if a not in BOWLER_TYPES]
+    named_types = resolve_bowling_types(cursor, named)
+    attack_types = [a if a in BOWLER_TYPES else (named_types.get(a) or 'unknown') for a in attack]
+
+    probs, samples = load_outcome_tables(cursor, batters)
+
+    # One distribution per lineup slot and over; later slots use the replacement row
+    over_numbers = range(over_start, over_start + overs)
+    type_index = [BOWLER_TYPES.index(attack_types[i % len(attack_types)]) for i in range(overs)]
+    phase_index = [PHASES.index(get_phase_from_over(o)) for o in over_numbers]
+    slots = np.concatenate([probs[:len(batters)], probs[-1:]])
+    cumulative = np.cumsum(slots[:, type_index, phase_index], axis=-1)
+    cumulative[..., -1] = 1.0
+
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % (2 ** 32))
+    wickets_in_hand = 10 - wickets_lost
+    runs, wickets, balls = run_simulations(cumulative, overs, simulations, wickets_in_hand, seed, workers)
+
+    return {
+        'seed': seed,
+        'simulations': simulations,
+        'overs': {'start': over_start, 'end': over_start + overs - 1},
+        'wickets_lost': wickets_lost,
+        'attack': [{'bowler': a, 'type': t} for a, t in zip(attack, attack_types)],
+        'batters': [
+            {
+                'batter': batter,
+                'balls_in_sample': {
+                    BOWLER_TYPES[t]: {PHASES[p]: int(samples[i, t, p]) for p in range(len(PHASES))}
+                    for t in range(len(BOWLER_TYPES))
+                }
+            }
+            for i, batter in enumerate(batters)
+        ],
+        **summarize(runs, wickets, balls, wickets_in_hand)
+    }
@@ -0,0 +1,231 @@
+"""
+Mergeable sketches for distribution and distinct-count stats
+KLLSketch approximates quantiles and HyperLogLog approximates distinct
+counts. Both merge without loss of accuracy, so ingest folds each match into
+per-(entity, season) sketches and reads merge whichever seasons they need.
+Sketches serialize to compact bytes for the `sketches` table.
+"""
+import hashlib
+import math
+import struct
+import numpy as np
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch. Level h holds items of weight 2**h; when a level
+    outgrows its capacity it is sorted and every other item is promoted.
+    """
+    MAGIC = b'K'
+
+    def __init__(self, k=200):
+        self.k = k
+        self.n = 0
+        self.levels = [[]]
+        # Alternate the kept half on each compaction so results are reproducible
+        self._offset = 0
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        for level in range(len(self.levels)):
+            if len(self.levels[level]) <= self._capacity(level):
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            items = sorted(self.levels[level])
+            # An odd item out stays behind so total weight is preserved
+            keep = [items.pop()] if len(items) % 2 else []
+            self.levels[level + 1].extend(items[self._offset::2])
+            self._offset ^= 1
+            self.levels[level] = keep
+
+    def update(self, value):
+        self.levels[0].append(float(value))
+        self.n += 1
+        if len(self.levels[0]) > self._capacity(0):
+            self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        weighted = sorted(
+            (value, 1 << level)
+            for level, items in enumerate(self.levels)
+            for value in items
+        )
+        if not weighted:
+            return None
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return value
+        return weighted[-1][0]
+
+    def percentiles(self, points=PERCENTILES, digits=2):
+        return {f'p{p}': (round(self.quantile(p / 100), digits) if self.n else None) for p in points}
+
+    def to_bytes(self):
+        sizes = [len(items) for items in self.levels]
+        header = struct.pack('<cHQB', self.MAGIC, self.k, self.n, len(sizes))
+        header += struct.pack(f'<{len(sizes)}I', *sizes)
+        values = np.array([v for items in self.levels for v in items], dtype='<f8')
+        return header + values.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        magic, k, n, num_levels = struct.unpack_from('<cHQB', data)
+        if magic != cls.MAGIC:
+            raise ValueError('Not a KLL sketch')
+        offset = struct.calcsize('<cHQB')
+        sizes = struct.unpack_from(f'<{num_levels}I', data, offset)
+        offset += 4 * num_levels
+        values = np.frombuffer(data, dtype='<f8', offset=offset).tolist()
+
+        sketch = cls(k)
+        sketch.n = n
+        sketch.levels = []
+        for size in sizes:
+            sketch.levels.append(values[:size])
+            values = values[size:]
+        return sketch
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2**p registers (p=11: ~2.3% error)"""
+    MAGIC = b'H'
+
+    def __init__(self, p=11):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        # Most player sketches touch a handful of registers, so store those sparsely
+        nonzero = np.flatnonzero(self.registers)
+        if len(nonzero) * 3 < self.m:
+            return (struct.pack('<cBB', self.MAGIC, self.p, 0)
+                    + nonzero.astype('<u2').tobytes()
+                    + self.registers[nonzero].tobytes())
+        return struct.pack('<cBB', self.MAGIC, self.p, 1) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        magic, p, dense = struct.unpack_from('<cBB', data)
+        if magic != cls.MAGIC:
+            raise ValueError('Not a HyperLogLog sketch')
+        sketch = cls(p)
+        body = data[3:]
+        if dense:
+            sketch.registers = np.frombuffer(body, dtype=np.uint8).copy()
+        else:
+            count = len(body) // 3
+            index = np.frombuffer(body[:2 * count], dtype='<u2')
+            sketch.registers[index] = np.frombuffer(body[2 * count:], dtype=np.uint8)
+        return sketch
+
+
+def load_sketch(data):
+    """Deserialize either sketch type from its stored bytes"""
+    kind = bytes(data[:1])
+    if kind == KLLSketch.MAGIC:
+        return KLLSketch.from_bytes(data)
+    if kind == HyperLogLog.MAGIC:
+        return HyperLogLog.from_bytes(data)
+    raise ValueError('Unknown sketch type')
+
+
+# Sketches maintained at ingest, per (entity type, entity, season)
+SKETCH_METRICS = {
+    # player: runs in each batting innings
+    'batting_runs': KLLSketch,
+    # player: distinct teams batted against / bowlers faced
+    'batting_opponents': HyperLogLog,
+    'batting_bowlers': HyperLogLog,
+    # player: economy in each bowling innings
+    'bowling_economy': KLLSketch,
+    # player: distinct teams bowled against / batters dismissed
+    'bowling_opponents': HyperLogLog,
+    'bowling_victims': HyperLogLog,
+    # team: innings totals and distinct players used
+    'team_total': KLLSketch,
+    'team_players': HyperLogLog,
+}
+
+
+def fetch_merged_sketches(cursor, entity_type, entity=None, metrics=None, season=None):
+    """
+    Merge the stored sketches for an entity (or every entity of the type)
+    across seasons. Returns {metric: sketch} for the metrics found.
+    """
+    conditions = ["entity_type = %s"]
+    params = [entity_type]
+    if entity is not None:
+        conditions.append("entity = %s")
+        params.append(entity)
+    if metrics:
+        conditions.append("metric = ANY(%s)")
+        params.append(list(metrics))
+    if season:
+        conditions.append("season = %s")
+        params.append(season)
+
+    cursor.execute(f"SELECT metric, sketch FROM sketches WHERE {' AND '.join(conditions)}", params)
+
+    merged = {}
+    for row in cursor.fetchall():
+        metric, data = (row['metric'], row['sketch']) if isinstance(row, dict) else row
+        sketch = load_sketch(data)
+        if metric in merged:
+            merged[metric].merge(sketch)
+        else:
+            merged[metric] = sketch
+    return merged
+
+
+def distribution_summary(sketches, quantile_metric, distinct_metrics):
+    """Percentiles of one KLL metric plus the HyperLogLog counts, for API responses"""
+    quantiles = sketches.get(quantile_metric)
+    summary = {
+        'innings': quantiles.n if quantiles else 0,
+        'percentiles': quantiles.percentiles() if quantiles else None
+    }
+    for name, metric in distinct_metrics.items():
+        summary[name] = sketches[metric].count() if metric in sketches else 0
+    return summary
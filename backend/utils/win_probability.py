@@ -0,0 +1,280 @@
+"""
+Ball-by-ball win probability
+One small logistic model per innings, trained offline from the deliveries
+table (`python manage.py train-win-model`) and stored as a coefficient row in
+win_probability_model. Match states are loaded as NumPy arrays, so a whole
+match, or every match in the database, is scored in one vectorized pass.
+Probabilities are always for the team batting first.
+"""
+import json
+import numpy as np
+
+# Per-ball match state after each delivery of the two main innings.
+# {match_filter} is empty for training/batch scoring or "AND d.match_id = %s".
+STATE_QUERY = """
+    SELECT
+        d.match_id,
+        d.innings_no,
+        d.ball_seq,
+        d.over_num,
+        d.ball_in_over,
+        d.batting_team,
+        SUM(d.runs_total) OVER w as score,
+        SUM(CASE WHEN d.is_legal THEN 1 ELSE 0 END) OVER w as legal_balls,
+        SUM(COALESCE(wk.dismissals, 0)) OVER w as wickets,
+        (mp.innings->d.innings_no->>'overs')::int as allotted_overs,
+        (mp.innings->1->>'target')::int as target,
+        mp.innings->0->>'team' as batting_first,
+        mi.info->'outcome'->>'winner' as winner
+    FROM deliveries d
+    JOIN match_progression mp ON mp.match_id = d.match_id
+    JOIN match_info mi ON mi.id = d.match_id
+    LEFT JOIN (
+        SELECT match_id, innings_no, ball_seq, COUNT(*) as dismissals
+        FROM wickets
+        WHERE is_dismissal
+        GROUP BY match_id, innings_no, ball_seq
+    ) wk ON wk.match_id = d.match_id AND wk.innings_no = d.innings_no AND wk.ball_seq = d.ball_seq
+    WHERE d.innings_no < 2 {match_filter}
+    WINDOW w AS (PARTITION BY d.match_id, d.innings_no ORDER BY d.ball_seq)
+    ORDER BY d.match_id, d.innings_no, d.ball_seq
+"""
+
+TEXT_COLUMNS = ('match_id', 'batting_team', 'batting_first', 'winner')
+
+# Run rates are capped so near-impossible chases don't dominate the fit
+MAX_RATE = 36.0
+
+
+def fetch_dicts(cursor):
+    """Rows as dicts from either a RealDictCursor or the plain ingest cursor"""
+    rows = cursor.fetchall()
+    if rows and not isinstance(rows[0], dict):
+        names = [column.name for column in cursor.description]
+        rows = [dict(zip(names, row)) for row in rows]
+    return rows
+
+
+def load_states(cursor, match_id=None):
+    """Fetch match states as a dict of column arrays (empty dict if none)"""
+    # A plain cursor on the same connection: building a dict per row is the
+    # slowest part of loading every delivery in the database
+    plain = cursor.connection.cursor()
+    if match_id is None:
+        plain.execute(STATE_QUERY.format(match_filter=''))
+    else:
+        plain.execute(STATE_QUERY.format(match_filter='AND d.match_id = %s'), (match_id,))
+    names = [column.name for column in plain.description]
+    rows = plain.fetchall()
+    plain.close()
+    if not rows:
+        return {}
+
+    states = {}
+    for name, values in zip(names, zip(*rows)):
+        if name in TEXT_COLUMNS:
+            states[name] = np.array(values, dtype=object)
+        else:
+            states[name] = np.array([v or 0 for v in values], dtype=np.int64)
+
+    # Last delivery of each innings, where a chase is settled either way
+    innings_key = states['match_id'] + ':' + states['innings_no'].astype(str).astype(object)
+    states['innings_end'] = np.r_[innings_key[1:] != innings_key[:-1], True]
+    return states
+
+
+def first_innings_features(score, balls_remaining, wickets_in_hand, allotted_balls):
+    """Design matrix for the batting-first side during its own innings"""
+    balls_bowled = np.maximum(allotted_balls - balls_remaining, 1)
+    run_rate = np.minimum(score * 6 / balls_bowled, MAX_RATE)
+    projected = score + run_rate * balls_remaining / 6
+    return np.column_stack([
+        np.ones_like(score, dtype=float),
+        score / 100,
+        projected / 100,
+        balls_remaining / 300,
+        wickets_in_hand / 10,
+        wickets_in_hand * balls_remaining / 3000,
+        run_rate / 6,
+    ])
+
+
+def chase_features(runs_required, balls_remaining, wickets_in_hand):
+    """Design matrix for the chasing side"""
+    balls = np.maximum(balls_remaining, 1)
+    required_rate = np.minimum(np.maximum(runs_required, 0) * 6 / balls, MAX_RATE)
+    return np.column_stack([
+        np.ones_like(runs_required, dtype=float),
+        required_rate / 6,
+        wickets_in_hand / 10,
+        balls_remaining / 300,
+        np.log1p(np.maximum(runs_required, 0)),
+        np.log1p(balls_remaining),
+        required_rate * wickets_in_hand / 60,
+    ])
+
+
+def design_matrices(states):
+    """
+    Split states into first-innings and chase rows.
+    Returns (first mask, first features, chase mask, chase features, chase terminal overrides).
+    """
+    innings = states['innings_no']
+    allotted_balls = states['allotted_overs'] * 6
+    # Scorers occasionally allow a seventh ball, so only the final delivery runs out of balls
+    balls_remaining = np.where(states['innings_end'], np.maximum(allotted_balls - states['legal_balls'], 0),
+                               np.maximum(allotted_balls - states['legal_balls'], 1))
+    wickets_in_hand = np.maximum(10 - states['wickets'], 0)
+
+    first = innings == 0
+    chase = innings == 1
+    X_first = first_innings_features(states['score'][first].astype(float), balls_remaining[first].astype(float),
+                                     wickets_in_hand[first].astype(float), allotted_balls[first].astype(float))
+
+    runs_required = (states['target'] - states['score'])[chase]
+    X_chase = chase_features(runs_required.astype(float), balls_remaining[chase].astype(float),
+                             wickets_in_hand[chase].astype(float))
+
+    # Decided states: target reached, or the chase was bowled out or ran out of
+    # balls short of it (a tie is a half). Rain-shortened chases keep the model value.
+    terminal = np.full(runs_required.shape, np.nan)
+    ended = states['innings_end'][chase] & ((balls_remaining[chase] == 0) | (wickets_in_hand[chase] == 0))
+    terminal[ended] = np.where(runs_required[ended] == 1, 0.5, 0.0)
+    terminal[runs_required <= 0] = 1.0
+    return first, X_first, chase, X_chase, terminal
+
+
+def sigmoid(z):
+    return 1 / (1 + np.exp(-np.clip(z, -35, 35)))
+
+
+def fit_logistic(X, y, l2=1e-3, iterations=25):
+    """Newton/IRLS logistic regression with a small ridge penalty"""
+    w = np.zeros(X.shape[1])
+    for _ in range(iterations):
+        p = sigmoid(X @ w)
+        gradient = X.T @ (p - y) + l2 * w
+        hessian = (X * (p * (1 - p))[:, None]).T @ X + l2 * np.eye(X.shape[1])
+        step = np.linalg.solve(hessian, gradient)
+        w -= step
+        if np.max(np.abs(step)) < 1e-8:
+            break
+    return w
+
+
+def predict(model, states):
+    """Probability that the team batting first wins, after every ball in states"""
+    first, X_first, chase, X_chase, terminal = design_matrices(states)
+    probability = np.empty(len(states['innings_no']))
+    probability[first] = sigmoid(X_first @ model[0])
+    chase_win = sigmoid(X_chase @ model[1])
+    chase_win = np.where(np.isnan(terminal), chase_win, terminal)
+    probability[chase] = 1 - chase_win
+    return probability
+
+
+def decided_mask(states):
+    """Rows from matches with a winner among the two sides"""
+    return np.array([w is not None for w in states['winner']])
+
+
+def train(states, holdout_every=5):
+    """
+    Fit both innings models on decided matches. Every holdout_every-th match
+    is held out for evaluation. Returns (model, metrics).
+    """
+    decided = decided_mask(states)
+    states = {k: v[decided] for k, v in states.items()}
+    first_won = (states['winner'] == states['batting_first']).astype(float)
+
+    match_ids = np.unique(states['match_id'])
+    holdout_ids = set(match_ids[::holdout_every])
+    holdout = np.array([m in holdout_ids for m in states['match_id']])
+
+    first, X_first, chase, X_chase, _ = design_matrices(states)
+    train_first = ~holdout[first]
+    train_chase = ~holdout[chase]
+    model = {
+        0: fit_logistic(X_first[train_first], first_won[first][train_first]),
+        1: fit_logistic(X_chase[train_chase], 1 - first_won[chase][train_chase]),
+    }
+
+    p = np.clip(predict(model, {k: v[holdout] for k, v in states.items()}), 1e-6, 1 - 1e-6)
+    y = first_won[holdout]
+    metrics = {
+        'training_rows': int((~holdout).sum()),
+        'holdout_rows': int(holdout.sum()),
+        'holdout_log_loss': round(float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))), 4),
+        'holdout_brier': round(float(np.mean((p - y) ** 2)), 4),
+        'holdout_accuracy': round(float(np.mean((p >= 0.5) == (y == 1))), 4),
+    }
+    return model, metrics
+
+
+def load_model(cursor):
+    """Coefficients from win_probability_model, or None if not trained yet"""
+    cursor.execute("SELECT innings_no, coefficients FROM win_probability_model")
+    rows = fetch_dicts(cursor)
+    if len(rows) < 2:
+        return None
+    return {row['innings_no']: np.array(row['coefficients']) for row in rows}
+
+
+def save_model(cursor, model, metrics):
+    for innings_no, coefficients in model.items():
+        cursor.execute("""
+            INSERT INTO win_probability_model (innings_no, coefficients, metrics, trained_at)
+            VALUES (%s, %s, %s, now())
+            ON CONFLICT (innings_no) DO UPDATE
+            SET coefficients = EXCLUDED.coefficients, metrics = EXCLUDED.metrics, trained_at = now()
+        """, (innings_no, [float(c) for c in coefficients], json.dumps(metrics)))
+
+
+def save_comebacks(cursor, rows):
+    cursor.executemany("""
+        INSERT INTO match_comebacks (match_id, winner, min_probability, innings_no, over_ball, score, wickets)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (match_id) DO UPDATE
+        SET winner = EXCLUDED.winner, min_probability = EXCLUDED.min_probability,
+            innings_no = EXCLUDED.innings_no, over_ball = EXCLUDED.over_ball,
+            score = EXCLUDED.score, wickets = EXCLUDED.wickets
+    """, rows)
+
+
+def score_all_matches(cursor, model, states=None):
+    """Batch mode: score every stored match in one pass and refresh match_comebacks"""
+    if states is None:
+        states = load_states(cursor)
+    if not states:
+        return 0
+    rows = comeback_rows(states, predict(model, states))
+    save_comebacks(cursor, rows)
+    return len(rows)
+
+
+def comeback_rows(states, probability):
+    """
+    For every decided match, the winner's lowest win probability and when it
+    occurred. Rows are (match_id, winner, min_probability, innings_no, over, score, wickets).
+    """
+    decided = decided_mask(states)
+    match_ids = states['match_id']
+    winner_probability = np.where(states['winner'] == states['batting_first'], probability, 1 - probability)
+
+    rows = []
+    # States are ordered by match, so each match is a contiguous slice
+    boundaries = np.flatnonzero(match_ids[1:] != match_ids[:-1]) + 1
+    for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(match_ids)]):
+        if not decided[start]:
+            continue
+        lowest = start + int(np.argmin(winner_probability[start:end]))
+        rows.append((
+            match_ids[start],
+            states['winner'][start],
+            round(float(winner_probability[lowest]), 4),
+            int(states['innings_no'][lowest]),
+            round(float(states['over_num'][lowest] + states['ball_in_over'][lowest] / 10), 1),
+            int(states['score'][lowest]),
+            int(states['wickets'][lowest]),
+        ))
+    return rows
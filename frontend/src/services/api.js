@@ -18,25 +18,51 @@ export const searchPlayers = () => api.get('/search/players')
 export const searchTeams = () => api.get('/search/teams')
 export const searchVenues = () => api.get('/search/venues')
 export const searchSeasons = () => api.get('/search/seasons')
-export const getMatchDetails = (matchId) => api.get(`/search/match/${matchId}`)
+export const getMatchDetails = (matchId, fields) => api.get(`/search/match/${matchId}`, { params: { fields } })
+export const getMatchProgression = (matchId) => api.get(`/search/match/${matchId}/progression`)
+export const getMatchScorecard = (matchId) => api.get(`/search/match/${matchId}/scorecard`)
+export const getMatchScorecards = (matchIds) => api.get('/search/matches/scorecards', { params: { ids: matchIds.join(',') } })
+export const getMatchWinProbability = (matchId) => api.get(`/win-probability/match/${matchId}`)
+export const getBiggestComebacks = (filters = {}) => api.get('/win-probability/comebacks', { params: filters })
+export const simulateInnings = (params) => api.get('/simulate/innings', { params })
+export const getSimilarPlayers = (playerName, k = 10, role = 'batting') => api.get(`/players/${encodeURIComponent(playerName)}/similar`, { params: { k, role } })
+export const getFantasyTopPerformers = (filters = {}) => api.get('/fantasy/top', { params: filters })
+export const getFantasyRuleSets = () => api.get('/fantasy/rule-sets')
+export const getPatternOutcomes = (params) => api.get('/sequences/pattern', { params })
 
 // Batting Stats APIs
 export const getPlayerBattingStats = (playerName) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}`)
-export const getPlayerInnings = (playerName) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/innings`)
+export const getPlayerInnings = (playerName, filters = {}) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/innings`, { params: filters })
 export const getPlayerVsTeam = (playerName, teamName) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/vs-team/${encodeURIComponent(teamName)}`)
 export const getBattingLeaderboard = (params) => api.get('/batting-stats/leaderboard', { params })
+export const getPlayerBattingTimeline = (playerName, window) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/timeline`, { params: { window } })
+export const getPlayerBattingForm = (playerName, last) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/form`, { params: { last } })
+export const getPlayerBattingByPosition = (playerName, filters = {}) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/by-position`, { params: filters })
+export const getPlayerBattingVsStyles = (playerName, filters = {}) => api.get(`/batting-stats/player/${encodeURIComponent(playerName)}/vs-styles`, { params: filters })
 
 // Bowling Stats APIs
 export const getPlayerBowlingStats = (playerName) => api.get(`/bowling-stats/player/${encodeURIComponent(playerName)}`)
 export const getPlayerBowlingSpells = (playerName) => api.get(`/bowling-stats/player/${encodeURIComponent(playerName)}/spells`)
 export const getPlayerBowlingVsTeam = (playerName, teamName) => api.get(`/bowling-stats/player/${encodeURIComponent(playerName)}/vs-team/${encodeURIComponent(teamName)}`)
 export const getBowlingLeaderboard = (params) => api.get('/bowling-stats/leaderboard', { params })
+export const getPlayerBowlingTimeline = (playerName, window) => api.get(`/bowling-stats/player/${encodeURIComponent(playerName)}/timeline`, { params: { window } })
+export const getPlayerBowlingForm = (playerName, last) => api.get(`/bowling-stats/player/${encodeURIComponent(playerName)}/form`, { params: { last } })
+export const getPlayerBowlingVsStyles = (playerName, filters = {}) => api.get(`/bowling-stats/player/${encodeURIComponent(playerName)}/vs-styles`, { params: filters })
 
 // Phase Performance APIs
 export const getPlayerPhasePerformance = (playerName) => api.get(`/phase-performance/player/${encodeURIComponent(playerName)}`)
 export const getPlayerBowlingPhasePerformance = (playerName) => api.get(`/phase-performance/player/${encodeURIComponent(playerName)}/bowling`)
-export const getTeamPhasePerformance = (teamName) => api.get(`/phase-performance/team/${encodeURIComponent(teamName)}`)
+export const getTeamPhasePerformance = (teamName, filters) => api.get(`/phase-performance/team/${encodeURIComponent(teamName)}`, { params: filters })
 export const getCustomPhaseAnalysis = (playerName, params) => api.get(`/phase-performance/player/${encodeURIComponent(playerName)}/custom-analysis`, { params })
+export const getCustomPhaseSweep = (playerName, params) => api.get(`/phase-performance/player/${encodeURIComponent(playerName)}/custom-analysis/sweep`, { params })
+
+// Venue APIs
+export const getVenues = (limit) => api.get('/venues', { params: { limit } })
+export const getVenueProfile = (venue) => api.get(`/venues/${encodeURIComponent(venue)}`)
+
+// Partnership APIs
+export const getPlayerPartners = (playerName, params) => api.get(`/partnerships/player/${encodeURIComponent(playerName)}/partners`, { params })
+export const getTeamPartnerships = (teamName, opponent) => api.get(`/partnerships/team/${encodeURIComponent(teamName)}`, { params: { opponent } })
 
 // Dismissal Patterns APIs
 export const getPlayerDismissalPatterns = (playerName) => api.get(`/dismissal-patterns/player/${encodeURIComponent(playerName)}`)
@@ -65,4 +91,11 @@ export const getLogs = () => api.get('/admin/logs')
 export const getPlayerProfile = (playerName) => api.get(`/player-profile/${encodeURIComponent(playerName)}`)
 export const searchPlayerProfiles = (searchTerm) => api.get('/player-profile/search', { params: { q: searchTerm } })
 
+// Compare APIs
+export const comparePlayers = (players, metrics) => api.get('/compare', { params: { players: players.join(','), metrics } })
+
+// Background Job APIs
+export const submitJob = (type, params) => api.post('/jobs', { type, params })
+export const getJob = (jobId, wait) => api.get(`/jobs/${jobId}`, { params: { wait } })
+
 export default api
@@ -2,6 +2,11 @@ import os
 import json
 import psycopg2
 from psycopg2.extras import Json
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from models.schema import ensure_schema, bump_dataset_version
+from utils.ingest import ingest_match
 
 # Database connection parameters - update these with your actual database credentials
 DB_PARAMS = {
@@ -25,7 +30,11 @@ def process_json_files(folder_path):
         return
 
     cursor = conn.cursor()
+    ensure_schema(cursor)
+    conn.commit()
+
     processed = 0
+    inserted = 0
     errors = 0
 
     try:
@@ -41,24 +50,38 @@ def process_json_files(folder_path):
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
                     json_data = json.load(f)
-                
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError) as je:
+                # An unreadable file is skipped like any other bad file
+                print(f"Error reading JSON in {filename}: {je}")
+                errors += 1
+                continue
+
+            # A savepoint per file, so one failing match does not abort the whole load
+            cursor.execute("SAVEPOINT match_file")
+            try:
                 # Insert into database
                 cursor.execute(
                     "INSERT INTO public.odiwc2023 (id, metadata) VALUES (%s, %s) ON CONFLICT (id) DO NOTHING",
                     (file_id, Json(json_data))
                 )
-                
+                if cursor.rowcount:
+                    # Newly inserted match: populate the derived tables
+                    ingest_match(cursor, file_id, json_data)
+                    inserted += 1
+                cursor.execute("RELEASE SAVEPOINT match_file")
+
                 processed += 1
                 if i % 10 == 0 or i == total_files:
                     print(f"Processed {i}/{total_files} files...")
-                    
-            except json.JSONDecodeError as je:
-                print(f"Error decoding JSON in {filename}: {je}")
-                errors += 1
+
             except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT match_file")
                 print(f"Error processing {filename}: {e}")
                 errors += 1
                 
+        if inserted > 0:
+            # New matches invalidate cached API responses
+            bump_dataset_version(cursor)
         conn.commit()
         print(f"\nProcessing complete!")
         print(f"Successfully processed: {processed}")
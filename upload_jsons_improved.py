@@ -2,6 +2,11 @@ import os
 import json
 import psycopg2
 from psycopg2.extras import Json
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+from models.schema import ensure_schema, bump_dataset_version
+from utils.ingest import ingest_match
 import time
 
 # Database connection parameters - update these with your actual database credentials
@@ -26,7 +31,12 @@ def process_json_files(folder_path, batch_size=20):
         return
 
     cursor = conn.cursor()
+    ensure_schema(cursor)
+    conn.commit()
+
     processed = 0
+    inserted = 0
+    batch_inserted = 0
     errors = 0
     batch_count = 0
     error_log = []
@@ -53,31 +63,53 @@ def process_json_files(folder_path, batch_size=20):
                     errors += 1
                     continue
                 
-                # Process each file in its own transaction
+                # Process each file under its own savepoint, so a failure
+                # only discards this file and not the rest of the batch
                 try:
-                    cursor.execute(
-                        """
-                        INSERT INTO "odiwc2023" (id, metadata) 
-                        VALUES (%s, %s) 
-                        ON CONFLICT (id) DO NOTHING
-                        """,
-                        (file_id, Json(json_data))
-                    )
+                    cursor.execute("SAVEPOINT match_file")
+                    try:
+                        cursor.execute(
+                            """
+                            INSERT INTO "odiwc2023" (id, metadata) 
+                            VALUES (%s, %s) 
+                            ON CONFLICT (id) DO NOTHING
+                            """,
+                            (file_id, Json(json_data))
+                        )
+                        file_inserted = bool(cursor.rowcount)
+                        if file_inserted:
+                            # Newly inserted match: populate the derived tables
+                            ingest_match(cursor, file_id, json_data)
+                        cursor.execute("RELEASE SAVEPOINT match_file")
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT match_file")
+                        error_msg = f"Error ingesting {filename}: {e}"
+                        print(f"\n{error_msg}")
+                        error_log.append(error_msg)
+                        errors += 1
+                        continue
+
+                    batch_inserted += file_inserted
                     processed += 1
                     batch_count += 1
                     
                     # Commit after each batch
                     if batch_count >= batch_size:
                         conn.commit()
+                        inserted += batch_inserted
+                        batch_inserted = 0
                         print(f"Committed batch of {batch_count} files. Processed {i}/{total_files} files...")
                         batch_count = 0
                         time.sleep(0.1)  # Small delay to prevent overwhelming the database
                         
                 except psycopg2.Error as pe:
+                    # The savepoint could not be used (e.g. the connection dropped),
+                    # so the uncommitted batch is lost
                     error_msg = f"Database error with {filename}: {pe}"
                     print(f"\n{error_msg}")
                     error_log.append(error_msg)
                     conn.rollback()
+                    batch_inserted = 0
                     errors += 1
                     
                     # Reconnect if connection was lost
@@ -106,6 +138,7 @@ def process_json_files(folder_path, batch_size=20):
         # Final commit for any remaining files
         if batch_count > 0:
             conn.commit()
+            inserted += batch_inserted
             print(f"\nCommitted final batch of {batch_count} files.")
             
         # Write errors to a log file
@@ -126,6 +159,7 @@ def process_json_files(folder_path, batch_size=20):
         print("\n\nProcess interrupted by user. Committing processed files...")
         if batch_count > 0:
             conn.commit()
+            inserted += batch_inserted
             print(f"Committed {batch_count} files from the current batch.")
         print(f"Successfully processed {processed} files before interruption.")
     
@@ -136,6 +170,14 @@ def process_json_files(folder_path, batch_size=20):
     
     finally:
         if conn:
+            if inserted > 0 and not conn.closed:
+                # New matches invalidate cached API responses
+                try:
+                    version = bump_dataset_version(cursor)
+                    conn.commit()
+                    print(f"Dataset version bumped to {version}")
+                except psycopg2.Error as pe:
+                    print(f"Error updating dataset version: {pe}")
             cursor.close()
             conn.close()
             print("Database connection closed.")